@@ -1,8 +1,107 @@
-from PyQt6.QtWidgets import QPushButton
-from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect, QTimer
+from PyQt6.QtWidgets import QApplication, QGraphicsEffect, QPushButton
+from PyQt6.QtGui import QPainter, QTransform
+from PyQt6.QtCore import Qt, QEasingCurve, QVariantAnimation
+
+# One stylesheet for every AnimatedButton, installed once on the application.
+# Focus and press use pseudo-states, so moving focus only repaints the two
+# buttons involved: nothing is re-parsed or re-polished.
+STYLESHEET = """
+AnimatedButton {
+    background-color: #2c2f33;
+    color: white;
+    border: none;
+    border-radius: 0px;
+    padding: 8px 16px;
+}
+AnimatedButton:focus {
+    border: 2px solid #1e90ff;
+    outline: none;
+}
+AnimatedButton:hover {
+    background-color: #3a3d41;
+}
+AnimatedButton:pressed {
+    background-color: #505357;
+    border: none;
+}
+"""
+
+
+def install_stylesheet(app=None):
+    """Append STYLESHEET to the application stylesheet unless it is already there."""
+    app = app or QApplication.instance()
+    if app is not None and STYLESHEET not in app.styleSheet():
+        app.setStyleSheet(app.styleSheet() + STYLESHEET)
+
+
+class ScaleEffect(QGraphicsEffect):
+    """
+    Draws the button scaled about its centre. The effect may paint outside the
+    widget, so zooming never resizes it or touches the layout. While an
+    animation runs, every frame reuses one pixmap of the button instead of
+    re-rendering it.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.scale = 1.0
+        self.extent = 1.0           # Largest scale of the running animation; sizes the bounding rect
+        self.animating = False
+        self.frame_pending = False  # An update was requested and not drawn yet
+        self._cached = None         # (pixmap, offset) while animating
+
+    def begin(self, start, end):
+        self.animating = True
+        self._cached = None
+        self.frame_pending = False
+        self.extent = max(start, end)
+        self.updateBoundingRect()
+
+    def end(self):
+        self.animating = False
+        self._cached = None
+        self.frame_pending = False
+        self.extent = self.scale
+        self.updateBoundingRect()
+        self.update()
+
+    def set_scale(self, scale):
+        self.scale = scale
+        if not self.frame_pending:
+            # While a frame is still pending it simply draws the newest scale; slow frames are dropped
+            self.frame_pending = True
+            self.update()
+
+    def _transform(self, rect, scale):
+        c = rect.center()
+        return QTransform().translate(c.x(), c.y()).scale(scale, scale).translate(-c.x(), -c.y())
+
+    def boundingRectFor(self, rect):
+        return self._transform(rect, self.extent).mapRect(rect) if self.extent > 1.0 else rect
+
+    def draw(self, painter):
+        self.frame_pending = False
+        if self.scale == 1.0:
+            self.drawSource(painter)
+            return
+        if self._cached is None:
+            pixmap, offset = self.sourcePixmap(Qt.CoordinateSystem.LogicalCoordinates,
+                                               QGraphicsEffect.PixmapPadMode.NoPad)
+            if self.animating:
+                self._cached = (pixmap, offset)
+        else:
+            pixmap, offset = self._cached
+        painter.save()
+        painter.setTransform(self._transform(self.sourceBoundingRect(Qt.CoordinateSystem.LogicalCoordinates),
+                                             self.scale), True)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, not self.animating)
+        painter.drawPixmap(offset, pixmap)
+        painter.restore()
 
 
 class AnimatedButton(QPushButton):
+    PRESS_SCALE = 0.9   # Shrink ~10% around center
+
     def __init__(self, label: str = "", action_callback=None, animation_speed=200, parent=None):
         # Back-compat: allow signature (label, callback, parent)
         if parent is None and not isinstance(animation_speed, (int, float)):
@@ -13,42 +112,21 @@ class AnimatedButton(QPushButton):
 
         self.action_callback = action_callback
         self.animation_speed = int(animation_speed)
+        self._effect = None  # ScaleEffect and its animation, created on first use
         self._anim = None
-        self._hover_anim = None
-        self._orig_rect = None
-        self.is_tile = False  # set to True via set_tile_mode() for app tiles
+        self.busy = False     # set via set_busy() while a background job runs
+        self._idle_text = ""
 
         self.setFlat(True)  # Disable Qt's default pressed visual (sunken offset/shift)
         self.setCursor(Qt.CursorShape.PointingHandCursor)
         self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
 
-        # Default style for normal menu buttons
-        self.setStyleSheet(self.button_style(focused=False))
+        # Shared style; the global theme may have been replaced since the last button
+        install_stylesheet()
 
         if self.action_callback:
             # Prevent Qt from passing a bool
-            self.clicked.connect(lambda *_: self.action_callback())
-
-    # ---- Styles ----
-    def button_style(self, focused=False) -> str:
-        border = "2px solid #1e90ff;" if focused else "none;"
-        return f"""
-        QPushButton {{
-            background-color: #2c2f33;
-            color: white;
-            border: {border}
-            border-radius: 0px;
-            padding: 8px 16px;
-        }}
-        QPushButton:hover {{
-            background-color: #3a3d41;
-        }}
-        QPushButton:pressed {{
-            background-color: #505357;
-            border: none;
-        }}
-        QPushButton:focus {{ outline: none; }}
-        """
+            self.clicked.connect(lambda *_: self.busy or self.action_callback())
 
     def keyPressEvent(self, event):
         if event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
@@ -57,106 +135,63 @@ class AnimatedButton(QPushButton):
             return
         super().keyPressEvent(event)
 
-
-    def set_tile_mode(self):
-        """Use this for icon tiles in the Applications grid."""
-        self.is_tile = True
-        self.setStyleSheet("""
-        QPushButton {
-            background: transparent;
-            border: none;
-        }
-        QPushButton:hover {
-            background-color: rgba(255,255,255,0.08);
-            border-radius: 12px;
-        }
-        QPushButton:focus {
-            border: 2px solid #1e90ff;
-            border-radius: 12px;
-        }
-        """)
+    def set_busy(self, busy: bool):
+        """Mark the button busy while its job runs; it keeps focus but ignores clicks."""
+        if busy == self.busy:
+            return
+        self.busy = busy
+        if busy:
+            self._idle_text = self.text()
+            if self._idle_text:
+                self.setText(f"{self._idle_text} …")
+        elif self._idle_text:
+            self.setText(self._idle_text)
+
+    def set_label(self, text: str):
+        """setText() that survives set_busy(): the new label shows once idle."""
+        if self.busy:
+            self._idle_text = text
+            self.setText(f"{text} …")
+        else:
+            self.setText(text)
 
     # ---- Animation helpers ----
-    def animate_geometry(self, end_rect: QRect):
-        g = self.geometry()
-        anim = QPropertyAnimation(self, b"geometry")
-        anim.setDuration(max(60, min(600, self.animation_speed)))
-        anim.setStartValue(g)
-        anim.setEndValue(end_rect)
-        anim.setEasingCurve(QEasingCurve.Type.OutCubic)
-        anim.start()
-        return anim
+    def animate_scale(self, end_scale):
+        """Animate the paint-time scale; the geometry and the layout are left alone."""
+        if self._effect is None:
+            self._effect = ScaleEffect(self)
+            self.setGraphicsEffect(self._effect)
+            self._anim = QVariantAnimation(self)
+            self._anim.setEasingCurve(QEasingCurve.Type.OutCubic)
+            self._anim.valueChanged.connect(self._effect.set_scale)
+            self._anim.finished.connect(self._animation_finished)
+        self._anim.stop()
+        start = self._effect.scale
+        if start == end_scale:
+            if self._effect.animating:
+                self._effect.end()  # Interrupted right at its target
+            return
+        self._effect.setEnabled(True)
+        self._effect.begin(start, end_scale)
+        self._anim.setDuration(max(60, min(600, self.animation_speed)))
+        self._anim.setStartValue(start)
+        self._anim.setEndValue(float(end_scale))
+        self._anim.start()
+
+    def _animation_finished(self):
+        self._effect.end()
+        if self._effect.scale == 1.0:
+            self._effect.setEnabled(False)  # At rest: paint directly, no offscreen pixmap
 
     # ---- Events ----
-    def resizeEvent(self, e):
-        # Track the true layout-driven geometry to restore to
-        self._orig_rect = self.geometry()
-        super().resizeEvent(e)
-
     def mousePressEvent(self, e):
-        if self._orig_rect:
-            g = self._orig_rect
-            # Shrink ~10% around center
-            shrink_w, shrink_h = int(g.width() * 0.9), int(g.height() * 0.9)
-            shrink_x = g.x() + (g.width() - shrink_w) // 2
-            shrink_y = g.y() + (g.height() - shrink_h) // 2
-            self._anim = self.animate_geometry(QRect(shrink_x, shrink_y, shrink_w, shrink_h))
+        self.animate_scale(self.PRESS_SCALE)
         super().mousePressEvent(e)
 
     def mouseReleaseEvent(self, e):
         super().mouseReleaseEvent(e)
 
-        if self._orig_rect:
-            # Ensure Qt isn't holding a pressed/checked visual
-            self.setDown(False)
-            self.setChecked(False)
-
-            # Restore to exact original size/pos right after Qt processes release
-            QTimer.singleShot(0, lambda: self.animate_geometry(self._orig_rect))
-
-            # Reapply the correct style
-            if self.is_tile:
-                self.set_tile_mode()
-            else:
-                self.setStyleSheet(self.button_style(focused=self.hasFocus()))
-
-    def enterEvent(self, e):
-        # Only tiles get hover zoom
-        if self.is_tile and self._orig_rect:
-            g = self._orig_rect
-            zoom_w, zoom_h = int(g.width() * 1.08), int(g.height() * 1.08)
-            zoom_x = g.x() - (zoom_w - g.width()) // 2
-            zoom_y = g.y() - (zoom_h - g.height()) // 2
-            self._hover_anim = self.animate_geometry(QRect(zoom_x, zoom_y, zoom_w, zoom_h))
-        super().enterEvent(e)
-
-    def leaveEvent(self, e):
-        if self.is_tile and self._orig_rect:
-            self._hover_anim = self.animate_geometry(self._orig_rect)
-        super().leaveEvent(e)
-
-    def focusInEvent(self, e):
-        if self.is_tile:
-            # Blue border focus for tiles
-            self.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                border: 2px solid #1e90ff;
-                border-radius: 12px;
-            }
-            QPushButton:hover {
-                background-color: rgba(255,255,255,0.08);
-                border-radius: 12px;
-            }
-            """)
-        else:
-            # Blue border focus for menu buttons
-            self.setStyleSheet(self.button_style(focused=True))
-        super().focusInEvent(e)
-
-    def focusOutEvent(self, e):
-        if self.is_tile:
-            self.set_tile_mode()
-        else:
-            self.setStyleSheet(self.button_style(focused=False))
-        super().focusOutEvent(e)
\ No newline at end of file
+        # Ensure Qt isn't holding a pressed/checked visual
+        self.setDown(False)
+        self.setChecked(False)
+        self.animate_scale(1.0)
@@ -0,0 +1,1054 @@
+"""
+Performance benchmarks for the Steamlink GUI.
+
+Usage:
+    python3 benchmark.py spawn [--runs N] [--ballast-mb MB]
+    python3 benchmark.py sink
+    python3 benchmark.py stall [--pair-delay S] [--refuse] [--max-stall-ms MS]
+    python3 benchmark.py bluez [--paired N] [--nearby N]
+    python3 benchmark.py startup [--eager]
+    python3 benchmark.py icons [--entries N] [--icon-size WxH]
+    python3 benchmark.py focus [--buttons N] [--seconds S]
+    python3 benchmark.py ui [--apps N] [--devices N]
+    python3 benchmark.py launch [--runs N] [--child-s S]
+    python3 benchmark.py hibernate [--apps N] [--seconds S]
+
+Results are printed as JSON so runs can be compared across commits. A run
+whose result lists "failures" exits with status 1.
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    return {
+        "runs": len(samples),
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+def bench_spawn(args):
+    """
+    Per-command latency: direct subprocess vs. the spawner wrappers every
+    menu uses, with a ballast standing in for the GUI's memory. A ratio
+    above 1 means the wrappers add cost.
+    """
+    import spawner
+
+    # Stand-in for the memory PyQt6, pygame and decoded icons occupy
+    ballast = bytearray(args.ballast_mb * 1024 * 1024)
+    for i in range(0, len(ballast), 4096):
+        ballast[i] = 1
+
+    cmd = ["true"]
+    results = {}
+    for name, run in (("subprocess", subprocess.run), ("spawner", spawner.run)):
+        run(cmd)  # warm-up
+        samples = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            run(cmd, capture_output=True)
+            samples.append(time.perf_counter() - start)
+        results[name] = _summary(samples)
+
+    ratio = {k: round(results["spawner"][k] / results["subprocess"][k], 2) for k in ("p50_ms", "mean_ms")}
+    return {"ballast_mb": args.ballast_mb, "command": cmd, "results": results,
+            "spawner_vs_subprocess": ratio,
+            "spawner_extra_p50_ms": round(results["spawner"]["p50_ms"] - results["subprocess"]["p50_ms"], 3)}
+
+
+# `subscribe` streams events like pactl does: each step writes the sink state
+# the get-* queries report, then prints that step's event lines
+FAKE_PACTL_SUBSCRIBE = """#!/bin/sh
+case "$1" in
+    get-sink-volume) echo "Volume: front-left: 0 / $(cut -d' ' -f1 "{state}")% / 0 dB" ;;
+    get-sink-mute) echo "Mute: $(cut -d' ' -f2 "{state}")" ;;
+    subscribe)
+        sleep {settle}
+        while read volume muted events; do
+            echo "$volume $muted" > "{state}"
+            i=0
+            while [ $i -lt $events ]; do echo "Event 'change' on sink #0"; i=$((i + 1)); done
+            echo "Event 'change' on source #1"
+            sleep {gap}
+        done <<STEPS
+{steps}
+STEPS
+        exec sleep 3600 ;;
+esac
+exit 0
+"""
+
+# (volume, muted, sink events) per step, starting from 50 unmuted. A step that
+# repeats the previous state is a duplicate event and must not update the bar;
+# several events for one change must update it once.
+SINK_STEPS = [(55, "no", 1), (55, "no", 1), (60, "no", 3), (60, "yes", 1), (60, "yes", 2), (40, "no", 1)]
+
+
+def bench_sink(args):
+    """VolumeMenu against a fake `pactl subscribe` stream: one bar update per real change."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    state_file = os.path.join(tempfile.mkdtemp(prefix="steamlink-bench-"), "sink")
+    with open(state_file, "w") as f:
+        f.write("50 no\n")
+    steps = "\n".join(f"{v} {m} {n}" for v, m, n in SINK_STEPS)
+    install_fake_tool("pactl", FAKE_PACTL_SUBSCRIBE.format(state=state_file, settle=args.settle,
+                                                           gap=args.gap, steps=steps))
+
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication([])
+    import state
+    from menu_volume import VolumeMenu
+
+    menu = VolumeMenu()
+    updates = []
+    apply_sink_state = menu.apply_sink_state
+
+    def record(current, is_muted):
+        apply_sink_state(current, is_muted)
+        updates.append((current, is_muted, menu.volume_bar.value(), menu.volume_bar.format()))
+
+    menu.apply_sink_state = record
+    # Drop the start-up reads; the stream begins after `settle`
+    QTimer.singleShot(int(args.settle * 500), updates.clear)
+    QTimer.singleShot(int((args.settle + args.gap * (len(SINK_STEPS) + 1)) * 1000), app.quit)
+    app.exec()
+    menu.sink_monitor.stop()
+
+    expected, previous = [], (50, False)
+    for volume, muted, _ in SINK_STEPS:
+        if (volume, muted == "yes") != previous:
+            previous = (volume, muted == "yes")
+            expected.append(previous)
+    seen = [(current, is_muted) for current, is_muted, _, _ in updates]
+    failures = []
+    if seen != expected:
+        failures.append(f"bar updates {seen}, expected {expected}")
+    for current, is_muted, value, text in updates:
+        want = (0, "Muted") if is_muted else (current, f"{current}%")
+        if (value, text) != want:
+            failures.append(f"bar shows {value} {text!r} for {current} muted={is_muted}")
+    sink = state.store().stats()["keys"]["audio.sink"]
+    return {"steps": len(SINK_STEPS), "events": sum(n for _, _, n in SINK_STEPS),
+            "updates": len(updates), "expected_updates": len(expected),
+            "sink_reads": sink["fetches"], "failures": failures}
+
+
+FAKE_BLUETOOTHCTL = """#!/bin/sh
+# Slow stand-in for bluetoothctl: every call is sluggish, pairing very much so
+sleep 0.2
+case "$1" in
+    pair) sleep {pair_delay}; {pair} ;;
+    paired-devices) [ -e "{state}" ] && echo "Device {mac} Fake Pad" ;;
+esac
+exit 0
+"""
+PAIR_OK = 'echo "Pairing successful"; touch "{state}"'
+
+# Slow display tools for the resolution switch on the System page
+FAKE_TVSERVICE = """#!/bin/sh
+case "$1" in
+    -e) sleep {delay}; echo "$2" > "{state}" ;;
+    -s) [ "$(cat "{state}" 2>/dev/null)" = "DMT 51 HDMI" ] && size=2560x1440 || size=1920x1080
+        echo "state 0x12000a [HDMI DMT (82) RGB full 16:9], $size @ 60.00Hz, progressive" ;;
+esac
+exit 0
+"""
+FAKE_FBSET = """#!/bin/sh
+sleep {delay}
+exit 0
+"""
+# Like older bluetoothctl: the failure is only in the output, the exit status is 0
+PAIR_REFUSED = 'echo "Failed to pair: org.bluez.Error.AuthenticationFailed"'
+
+
+def install_fake_tool(name, script):
+    """Write an executable fake system tool and put it first on PATH."""
+    tmp = tempfile.mkdtemp(prefix="steamlink-bench-")
+    path = os.path.join(tmp, name)
+    with open(path, "w") as f:
+        f.write(script)
+    os.chmod(path, 0o755)
+    os.environ["PATH"] = tmp + os.pathsep + os.environ["PATH"]
+    return tmp
+
+
+class LoopStallMeter:
+    """Measures how late a 5 ms QTimer fires, i.e. how long the event loop was blocked."""
+
+    def __init__(self, interval_ms=5):
+        from PyQt6.QtCore import QTimer
+        self.interval = interval_ms / 1000
+        self.gaps = []
+        self._last = time.perf_counter()
+        self.timer = QTimer()
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._tick)
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.gaps.append(now - self._last)
+        self._last = now
+
+    def start(self):
+        self._last = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def result(self):
+        late = [max(0.0, g - self.interval) for g in self.gaps] or [0.0]
+        return {"ticks": len(self.gaps), "max_stall_ms": round(max(late) * 1000, 3),
+                **{f"stall_{k}": v for k, v in _summary(late).items() if k != "runs"}}
+
+
+def bench_stall(args):
+    """
+    Longest event-loop stall while pairing against a slow fake bluetoothctl
+    and then switching resolution with slow fake tvservice/fbset. Fails if
+    the loop was ever blocked longer than --max-stall-ms.
+    """
+    mac = "00:11:22:33:44:55"
+    tmp = tempfile.mkdtemp(prefix="steamlink-bench-")
+    state = os.path.join(tmp, "paired")
+    pair = (PAIR_REFUSED if args.refuse else PAIR_OK).format(state=state)
+    install_fake_tool("bluetoothctl", FAKE_BLUETOOTHCTL.format(pair_delay=args.pair_delay, mac=mac,
+                                                               state=state, pair=pair))
+    install_fake_tool("tvservice", FAKE_TVSERVICE.format(delay=args.tool_delay, state=os.path.join(tmp, "mode")))
+    install_fake_tool("fbset", FAKE_FBSET.format(delay=args.tool_delay))
+    os.environ["STEAMLINK_BT_BACKEND"] = "bluetoothctl"
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication([])
+    import state as state_store
+    from menu_bluetooth import BluetoothMenu
+    from menu_system import SystemMenu
+
+    meter = LoopStallMeter()
+    meter.start()
+    started = time.perf_counter()
+    menu = BluetoothMenu()
+    construct = time.perf_counter() - started
+    system = SystemMenu()
+
+    timings = {}
+    pair_done = menu._pair_done
+    resolution_done = system._resolution_done
+
+    def finished(pair_btn, error):
+        pair_done(pair_btn, error)
+        timings["pair_s"] = round(time.perf_counter() - timings.pop("start"), 3)
+        timings["pair_error"] = str(error) if error else None
+        timings["status"] = menu.status_label.text()
+        QTimer.singleShot(100, switch_resolution)
+
+    def pair():
+        timings["start"] = time.perf_counter()
+        menu.pair_device(mac)
+
+    def switch_resolution():
+        timings["start"] = time.perf_counter()
+        system.res_dropdown.setCurrentIndex(system.res_dropdown.findData("1440p"))
+        system.apply_resolution()
+        timings["apply_busy"] = bool(getattr(system.apply_btn, "busy", not system.apply_btn.isEnabled()))
+
+    def switched(mode, error):
+        resolution_done(mode, error)
+        timings["resolution_s"] = round(time.perf_counter() - timings.pop("start"), 3)
+        timings["resolution_error"] = str(error) if error else None
+        state_store.store().subscribe("display.mode", lambda _: QTimer.singleShot(100, app.quit))
+
+    menu._pair_done = finished
+    system._resolution_done = switched
+    QTimer.singleShot(500, pair)
+    QTimer.singleShot(int((args.pair_delay + 30) * 1000), app.quit)  # Safety net
+    app.exec()
+    meter.stop()
+
+    paired = [d["mac"] for d in menu.get_paired_devices()]
+    failures = []
+    if "pair_s" not in timings:
+        failures.append("pairing never finished")
+    elif args.refuse and (timings["pair_error"] is None or timings["status"] != "Pairing failed."):
+        failures.append(f"refused pairing reported error {timings['pair_error']!r}, status {timings['status']!r}")
+    elif not args.refuse and (timings["pair_error"] or paired != [mac]):
+        failures.append(f"pairing reported error {timings['pair_error']!r}, paired {paired}")
+    display = system.display_label.text()
+    if "resolution_s" not in timings:
+        failures.append("resolution switch never finished")
+    elif not timings["apply_busy"] or timings["resolution_error"] or "2560x1440" not in display:
+        failures.append(f"resolution switch: busy {timings['apply_busy']}, "
+                        f"error {timings['resolution_error']!r}, label {display!r}")
+    stalls = meter.result()
+    if stalls["max_stall_ms"] > args.max_stall_ms:
+        failures.append(f"event loop blocked for {stalls['max_stall_ms']} ms (limit {args.max_stall_ms} ms)")
+    return {"pair_delay_s": args.pair_delay, "refuse": args.refuse, "menu_construct_ms": round(construct * 1000, 3),
+            **timings, "paired": paired, "display": display, **stalls, "failures": failures}
+
+
+def _spin_until(app, predicate, timeout=5.0):
+    """Run the event loop until predicate() is true or timeout seconds pass."""
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return bool(predicate())
+
+
+def bench_bluez(args):
+    """
+    BluezDBusBackend against mock_bluez.py on a private session bus: initial
+    load, Connect/Disconnect, a Connect that never answers, discovery,
+    pairing, removal, an unknown device and a bluetoothd restart. Re-runs itself under dbus-run-session.
+    """
+    if not os.environ.get("STEAMLINK_MOCK_BUS"):
+        os.environ["STEAMLINK_MOCK_BUS"] = "1"
+        os.execvp("dbus-run-session", ["dbus-run-session", "--", sys.executable] + sys.argv)
+
+    import threading
+    import mock_bluez
+    from PyQt6.QtCore import QCoreApplication
+    app = QCoreApplication([])
+    import bluetooth_backend
+
+    def start_mock():
+        """Start the mock; returns the process and the list its output lines go to."""
+        proc = subprocess.Popen([sys.executable, mock_bluez.__file__, "--service", args.service,
+                                 "--paired", str(args.paired), "--nearby", str(args.nearby),
+                                 "--stall", mock_bluez.paired_mac(0)],
+                                stdout=subprocess.PIPE, text=True)
+        if proc.stdout.readline().strip() != "ready":
+            raise RuntimeError("mock BlueZ did not start")
+        lines = []
+        threading.Thread(target=lambda: lines.extend(line.strip() for line in proc.stdout), daemon=True).start()
+        return proc, lines
+
+    agent = f"default-agent {bluetooth_backend.AGENT_PATH}"
+    mock, mock_lines = start_mock()
+    failures = []
+    timings = {}
+    results = {}
+
+    def check(name, ok, detail=""):
+        if not ok:
+            failures.append(f"{name}: {detail}" if detail else name)
+
+    def action(name, call, mac, predicate):
+        """Run a backend action; wait for its callback and for predicate()."""
+        results.pop(name, None)
+        started = time.perf_counter()
+        call(mac, callback=lambda error: results.setdefault(name, error))
+        done = _spin_until(app, lambda: name in results and predicate())
+        timings[f"{name}_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return done, results.get(name, "no callback")
+
+    started = time.perf_counter()
+    backend = bluetooth_backend.BluezDBusBackend(bus_address=os.environ["DBUS_SESSION_BUS_ADDRESS"],
+                                                 service=args.service)
+    timings["connect_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    try:
+        paired = sorted(d["mac"] for d in backend.paired_devices())
+        expected = sorted(mock_bluez.paired_mac(i) for i in range(args.paired))
+        check("initial load", paired == expected, f"paired {paired}, expected {expected}")
+        check("initial connected state", backend.is_connected(mock_bluez.paired_mac(0)))
+        check("pairing agent", _spin_until(app, lambda: agent in mock_lines), f"mock saw {mock_lines}")
+
+        pad = mock_bluez.paired_mac(args.paired - 1)
+        done, error = action("connect", backend.connect_device, pad, lambda: backend.is_connected(pad))
+        check("connect", done and error is None, f"error {error!r}, connected {backend.is_connected(pad)}")
+        done, error = action("disconnect", backend.disconnect_device, pad, lambda: not backend.is_connected(pad))
+        check("disconnect", done and error is None, f"error {error!r}, connected {backend.is_connected(pad)}")
+        # The mock never answers Connect for pad 0; the callback must still come, with a timeout
+        backend.ACTION_TIMEOUTS = dict(backend.ACTION_TIMEOUTS, connect=0.5)
+        done, error = action("connect_stalled", backend.connect_device, mock_bluez.paired_mac(0), lambda: True)
+        check("stalled connect times out", done and isinstance(error, TimeoutError), f"error {error!r}")
+
+        seen = {}
+        backend.device_discovered.connect(lambda dev: seen.setdefault(dev["mac"], dev["name"]))
+        finished = []
+        backend.discovery_finished.connect(lambda: finished.append(True))
+        nearby = {mock_bluez.nearby_mac(i) for i in range(args.nearby)} | {mock_bluez.BROKEN_MAC}
+        started = time.perf_counter()
+        backend.start_discovery(timeout=10)
+        found = _spin_until(app, lambda: set(seen) >= nearby)
+        timings["discovery_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        check("discovery", found and set(seen) == nearby, f"saw {sorted(seen)}, expected {sorted(nearby)}")
+        backend.stop_discovery()
+        check("discovery finished", _spin_until(app, lambda: finished) and not backend.is_discovering())
+
+        new = mock_bluez.nearby_mac(0)
+        done, error = action("pair", backend.pair_device, new,
+                             lambda: new in {d["mac"] for d in backend.paired_devices()})
+        check("pair", done and error is None, f"error {error!r}")
+        done, error = action("pair_refused", backend.pair_device, mock_bluez.BROKEN_MAC, lambda: True)
+        check("refused pairing reports an error", done and error is not None, f"error {error!r}")
+        done, error = action("remove", backend.remove_device, new,
+                             lambda: new not in {d["mac"] for d in backend.paired_devices()})
+        check("remove", done and error is None, f"error {error!r}")
+        done, error = action("unknown", backend.connect_device, "AA:BB:CC:DD:EE:FF", lambda: True)
+        check("unknown device", done and isinstance(error, LookupError), f"error {error!r}")
+
+        # bluetoothd restart: the cache empties and reloads once the name is back
+        mock.terminate()
+        mock.wait()
+        check("service gone", _spin_until(app, lambda: not backend.paired_devices()))
+        started = time.perf_counter()
+        mock, mock_lines = start_mock()
+        reloaded = _spin_until(app, lambda: len(backend.paired_devices()) == args.paired)
+        timings["reload_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        check("reload after restart", reloaded, f"paired {backend.paired_devices()}")
+        check("pairing agent after restart", _spin_until(app, lambda: agent in mock_lines),
+              f"mock saw {mock_lines}")
+    finally:
+        backend.close()
+        mock.terminate()
+        mock.wait()
+
+    return {"paired": args.paired, "nearby": args.nearby, **timings, "failures": failures}
+
+
+def bench_startup(args):
+    """Time from constructing SteamlinkGUI to its first painted frame."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication([])
+    import gui_mainmenu
+
+    timings = {}
+
+    class TimedGUI(gui_mainmenu.SteamlinkGUI):
+        def paintEvent(self, event):
+            super().paintEvent(event)
+            timings.setdefault("first_frame_ms", round((time.perf_counter() - started) * 1000, 3))
+
+        def _prebuild_next(self):
+            super()._prebuild_next()
+            if not self.page_factories and "prebuilt_ms" not in timings:
+                timings["prebuilt_ms"] = round((time.perf_counter() - started) * 1000, 3)
+                QTimer.singleShot(100, app.quit)
+
+    started = time.perf_counter()
+    gui = TimedGUI(prebuild=not args.eager)
+    if args.eager:
+        # Pre-lazy behaviour: every page exists before the window is shown
+        for name in list(gui.page_factories):
+            gui.build_page(name)
+        QTimer.singleShot(500, app.quit)
+    timings["construct_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    gui.show()
+    QTimer.singleShot(30000, app.quit)  # Safety net
+    app.exec()
+
+    return {"eager": args.eager, **timings}
+
+
+def make_synthetic_apps(count, icon_size):
+    """programs.txt with `count` entries, each with its own full-size PNG."""
+    from PyQt6.QtGui import QColor, QImage, QPainter
+    tmp = tempfile.mkdtemp(prefix="steamlink-bench-")
+    icons_dir = os.path.join(tmp, "icons")
+    os.makedirs(icons_dir)
+    width, height = icon_size
+    with open(os.path.join(tmp, "programs.txt"), "w") as f:
+        for i in range(count):
+            image = QImage(width, height, QImage.Format.Format_ARGB32)
+            image.fill(QColor.fromHsv(i * 37 % 360, 200, 200))
+            painter = QPainter(image)
+            for y in range(0, height, 16):  # Stripes so the PNG does not compress to nothing
+                painter.fillRect(0, y, width, 8, QColor.fromHsv((i * 37 + y) % 360, 255, 255))
+            painter.end()
+            name = f"app{i:03d}.png"
+            image.save(os.path.join(icons_dir, name))
+            f.write(f"App {i}|true|{name}\n")
+    return os.path.join(tmp, "programs.txt"), icons_dir
+
+
+def bench_icons(args):
+    """Applications page with many entries: construction time and on-demand icon loading, cold and warm cache."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["STEAMLINK_ICON_CACHE"] = tempfile.mkdtemp(prefix="steamlink-bench-cache-")
+    from PyQt6.QtWidgets import QApplication, QVBoxLayout, QWidget
+    app = QApplication([])
+    import icon_cache
+    from menu_application import ApplicationMenu, TILE_SIZE
+
+    width, height = (int(v) for v in args.icon_size.split("x"))
+    programs_file, icons_dir = make_synthetic_apps(args.entries, (width, height))
+    paths = [os.path.join(icons_dir, f"app{i:03d}.png") for i in range(args.entries)]
+
+    loaded = []
+
+    results = {}
+    for run in ("cold", "warm"):
+        loaded.clear()
+        visible = set()
+
+        def done():
+            # Before quit(): Qt 6 closes the windows when quitting
+            visible.update(menu.grid.visible_keys())
+            app.quit()
+
+        meter = LoopStallMeter()
+        meter.start()
+        started = time.perf_counter()
+        menu = ApplicationMenu(programs_file, icons_dir)
+        construct = time.perf_counter() - started
+        # Icons are only requested once tiles are painted, so nothing is missed by connecting here
+        menu.icon_loader.icon_loaded.connect(lambda item, image: loaded.append((item[0], time.perf_counter() - started)))
+        menu.icon_loader.drained.connect(done)
+
+        # Page area of the fixed-size main window; only the tiles inside it are painted
+        window = QWidget()
+        QVBoxLayout(window).addWidget(menu)
+        window.setFixedSize(1500, 1040)
+        window.show()
+        app.exec()
+        meter.stop()
+
+        visible_done = max((t for i, t in loaded if i in visible), default=0)
+        results[run] = {"construct_ms": round(construct * 1000, 3),
+                        "visible_tiles": len(visible),
+                        "visible_icons_ms": round(visible_done * 1000, 3),
+                        "all_icons_ms": round(loaded[-1][1] * 1000, 3),
+                        "icons_loaded": len(loaded),
+                        "icons_in_memory": len(menu.model.pixmaps),
+                        "max_stall_ms": meter.result()["max_stall_ms"]}
+        menu.icon_loader.stop()
+        window.deleteLater()
+
+    # What the constructor used to pay up front (decode + scale every icon, no cache)
+    started = time.perf_counter()
+    for path in paths:
+        icon_cache.IconCache.decode(path, TILE_SIZE)
+    results["sync_decode_all_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+    return {"entries": args.entries, "icon_size": args.icon_size, **results}
+
+
+# Stand-in for the global theme main.py installs
+THEME = """
+QWidget { background-color: #1e1e1e; color: white; font-size: 18px; }
+QPushButton { background-color: #2c2f33; border-radius: 8px; padding: 8px 16px; color: white; }
+QPushButton:hover { background-color: #3a3d41; }
+QPushButton:pressed { background-color: #505357; }
+"""
+
+
+def bench_focus(args):
+    """D-pad focus moves per second: shared stylesheet vs. the old setStyleSheet() on every focus change."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication, QGridLayout, QWidget
+    app = QApplication([])
+    import animated_button
+    app.setStyleSheet(THEME + animated_button.STYLESHEET)
+
+    class LegacyButton(animated_button.AnimatedButton):
+        """The pre-change behaviour: a freshly formatted per-widget stylesheet on every focus event."""
+        def style_for(self, focused):
+            border = "2px solid #1e90ff;" if focused else "none;"
+            return (f"QPushButton {{ background-color: #2c2f33; color: white; border: {border}"
+                    " border-radius: 0px; padding: 8px 16px; }"
+                    "QPushButton:hover { background-color: #3a3d41; }"
+                    "QPushButton:pressed { background-color: #505357; border: none; }"
+                    "QPushButton:focus { outline: none; }")
+
+        def focusInEvent(self, e):
+            self.setStyleSheet(self.style_for(True))
+            super().focusInEvent(e)
+
+        def focusOutEvent(self, e):
+            self.setStyleSheet(self.style_for(False))
+            super().focusOutEvent(e)
+
+    results = {}
+    for mode, cls in (("per_focus_stylesheet", LegacyButton), ("shared_stylesheet", animated_button.AnimatedButton)):
+        window = QWidget()
+        grid = QGridLayout(window)
+        buttons = []
+        for i in range(args.buttons):
+            btn = cls(f"Button {i}")
+            if isinstance(btn, LegacyButton):
+                btn.setStyleSheet(btn.style_for(False))
+            grid.addWidget(btn, i // 5, i % 5)
+            buttons.append(btn)
+        window.resize(1280, 720)
+        window.show()
+        QApplication.setActiveWindow(window)
+        app.processEvents()
+
+        samples = []
+        moves = 0
+        deadline = time.perf_counter() + args.seconds
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            buttons[moves % len(buttons)].setFocus()
+            app.processEvents()  # Restyle and repaint, as the event loop would after a D-pad press
+            samples.append(time.perf_counter() - started)
+            moves += 1
+        results[mode] = {"focus_changes_per_s": round(moves / args.seconds, 1), **_summary(samples)}
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+
+    results["speedup"] = round(results["shared_stylesheet"]["focus_changes_per_s"] /
+                               results["per_focus_stylesheet"]["focus_changes_per_s"], 2)
+    return {"buttons": args.buttons, **results}
+
+
+FAKE_PACTL = """#!/bin/sh
+case "$1" in
+    get-sink-volume) echo "Volume: front-left: 32768 /  50% / -18.06 dB" ;;
+    get-sink-mute) echo "Mute: no" ;;
+    subscribe) exec sleep 3600 ;;
+esac
+exit 0
+"""
+
+# Every `devices Connected` query flips which half of the paired pads is connected,
+# so each refresh really changes the table
+FAKE_BLUETOOTHCTL_TABLE = """#!/bin/bash
+case "$1" in
+    paired-devices)
+        for i in $(seq 0 {last}); do printf 'Device 00:11:22:33:44:%02X Fake Pad %d\\n' $i $i; done ;;
+    devices)
+        n=$(cat "{state}" 2>/dev/null || echo 0); echo $((n + 1)) > "{state}"
+        for i in $(seq 0 {last}); do
+            [ $(( (i + n) % 2 )) = 0 ] && printf 'Device 00:11:22:33:44:%02X Fake Pad %d\\n' $i $i
+        done ;;
+esac
+exit 0
+"""
+
+
+def _peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+
+
+def _use_1080p_screen():
+    screen = os.path.join(tempfile.mkdtemp(prefix="steamlink-bench-"), "screen.json")
+    with open(screen, "w") as f:  # A 1080p TV rather than the offscreen default
+        json.dump({"screens": [{"name": "tv", "x": 0, "y": 0, "width": 1920, "height": 1080,
+                                "logicalDpi": 96, "logicalBaseDpi": 96, "dpr": 1}]}, f)
+    os.environ.setdefault("QT_QPA_PLATFORM", f"offscreen:configfile={screen}")
+
+
+def bench_ui(args):
+    """
+    Scripted navigation of the whole SteamlinkGUI offscreen, with fake pactl,
+    bluetoothctl and controller: frame times, input-to-frame latency,
+    event-loop stalls and peak RSS per scenario.
+    """
+    _use_1080p_screen()
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ["STEAMLINK_ICON_CACHE"] = tempfile.mkdtemp(prefix="steamlink-bench-cache-")
+    os.environ["STEAMLINK_BT_BACKEND"] = "bluetoothctl"
+    state = os.path.join(tempfile.mkdtemp(prefix="steamlink-bench-"), "connected")
+    install_fake_tool("bluetoothctl", FAKE_BLUETOOTHCTL_TABLE.format(last=args.devices - 1, state=state))
+    install_fake_tool("pactl", FAKE_PACTL)
+    replay = os.path.join(tempfile.mkdtemp(prefix="steamlink-bench-"), "empty.rec")
+    open(replay, "w").close()
+    os.environ["STEAMLINK_INPUT_REPLAY"] = replay  # Controller thread with no pad input
+
+    from PyQt6.QtCore import QEvent, Qt, QTimer
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication([])
+    import animated_button
+    import gui_mainmenu
+    import state
+    from menu_application import ApplicationMenu
+    app.setStyleSheet(THEME + animated_button.STYLESHEET)
+    programs_file, icons_dir = make_synthetic_apps(args.apps, (200, 300))
+
+    run = {"step": None}  # The step waiting for its frame
+
+    class TimedGUI(gui_mainmenu.SteamlinkGUI):
+        def event(self, event):
+            if event.type() != QEvent.Type.UpdateRequest:
+                return super().event(event)
+            started = time.perf_counter()
+            result = super().event(event)
+            now = time.perf_counter()
+            step = run["step"]
+            if step is not None:
+                step["frames"].append(now - started)
+                if step["ready"]:
+                    step["to_frame"] = now - step["start"]
+                    run["step"] = None
+                    QTimer.singleShot(0, next_step)
+            return result
+
+    gui = TimedGUI(prebuild=False)
+    gui.page_factories["Launch Application"] = lambda: ApplicationMenu(programs_file, icons_dir)
+    gui.show()
+    app.processEvents()
+    QApplication.setActiveWindow(gui)  # Offscreen windows are not activated on show; focus needs it
+
+    def key(k):
+        return lambda: gui.handle_key(k)
+
+    def focus_first_tile():
+        menu = gui.switch_page("Launch Application")
+        menu.grid.setCurrentIndex(menu.model.index(0))
+        menu.setFocus()
+        # Column by column (Left would leave the page), over the columns the page shows
+        columns = menu.grid.columns()
+        rows = -(-args.apps // columns)
+        traversal = []
+        for col in range(columns):
+            if col:
+                traversal.append(("app_grid", key(Qt.Key.Key_Right)))
+            traversal += [("app_grid", key(Qt.Key.Key_Down if col % 2 == 0 else Qt.Key.Key_Up))] * (rows - 1)
+        steps[0:0] = traversal
+
+    def refresh_bluetooth():
+        run["step"]["ready"] = False  # Wait for the table update, not the busy Refresh button
+        state.store().invalidate("bluetooth.devices")  # Each step re-reads, past the store's TTL
+        gui.page_map["Bluetooth"].refresh_paired()
+
+    def bluetooth_changed(*_):
+        if run["step"] is not None:
+            run["step"]["ready"] = True
+
+    def open_bluetooth():
+        page = gui.switch_page("Bluetooth")
+        page.backend.devices_changed.connect(bluetooth_changed)
+
+    pages = list(gui.page_factories)
+    steps = [("sidebar", key(k)) for _ in range(5) for k in [Qt.Key.Key_Down] * 3 + [Qt.Key.Key_Up] * 3]
+    steps += [("pages_first_build", lambda n=name: gui.switch_page(n)) for name in pages]
+    steps += [("pages", lambda n=name: gui.switch_page(n)) for _ in range(3) for name in pages]
+    steps.append(("app_grid_setup", focus_first_tile))  # Queues the grid traversal
+    steps.append(("bluetooth_setup", open_bluetooth))
+    steps += [("bluetooth_refresh", refresh_bluetooth)] * args.refreshes
+
+    results = {}
+    meters = {}
+    visited = set()
+    started = time.perf_counter()
+
+    def finish_step(step):
+        scenario = results.setdefault(step["scenario"], {"frames": [], "to_frame": [], "no_frame": 0})
+        scenario["frames"] += step["frames"]
+        if "to_frame" in step:
+            scenario["to_frame"].append(step["to_frame"])
+        else:
+            scenario["no_frame"] += 1
+        scenario["peak_rss_kb"] = _peak_rss_kb()
+        if step["scenario"] == "app_grid":
+            visited.add(gui.page_map["Launch Application"].grid.currentIndex().row())
+
+    def timed_out(step):
+        if run["step"] is step:  # Nothing was painted in time (e.g. focus could not move)
+            run["step"] = None
+            next_step()
+
+    def next_step():
+        if run.get("last"):
+            finish_step(run["last"])
+        if not steps:
+            for meter in meters.values():
+                meter.stop()
+            app.quit()
+            return
+        scenario, action = steps.pop(0)
+        if scenario not in meters:
+            for meter in meters.values():
+                meter.stop()
+            meters[scenario] = LoopStallMeter()
+            meters[scenario].start()
+        step = {"scenario": scenario, "frames": [], "ready": True, "start": time.perf_counter()}
+        run["step"] = run["last"] = step
+        action()
+        QTimer.singleShot(args.step_timeout_ms, lambda: timed_out(step))
+
+    QTimer.singleShot(500, next_step)  # Let the first frame and startup work settle
+    app.exec()
+
+    report = {}
+    for name, scenario in results.items():
+        entry = {"steps": len(scenario["to_frame"]) + scenario["no_frame"],
+                 "steps_without_frame": scenario["no_frame"],
+                 "frames": len(scenario["frames"]), "peak_rss_kb": scenario["peak_rss_kb"]}
+        if scenario["frames"]:
+            entry["frame_ms"] = _summary(scenario["frames"])
+        if scenario["to_frame"]:
+            entry["input_to_frame_ms"] = _summary(scenario["to_frame"])
+        entry["event_loop"] = meters[name].result()
+        report[name] = entry
+    report["app_grid"]["tiles_visited"] = len(visited | {0})  # Plus the tile focused in setup
+    return {"apps": args.apps, "devices": args.devices, "scenarios": report,
+            "peak_rss_kb": _peak_rss_kb(), "wall_s": round(time.perf_counter() - started, 3)}
+
+
+def bench_launch(args):
+    """
+    Fullscreen app round trip with a dummy child: launch until the GUI is
+    hidden, and child exit until the resident GUI has painted again.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    replay = os.path.join(tempfile.mkdtemp(prefix="steamlink-bench-"), "empty.rec")
+    open(replay, "w").close()
+    os.environ["STEAMLINK_INPUT_REPLAY"] = replay
+
+    from PyQt6.QtCore import QEvent, QTimer
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication([])
+    import control_server
+    import gui_mainmenu
+    import launcher
+
+    stamp = os.path.join(tempfile.mkdtemp(prefix="steamlink-bench-"), "exited")
+    # The child records the moment it is about to exit (CLOCK_MONOTONIC is system-wide)
+    child = f"{sys.executable} -c 'import time; time.sleep({args.child_s}); " \
+            f"open(\"{stamp}\", \"w\").write(repr(time.monotonic()))'"
+    hide_ms, back_ms, codes, failures = [], [], [], []
+    run = {}
+
+    class TimedGUI(gui_mainmenu.SteamlinkGUI):
+        def event(self, event):
+            result = super().event(event)
+            if event.type() == QEvent.Type.UpdateRequest and run.get("waiting"):
+                run["waiting"] = False
+                with open(stamp) as f:
+                    back_ms.append((time.monotonic() - float(f.read())) * 1000)
+                QTimer.singleShot(50, launch)
+            return result
+
+        def _app_started(self, command):
+            super()._app_started(command)
+            hide_ms.append((time.monotonic() - run["launched"]) * 1000)
+            # --show/--page while the app runs must not bring the GUI back over it
+            for request in ({"cmd": "show"}, {"cmd": "page", "name": "Bluetooth"}):
+                reply = server.handle(request)
+                if reply["ok"] or not self.hibernating:
+                    failures.append(f"{request['cmd']} during the app: {reply}, hibernating={self.hibernating}")
+
+        def _app_finished(self, command, code):
+            codes.append(code)
+            run["waiting"] = True
+            super()._app_finished(command, code)
+
+    gui = TimedGUI(prebuild=False)
+    gui.show()
+    server = control_server.ControlServer(gui)  # Handles requests directly; no socket
+
+    def launch():
+        if len(back_ms) == args.runs:
+            app.quit()
+            return
+        run["launched"] = time.monotonic()
+        launcher.supervisor().launch(child, fullscreen=True)
+
+    QTimer.singleShot(300, launch)
+    QTimer.singleShot(int((args.child_s + 5) * args.runs * 1000), app.quit)  # Safety net
+    with contextlib.redirect_stdout(sys.stderr):  # Launch/exit log lines; stdout is for the JSON
+        app.exec()
+
+    summary = lambda ms: _summary([v / 1000 for v in ms]) if ms else {}
+    return {"runs": len(back_ms), "child_s": args.child_s, "exit_codes": sorted(set(codes)),
+            "launch_to_hidden_ms": summary(hide_ms), "child_exit_to_gui_painted_ms": summary(back_ms),
+            "failures": failures}
+
+
+def _process_counters():
+    """(VmRSS in KiB, voluntary context switches summed over live threads)."""
+    rss = 0
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1])
+    switches = 0
+    for task in os.listdir("/proc/self/task"):
+        try:
+            with open(f"/proc/self/task/{task}/status") as f:
+                for line in f:
+                    if line.startswith("voluntary_ctxt_switches:"):
+                        switches += int(line.split()[1])
+        except OSError:
+            pass  # Thread exited meanwhile
+    return rss, switches
+
+
+def bench_hibernate(args):
+    """
+    RSS and wakeups per second of the idle GUI (all pages built, app grid
+    showing its icons), hibernated as while Steam Link runs, and resumed.
+    A wakeup is a voluntary context switch of any thread of this process.
+    """
+    _use_1080p_screen()
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ["STEAMLINK_ICON_CACHE"] = tempfile.mkdtemp(prefix="steamlink-bench-cache-")
+    os.environ["STEAMLINK_BT_BACKEND"] = "bluetoothctl"
+    state = os.path.join(tempfile.mkdtemp(prefix="steamlink-bench-"), "connected")
+    install_fake_tool("bluetoothctl", FAKE_BLUETOOTHCTL_TABLE.format(last=args.devices - 1, state=state))
+    install_fake_tool("pactl", FAKE_PACTL)
+    # The controller uses whatever input backend this machine offers
+
+    from PyQt6.QtCore import QEvent, QEventLoop, QTimer
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication([])
+    import animated_button
+    import gui_mainmenu
+    from menu_application import ApplicationMenu
+    app.setStyleSheet(THEME + animated_button.STYLESHEET)
+    programs_file, icons_dir = make_synthetic_apps(args.apps, (200, 300))
+
+    painted = []
+
+    class WatchedGUI(gui_mainmenu.SteamlinkGUI):
+        def event(self, event):
+            result = super().event(event)
+            if event.type() == QEvent.Type.UpdateRequest:
+                painted.append(time.perf_counter())
+            return result
+
+    def idle(seconds):
+        loop = QEventLoop()
+        QTimer.singleShot(int(seconds * 1000), loop.quit)
+        loop.exec()
+
+    def measure():
+        rss, switches = _process_counters()
+        started = time.perf_counter()
+        idle(args.seconds)
+        elapsed = time.perf_counter() - started
+        rss_end, switches_end = _process_counters()
+        return {"rss_kb": rss_end, "wakeups_per_s": round((switches_end - switches) / elapsed, 1),
+                "threads": len(os.listdir("/proc/self/task"))}
+
+    states, result = {}, {}
+
+    def scenario():
+        gui = WatchedGUI(prebuild=False)
+        gui.page_factories["Launch Application"] = lambda: ApplicationMenu(programs_file, icons_dir)
+        gui.show()
+        app.processEvents()
+        QApplication.setActiveWindow(gui)
+        for name in reversed(list(gui.page_factories)):
+            gui.switch_page(name)  # Every page built; the app grid ends up on screen
+        menu = gui.page_map["Launch Application"]
+        menu.grid.setCurrentIndex(menu.model.index(min(args.apps - 1, 37)))
+        menu.setFocus()
+        idle(args.settle)  # First paint, visible icons loaded, controller started
+        page, focus = gui.pages.currentWidget(), QApplication.focusWidget()
+        states["active"] = measure()
+        states["active"]["icons_in_memory"] = len(menu.model.pixmaps)
+
+        started = time.perf_counter()
+        gui.hibernate()
+        result["hibernate_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        idle(args.settle)
+        states["hibernated"] = measure()
+        states["hibernated"]["icons_in_memory"] = len(menu.model.pixmaps)
+
+        painted.clear()
+        started = time.perf_counter()
+        gui.resume()
+        result["resume_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        idle(args.settle)
+        result["resume_to_frame_ms"] = round((painted[0] - started) * 1000, 2) if painted else None
+        states["resumed"] = measure()
+        states["resumed"]["icons_in_memory"] = len(menu.model.pixmaps)
+        result["restored"] = {"page": gui.pages.currentWidget() is page,
+                              "focus": QApplication.focusWidget() is focus}
+        result["controller_backend"] = type(gui.controller_thread.backend).__name__
+        gui.controller_thread.shutdown()
+        app.quit()
+
+    QTimer.singleShot(0, scenario)
+    with contextlib.redirect_stdout(sys.stderr):  # pygame banner and GUI log lines
+        app.exec()
+
+    return {"apps": args.apps, "seconds": args.seconds, "states": states, **result}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("spawn", help="system command latency")
+    p.add_argument("--runs", type=int, default=200)
+    p.add_argument("--ballast-mb", type=int, default=150)
+    p.set_defaults(func=bench_spawn)
+
+    p = sub.add_parser("sink", help="volume bar against a fake pactl event stream (check)")
+    p.add_argument("--settle", type=float, default=1.0)
+    p.add_argument("--gap", type=float, default=0.3)
+    p.set_defaults(func=bench_sink)
+
+    p = sub.add_parser("stall", help="event-loop stall while pairing a Bluetooth device")
+    p.add_argument("--pair-delay", type=float, default=3.0)
+    p.add_argument("--refuse", action="store_true", help="the fake bluetoothctl refuses to pair")
+    p.add_argument("--tool-delay", type=float, default=0.3, help="seconds per fake tvservice/fbset run")
+    p.add_argument("--max-stall-ms", type=float, default=100.0, help="fail above this event-loop stall")
+    p.set_defaults(func=bench_stall)
+
+    p = sub.add_parser("bluez", help="D-Bus Bluetooth backend against a mock BlueZ on a private bus (check)")
+    p.add_argument("--service", default="org.bluez")
+    p.add_argument("--paired", type=int, default=2)
+    p.add_argument("--nearby", type=int, default=3)
+    p.set_defaults(func=bench_bluez)
+
+    p = sub.add_parser("startup", help="time to first frame of the main window")
+    p.add_argument("--eager", action="store_true", help="build every page up front (old behaviour)")
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("icons", help="Applications page with many synthetic entries")
+    p.add_argument("--entries", type=int, default=120)
+    p.add_argument("--icon-size", default="800x1200")
+    p.set_defaults(func=bench_icons)
+
+    p = sub.add_parser("focus", help="focus changes per second across AnimatedButtons")
+    p.add_argument("--buttons", type=int, default=20)
+    p.add_argument("--seconds", type=float, default=3.0)
+    p.set_defaults(func=bench_focus)
+
+    p = sub.add_parser("ui", help="scripted navigation of the whole GUI with fake backends")
+    p.add_argument("--apps", type=int, default=200)
+    p.add_argument("--devices", type=int, default=8)
+    p.add_argument("--refreshes", type=int, default=20)
+    p.add_argument("--step-timeout-ms", type=int, default=250)
+    p.set_defaults(func=bench_ui)
+
+    p = sub.add_parser("launch", help="fullscreen app launch and return to the resident GUI")
+    p.add_argument("--runs", type=int, default=10)
+    p.add_argument("--child-s", type=float, default=0.2)
+    p.set_defaults(func=bench_launch)
+
+    p = sub.add_parser("hibernate", help="RSS and wakeups with the GUI active and hibernated")
+    p.add_argument("--apps", type=int, default=200)
+    p.add_argument("--devices", type=int, default=8)
+    p.add_argument("--seconds", type=float, default=5.0)
+    p.add_argument("--settle", type=float, default=1.0)
+    p.set_defaults(func=bench_hibernate)
+
+    args = parser.parse_args()
+    result = args.func(args)
+    json.dump({"bench": args.bench, **result}, sys.stdout, indent=2)
+    print()
+    if result.get("failures"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
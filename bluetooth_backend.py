@@ -0,0 +1,633 @@
+"""
+Bluetooth backends for BluetoothMenu.
+
+Devices are plain dicts: {"mac", "name", "paired", "connected"}.
+devices_changed is emitted with the list of paired devices whenever the
+known state changes; the same devices are published to the state store as
+bluetooth.devices (mac -> device).
+
+- BluezDBusBackend talks to org.bluez over one persistent D-Bus connection
+  (dbus-next, optional) and is updated by ObjectManager/PropertiesChanged
+  signals instead of re-querying.
+- BluetoothctlBackend runs bluetoothctl per action (fallback).
+
+Actions never block the GUI thread. They take an optional callback(error)
+that is called on the GUI thread when the action ends (error is None on
+success). Both backends give each action the same time limit
+(ACTION_TIMEOUTS); an action that runs out of time ends with an error.
+
+Discovery streams results: device_discovered fires once per sighting of an
+unpaired device (callers merge by MAC) and discovery_finished when the scan
+ends, times out or is cancelled with stop_discovery().
+"""
+from abc import ABCMeta, abstractmethod
+import asyncio
+import os
+import re
+import signal
+import threading
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+import jobs
+import spawner
+import state
+
+try:
+    from dbus_next import BusType, Message, MessageType, Variant
+    from dbus_next.aio import MessageBus
+    from dbus_next.errors import DBusError
+    from dbus_next.service import ServiceInterface, method
+except Exception:
+    MessageBus = None
+
+BLUEZ = "org.bluez"
+DEVICE_IFACE = "org.bluez.Device1"
+ADAPTER_IFACE = "org.bluez.Adapter1"
+OBJECT_MANAGER = "org.freedesktop.DBus.ObjectManager"
+PROPERTIES = "org.freedesktop.DBus.Properties"
+AGENT_PATH = "/steamlink/agent"
+DISCOVERY_TIMEOUT = 20  # Seconds; the user can stop earlier
+CALL_TIMEOUT = 5        # Seconds for any other BlueZ call
+DEVICES_KEY = "bluetooth.devices"
+
+
+class _BackendMeta(type(QObject), ABCMeta):
+    """Lets a QObject subclass have abstract methods."""
+
+
+class BluetoothBackend(QObject, metaclass=_BackendMeta):
+    """Base class; a backend that leaves out an action cannot be created."""
+    devices_changed = pyqtSignal(list)
+    device_discovered = pyqtSignal(dict)
+    discovery_finished = pyqtSignal()
+    _action_done = pyqtSignal(object, object)  # (callback, error) -> GUI thread
+
+    polled = False  # True when device changes are only seen by re-reading them
+    ACTION_TIMEOUTS = {"pair": 10, "connect": 5, "disconnect": 5, "remove": 5}  # Seconds per action
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()  # Cache is written from worker threads
+        self._devices = {}  # mac -> device dict
+        self._action_done.connect(self._run_callback)
+
+    def _run_callback(self, callback, error):
+        if callback:
+            callback(error)
+
+    def paired_devices(self):
+        with self._lock:
+            return [dict(d) for d in self._devices.values() if d["paired"]]
+
+    def is_connected(self, mac):
+        with self._lock:
+            dev = self._devices.get(mac)
+            return bool(dev and dev["connected"])
+
+    def _emit_changed(self):
+        with self._lock:
+            devices = {mac: dict(d) for mac, d in self._devices.items()}
+        state.store().set(DEVICES_KEY, devices)
+        self.devices_changed.emit(self.paired_devices())
+
+    @abstractmethod
+    def refresh(self, callback=None):
+        """Re-read the devices; devices_changed fires if they differ."""
+
+    @abstractmethod
+    def pair_device(self, mac, callback=None):
+        """Pair (and trust) an unpaired device."""
+
+    @abstractmethod
+    def connect_device(self, mac, callback=None):
+        """Connect a paired device."""
+
+    @abstractmethod
+    def disconnect_device(self, mac, callback=None):
+        """Disconnect a connected device."""
+
+    @abstractmethod
+    def remove_device(self, mac, callback=None):
+        """Forget a device (unpair it)."""
+
+    @abstractmethod
+    def start_discovery(self, timeout=DISCOVERY_TIMEOUT):
+        """Scan for unpaired devices for up to timeout seconds."""
+
+    @abstractmethod
+    def stop_discovery(self):
+        """End a running scan; discovery_finished follows."""
+
+    @abstractmethod
+    def is_discovering(self):
+        """Whether a scan is running."""
+
+    def close(self):
+        pass
+
+
+def parse_device_lines(output):
+    """Parse 'Device <MAC> <Name>' lines from bluetoothctl."""
+    devices = []
+    for line in output.splitlines():
+        if line.startswith("Device "):
+            parts = line.split(maxsplit=2)
+            if len(parts) >= 2:
+                devices.append({"mac": parts[1], "name": parts[2] if len(parts) == 3 else parts[1]})
+    return devices
+
+
+ANSI_RE = re.compile(r"\x1b\[[0-9;]*m|\x01|\x02")
+SCAN_LINE_RE = re.compile(r"\[(NEW|CHG)\] Device ([0-9A-Fa-f:]{17}) (.*)")
+# Older bluetoothctl exits 0 even when the action failed, so its output is checked too
+ACTION_FAILED_RE = re.compile(r"^.*(?:Failed to \w+|not available).*$", re.MULTILINE)
+
+
+class BluetoothctlError(RuntimeError):
+    """A bluetoothctl action that failed or timed out."""
+
+
+class DiscoverableScanner(QThread):
+    """
+    Streams `bluetoothctl scan on` output and emits each unpaired device as
+    soon as it is seen. stop() ends the scan early; the scan process is
+    always terminated and reaped.
+    """
+    device_found = pyqtSignal(dict)
+
+    def __init__(self, backend, timeout=DISCOVERY_TIMEOUT, parent=None):
+        super().__init__(parent)
+        self.backend = backend
+        self.timeout = timeout
+        self._proc = None
+        self._stopping = False
+
+    def stop(self):
+        self._stopping = True
+        self._terminate()
+
+    def _terminate(self):
+        # Scanner runs in its own process group so nothing it started keeps the pipe open
+        proc = self._proc
+        if proc and proc.poll() is None:
+            try:
+                os.killpg(proc.pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    def run(self):
+        # Names of devices BlueZ already knows; they may only show up as [CHG] lines
+        try:
+            result = spawner.run(["bluetoothctl", "devices"], capture_output=True, text=True, timeout=5)
+            names = {d["mac"]: d["name"] for d in parse_device_lines(result.stdout)}
+        except Exception:
+            names = {}
+
+        try:
+            self._proc = spawner.Popen(["bluetoothctl", "--timeout", str(self.timeout), "scan", "on"],
+                                       stdin=spawner.DEVNULL, stdout=spawner.PIPE,
+                                       stderr=spawner.DEVNULL, text=True, start_new_session=True)
+        except Exception as e:
+            print(f"Bluetooth scan failed: {e}")
+            return
+        if self._stopping:
+            self._terminate()
+
+        try:
+            for line in self._proc.stdout:
+                match = SCAN_LINE_RE.search(ANSI_RE.sub("", line))
+                if not match:
+                    continue
+                kind, mac, rest = match.groups()
+                mac = mac.upper()
+                if kind == "NEW":
+                    names[mac] = rest.strip() or mac
+                elif rest.startswith(("Name: ", "Alias: ")):
+                    names[mac] = rest.split(": ", 1)[1].strip()
+                paired = {d["mac"] for d in self.backend.paired_devices()}
+                if mac not in paired:
+                    self.device_found.emit({"mac": mac, "name": names.get(mac, mac)})
+        finally:
+            self._terminate()
+            try:
+                self._proc.wait(5)
+            except spawner.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+            self._proc.stdout.close()
+            self._proc = None
+
+
+class BluetoothctlBackend(BluetoothBackend):
+    """Runs one bluetoothctl per query/action and re-reads state afterwards."""
+    polled = True
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._scanner = None
+        state.store().define(DEVICES_KEY, self._query_devices, ttl=2.0, commands=2)
+
+    def _bluetoothctl(self, *args, timeout=5):
+        return spawner.run(["bluetoothctl", *args], capture_output=True, text=True, timeout=timeout)
+
+    def _read_devices(self):
+        """Worker thread: paired/connected devices through the state store."""
+        return state.store().value(DEVICES_KEY)
+
+    def _act(self, *action):
+        """
+        Worker thread: run one action, then re-read the devices (a failed
+        action may still have changed them). Returns (devices, error).
+        """
+        *args, timeout = action
+        error = None
+        try:
+            result = self._bluetoothctl(*args, timeout=timeout)
+            failed = ACTION_FAILED_RE.search(ANSI_RE.sub("", f"{result.stdout}\n{result.stderr}"))
+            if failed:
+                error = BluetoothctlError(failed.group(0).strip())
+            elif result.returncode:
+                error = BluetoothctlError(f"bluetoothctl {args[0]} exited with {result.returncode}")
+        except spawner.TimeoutExpired:
+            error = BluetoothctlError(f"bluetoothctl {' '.join(args)} timed out")
+        if error:
+            print(f"Bluetooth {' '.join(args)} failed: {error}")
+        return state.store().refresh(DEVICES_KEY), error
+
+    def _query_devices(self):
+        paired = parse_device_lines(self._bluetoothctl("paired-devices").stdout)
+        connected = {d["mac"] for d in parse_device_lines(self._bluetoothctl("devices", "Connected").stdout)}
+        return {
+            d["mac"]: {"mac": d["mac"], "name": d["name"], "paired": True, "connected": d["mac"] in connected}
+            for d in paired
+        }
+
+    def _store(self, devices, error, callback):
+        with self._lock:
+            self._devices = devices
+        self._emit_changed()
+        self._run_callback(callback, error)
+
+    def read_devices(self):
+        """Worker thread: the current paired/connected devices (for a poller)."""
+        return self._read_devices()
+
+    def set_devices(self, devices):
+        """Store re-read devices; emits devices_changed and returns True if they differ."""
+        with self._lock:
+            if devices == self._devices:
+                return False
+            self._devices = devices
+        self._emit_changed()
+        return True
+
+    def _run(self, action, callback):
+        # The job timeout is a backstop; each bluetoothctl run has its own timeout
+        jobs.executor().submit(self._act, *action, timeout=action[-1] + 15,
+                               on_done=lambda result: self._store(*result, callback),
+                               on_error=lambda e: self._run_callback(callback, e))
+
+    def refresh(self, callback=None):
+        jobs.executor().submit(self._read_devices, timeout=15,
+                               on_done=lambda devices: self._store(devices, None, callback),
+                               on_error=lambda e: self._run_callback(callback, e))
+
+    def pair_device(self, mac, callback=None):
+        self._run(("pair", mac, self.ACTION_TIMEOUTS["pair"]), callback)
+
+    def connect_device(self, mac, callback=None):
+        self._run(("connect", mac, self.ACTION_TIMEOUTS["connect"]), callback)
+
+    def disconnect_device(self, mac, callback=None):
+        self._run(("disconnect", mac, self.ACTION_TIMEOUTS["disconnect"]), callback)
+
+    def remove_device(self, mac, callback=None):
+        self._run(("remove", mac, self.ACTION_TIMEOUTS["remove"]), callback)
+
+    def start_discovery(self, timeout=DISCOVERY_TIMEOUT):
+        if self.is_discovering():
+            return
+        self._scanner = DiscoverableScanner(self, timeout, self)
+        self._scanner.device_found.connect(self.device_discovered)
+        self._scanner.finished.connect(self.discovery_finished)
+        self._scanner.start()
+
+    def stop_discovery(self):
+        if self._scanner:
+            self._scanner.stop()
+
+    def is_discovering(self):
+        return bool(self._scanner and self._scanner.isRunning())
+
+    def close(self):
+        if self._scanner:
+            self._scanner.stop()
+            self._scanner.wait(5000)
+
+
+if MessageBus:
+    class _PairingAgent(ServiceInterface):
+        """NoInputNoOutput agent so controllers pair without a PIN prompt."""
+
+        def __init__(self):
+            super().__init__("org.bluez.Agent1")
+
+        @method()
+        def Release(self):
+            pass
+
+        @method()
+        def RequestAuthorization(self, device: "o"):
+            pass
+
+        @method()
+        def RequestConfirmation(self, device: "o", passkey: "u"):
+            pass
+
+        @method()
+        def AuthorizeService(self, device: "o", uuid: "s"):
+            pass
+
+        @method()
+        def Cancel(self):
+            pass
+
+
+class BluezDBusBackend(BluetoothBackend):
+    """
+    Talks to BlueZ over a single D-Bus connection owned by a private asyncio
+    loop thread. The cache is seeded from GetManagedObjects and then kept up
+    to date from InterfacesAdded/InterfacesRemoved/PropertiesChanged.
+
+    bus_address/service let the backend run against a mock BlueZ on a
+    private session bus (mock_bluez.py; `python3 benchmark.py bluez`).
+    """
+    CONNECT_TIMEOUT = 3.0
+
+    def __init__(self, bus_address=None, service=BLUEZ, parent=None):
+        super().__init__(parent)
+        if MessageBus is None:
+            raise RuntimeError("dbus-next is not installed")
+        self.bus_address = bus_address
+        self.service = service
+        self._bus = None
+        self._paths = {}       # object path -> mac
+        self._adapter = None   # object path of the first adapter
+        self._agent = None     # Exported once; registered again after a bluetoothd restart
+        self._discovering = False
+        self._discovery_timer = None
+        self._ready = threading.Event()
+        self._error = None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+
+        if not self._ready.wait(self.CONNECT_TIMEOUT) or self._error:
+            self.close()
+            raise RuntimeError(f"BlueZ D-Bus unavailable: {self._error or 'timeout'}")
+
+    # ---- Loop thread ----
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.create_task(self._start())
+        self._loop.run_forever()
+
+    async def _start(self):
+        try:
+            if self.bus_address:
+                self._bus = await MessageBus(bus_address=self.bus_address).connect()
+            else:
+                self._bus = await MessageBus(bus_type=BusType.SYSTEM).connect()
+            self._bus.add_message_handler(self._on_message)
+            for rule in (
+                f"type='signal',sender='{self.service}',interface='{OBJECT_MANAGER}'",
+                f"type='signal',sender='{self.service}',interface='{PROPERTIES}',"
+                f"member='PropertiesChanged',arg0='{DEVICE_IFACE}'",
+                f"type='signal',interface='org.freedesktop.DBus',member='NameOwnerChanged',"
+                f"arg0='{self.service}'",
+            ):
+                await self._call("org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus",
+                                 "AddMatch", "s", [rule])
+            await self._load_objects()
+        except Exception as e:
+            self._error = e
+        self._ready.set()
+        if not self._error:
+            await self._register_agent()
+
+    async def _call(self, destination, path, interface, member, signature="", body=(), timeout=CALL_TIMEOUT):
+        """One method call; raises TimeoutError if BlueZ (or the agent) does not answer in time."""
+        try:
+            reply = await asyncio.wait_for(
+                self._bus.call(Message(destination=destination, path=path, interface=interface,
+                                       member=member, signature=signature, body=list(body))),
+                timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"{member} timed out after {timeout:g} s") from None
+        if reply.message_type == MessageType.ERROR:
+            raise DBusError(reply.error_name, reply.body[0] if reply.body else "")
+        return reply.body
+
+    async def _load_objects(self):
+        body = await self._call(self.service, "/", OBJECT_MANAGER, "GetManagedObjects")
+        with self._lock:
+            self._devices.clear()
+            self._paths.clear()
+            for path, interfaces in body[0].items():
+                self._add_object(path, interfaces)
+        self._emit_changed()
+
+    async def _register_agent(self):
+        try:
+            if self._agent is None:
+                self._agent = _PairingAgent()
+                self._bus.export(AGENT_PATH, self._agent)
+            await self._call(self.service, "/org/bluez", "org.bluez.AgentManager1",
+                             "RegisterAgent", "os", [AGENT_PATH, "NoInputNoOutput"])
+            await self._call(self.service, "/org/bluez", "org.bluez.AgentManager1",
+                             "RequestDefaultAgent", "o", [AGENT_PATH])
+        except Exception as e:
+            print(f"Bluetooth agent registration failed: {e}")
+
+    def _add_object(self, path, interfaces):
+        """Caller holds self._lock. Returns True if a device was added/updated."""
+        if ADAPTER_IFACE in interfaces and self._adapter is None:
+            self._adapter = path
+        props = interfaces.get(DEVICE_IFACE)
+        if props is None:
+            return False
+        mac = _value(props.get("Address")) or path.rsplit("/", 1)[-1][4:].replace("_", ":")
+        self._paths[path] = mac
+        self._devices[mac] = {
+            "mac": mac,
+            "name": _value(props.get("Alias")) or _value(props.get("Name")) or mac,
+            "paired": bool(_value(props.get("Paired"))),
+            "connected": bool(_value(props.get("Connected"))),
+        }
+        return True
+
+    def _on_message(self, msg):
+        if msg.message_type != MessageType.SIGNAL:
+            return
+        changed = False
+        seen = None  # Unpaired device sighted during discovery
+        if msg.interface == OBJECT_MANAGER and msg.member == "InterfacesAdded":
+            path, interfaces = msg.body
+            with self._lock:
+                changed = self._add_object(path, interfaces)
+                dev = self._devices.get(self._paths.get(path))
+                if changed and self._discovering and not dev["paired"]:
+                    seen = dict(dev)
+        elif msg.interface == OBJECT_MANAGER and msg.member == "InterfacesRemoved":
+            path, interfaces = msg.body
+            if DEVICE_IFACE in interfaces:
+                with self._lock:
+                    mac = self._paths.pop(path, None)
+                    changed = self._devices.pop(mac, None) is not None
+            if ADAPTER_IFACE in interfaces and path == self._adapter:
+                self._adapter = None
+        elif msg.interface == PROPERTIES and msg.member == "PropertiesChanged":
+            iface, props, _invalidated = msg.body
+            with self._lock:
+                dev = self._devices.get(self._paths.get(msg.path))
+                if iface == DEVICE_IFACE and dev:
+                    for key, field in (("Alias", "name"), ("Paired", "paired"), ("Connected", "connected")):
+                        if key in props:
+                            value = _value(props[key])
+                            value = value if field == "name" else bool(value)
+                            if dev[field] != value:
+                                dev[field] = value
+                                changed = True
+                    # RSSI updates mean an already-known device was just seen again
+                    if self._discovering and not dev["paired"] and ("RSSI" in props or "Alias" in props):
+                        seen = dict(dev)
+        elif msg.member == "NameOwnerChanged" and msg.body and msg.body[0] == self.service:
+            # bluetoothd restarted: drop everything, reload once it is back
+            with self._lock:
+                self._devices.clear()
+                self._paths.clear()
+                self._adapter = None
+            changed = True
+            if msg.body[2]:
+                self._loop.create_task(self._reload())
+        if changed:
+            self._emit_changed()
+        if seen:
+            self.device_discovered.emit(seen)
+
+    async def _reload(self, register_agent=True):
+        try:
+            await self._load_objects()
+            if register_agent:
+                await self._register_agent()
+        except Exception as e:
+            print(f"BlueZ reload failed: {e}")
+
+    def _device_path(self, mac):
+        with self._lock:
+            for path, known in self._paths.items():
+                if known == mac:
+                    return path
+        return None
+
+    async def _device_call(self, mac, member):
+        path = self._device_path(mac)
+        if not path:
+            raise LookupError(f"unknown device {mac}")
+        await self._call(self.service, path, DEVICE_IFACE, member, timeout=self.ACTION_TIMEOUTS[member.lower()])
+        if member == "Pair":
+            await self._call(self.service, path, PROPERTIES, "Set", "ssv",
+                             [DEVICE_IFACE, "Trusted", Variant("b", True)])
+
+    async def _remove(self, mac):
+        path = self._device_path(mac)
+        if not path or not self._adapter:
+            raise LookupError(f"unknown device {mac}")
+        await self._call(self.service, self._adapter, ADAPTER_IFACE, "RemoveDevice", "o", [path],
+                         timeout=self.ACTION_TIMEOUTS["remove"])
+
+    async def _start_discovery(self, timeout):
+        if self._discovering or not self._adapter:
+            if not self._adapter:
+                self.discovery_finished.emit()
+            return
+        try:
+            await self._call(self.service, self._adapter, ADAPTER_IFACE, "StartDiscovery")
+        except Exception as e:
+            print(f"Bluetooth discovery failed: {e}")
+            self.discovery_finished.emit()
+            return
+        self._discovering = True
+        self._discovery_timer = self._loop.call_later(timeout, lambda: self._loop.create_task(self._stop_discovery()))
+
+    async def _stop_discovery(self):
+        if not self._discovering:
+            return
+        self._discovering = False
+        if self._discovery_timer:
+            self._discovery_timer.cancel()
+            self._discovery_timer = None
+        try:
+            await self._call(self.service, self._adapter, ADAPTER_IFACE, "StopDiscovery")
+        except Exception:
+            pass  # Adapter gone or discovery already stopped
+        self.discovery_finished.emit()
+
+    # ---- GUI thread API (non-blocking; results arrive as signals) ----
+    def _submit(self, coro, callback=None, label=""):
+        def done(future):
+            error = None if future.cancelled() else future.exception()
+            if error:
+                print(f"Bluetooth {label} failed: {error}")
+            self._action_done.emit(callback, error)
+
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        future.add_done_callback(done)
+        return future
+
+    def refresh(self, callback=None):
+        self._submit(self._reload(register_agent=False), callback, "refresh")
+
+    def pair_device(self, mac, callback=None):
+        self._submit(self._device_call(mac, "Pair"), callback, f"pair {mac}")
+
+    def connect_device(self, mac, callback=None):
+        self._submit(self._device_call(mac, "Connect"), callback, f"connect {mac}")
+
+    def disconnect_device(self, mac, callback=None):
+        self._submit(self._device_call(mac, "Disconnect"), callback, f"disconnect {mac}")
+
+    def remove_device(self, mac, callback=None):
+        self._submit(self._remove(mac), callback, f"remove {mac}")
+
+    def start_discovery(self, timeout=DISCOVERY_TIMEOUT):
+        self._submit(self._start_discovery(timeout))
+
+    def stop_discovery(self):
+        self._submit(self._stop_discovery())
+
+    def is_discovering(self):
+        return self._discovering
+
+    def close(self):
+        if self._bus:
+            self._loop.call_soon_threadsafe(self._bus.disconnect)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def _value(v):
+    return v.value if isinstance(v, Variant) else v
+
+
+def create_backend(parent=None):
+    """D-Bus backend when dbus-next and bluetoothd are available, else bluetoothctl."""
+    choice = os.environ.get("STEAMLINK_BT_BACKEND", "auto")
+    if choice in ("auto", "dbus") and MessageBus:
+        try:
+            return BluezDBusBackend(parent=parent)
+        except Exception as e:
+            print(f"{e} — falling back to bluetoothctl.")
+    backend = BluetoothctlBackend(parent)
+    backend.refresh()  # Async; the menu fills in on devices_changed
+    return backend
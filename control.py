@@ -0,0 +1,152 @@
+"""
+Single-instance control of a running GUI over a Unix domain socket.
+
+    python3 main.py                      # Start, or bring the running one to the front
+    python3 main.py --page Bluetooth     # Switch page (starting the GUI if needed)
+    python3 main.py --launch "Steam Link"
+    python3 main.py --hide | --show | --reload | --stats | --quit
+    python3 main.py --supervise          # Restart the GUI with backoff if it crashes
+
+The running instance listens on STEAMLINK_CONTROL_SOCKET (default
+$XDG_RUNTIME_DIR/steamlink-gui.sock). A request is one JSON object per line,
+{"cmd": "page", "name": "Bluetooth"}, answered with one JSON line that has
+"ok" and either the result or "error":
+
+    echo '{"cmd": "stats"}' | socat - UNIX-CONNECT:$XDG_RUNTIME_DIR/steamlink-gui.sock
+
+This module only uses the standard library, so a second invocation can hand
+its request over and exit before PyQt6 or pygame are imported.
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+CONNECT_TIMEOUT = 2.0  # A busy GUI answers between two event-loop passes
+RESTART_DELAY = 1.0    # Supervisor: first restart delay after a crash
+MAX_RESTART_DELAY = 30.0
+HEALTHY_AFTER = 60.0   # A run this long resets the backoff
+
+# Requests that need a running instance; the others start one if there is none
+NEEDS_INSTANCE = {"hide", "stats", "quit"}
+
+
+def socket_path():
+    if os.environ.get("STEAMLINK_CONTROL_SOCKET"):
+        return os.environ["STEAMLINK_CONTROL_SOCKET"]
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, "steamlink-gui.sock")
+    return f"/tmp/steamlink-gui-{os.getuid()}.sock"
+
+
+def parse_args(argv):
+    """Control options from argv; anything else (Qt, --profile-startup) is left alone."""
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--show", action="store_const", dest="cmd", const="show")
+    group.add_argument("--hide", action="store_const", dest="cmd", const="hide")
+    group.add_argument("--page", metavar="NAME")
+    group.add_argument("--launch", metavar="APP")
+    group.add_argument("--reload", action="store_const", dest="cmd", const="reload")
+    group.add_argument("--stats", action="store_const", dest="cmd", const="stats")
+    group.add_argument("--quit", action="store_const", dest="cmd", const="quit")
+    parser.add_argument("--supervise", action="store_true")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
+def request_from_args(args):
+    """The request for these options; a plain start asks to be shown."""
+    if args.page:
+        return {"cmd": "page", "name": args.page}
+    if args.launch:
+        return {"cmd": "launch", "app": args.launch}
+    return {"cmd": args.cmd or "show"}
+
+
+def send(request, path=None, timeout=CONNECT_TIMEOUT):
+    """
+    Send one request to the running instance and return its reply, or None
+    if no instance is listening (no socket, or a stale one).
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path or socket_path())
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    try:
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            reply += chunk
+    except socket.timeout:
+        print(f"Running instance did not answer within {timeout:.0f}s", file=sys.stderr)
+        return None
+    finally:
+        sock.close()
+    try:
+        return json.loads(reply)
+    except ValueError:
+        return None
+
+
+def forward(args):
+    """
+    Hand this invocation's request to a running instance. Returns the exit
+    code to leave with, or None if this process should start the GUI itself.
+    """
+    request = request_from_args(args)
+    reply = send(request)
+    if reply is None:
+        if request["cmd"] in NEEDS_INSTANCE:
+            print("Steamlink GUI is not running", file=sys.stderr)
+            return 1
+        return None
+    print(json.dumps(reply, indent=2))
+    return 0 if reply.get("ok") else 1
+
+
+def supervise(argv):
+    """
+    Run main.py (without --supervise) as a child and restart it when it dies
+    with an error. A clean exit (status 0, e.g. --quit) ends supervision.
+    SIGTERM/SIGINT are passed on to the GUI.
+    """
+    args = [sys.executable, os.path.abspath(sys.argv[0])] + [a for a in argv if a != "--supervise"]
+    state = {"child": None, "stopping": False}
+
+    def stop(signum, frame):
+        state["stopping"] = True
+        if state["child"] and state["child"].poll() is None:
+            state["child"].send_signal(signum)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    delay = RESTART_DELAY
+    while True:
+        started = time.monotonic()
+        state["child"] = subprocess.Popen(args)
+        code = state["child"].wait()
+        if code == 0 or state["stopping"]:
+            return code
+        # Reset the backoff if it had been healthy for a while
+        if time.monotonic() - started > HEALTHY_AFTER:
+            delay = RESTART_DELAY
+        print(f"Steamlink GUI exited with {code}; restarting in {delay:.0f}s", file=sys.stderr)
+        end = time.monotonic() + delay
+        while not state["stopping"] and time.monotonic() < end:
+            time.sleep(0.1)
+        if state["stopping"]:
+            return code
+        delay = min(delay * 2, MAX_RESTART_DELAY)
@@ -0,0 +1,181 @@
+"""
+GUI side of the control socket (see control.py for the protocol).
+
+    server = control_server.ControlServer(gui)
+    server.listen()
+
+Requests are read and answered on the GUI thread between event-loop passes,
+so handlers can touch widgets directly.
+"""
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtNetwork import QLocalServer
+from PyQt6.QtWidgets import QApplication
+import json
+import os
+import time
+import control
+import icon_cache
+import latency
+import poller
+import state
+
+MAX_REQUEST = 64 * 1024  # Bytes; a longer line without a newline is dropped
+
+
+class ControlServer(QObject):
+    def __init__(self, gui, path=None, parent=None):
+        super().__init__(parent)
+        self.gui = gui
+        self.path = path or control.socket_path()
+        self.started = time.monotonic()
+        self.requests = 0
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._accept)
+
+    def listen(self):
+        """Take over the socket path (a leftover from a crashed run is removed)."""
+        QLocalServer.removeServer(self.path)
+        if not self.server.listen(self.path):
+            print(f"Control socket unavailable: {self.server.errorString()}")
+            return False
+        app = QApplication.instance()
+        if app:
+            app.aboutToQuit.connect(self.close)
+        return True
+
+    def close(self):
+        self.server.close()  # Also removes the socket file
+
+    def _accept(self):
+        while self.server.hasPendingConnections():
+            conn = self.server.nextPendingConnection()
+            conn.readyRead.connect(lambda c=conn: self._read(c))
+            conn.disconnected.connect(conn.deleteLater)
+
+    def _read(self, conn):
+        if not conn.canReadLine():
+            if conn.bytesAvailable() > MAX_REQUEST:
+                conn.abort()
+            return
+        line = bytes(conn.readLine()).strip()
+        try:
+            request = json.loads(line)
+            reply = self.handle(request) if isinstance(request, dict) else self._error("expected a JSON object")
+        except ValueError as e:
+            reply = self._error(f"bad request: {e}")
+        conn.write(json.dumps(reply).encode() + b"\n")
+        conn.flush()
+        conn.disconnectFromServer()  # After the reply has been written
+
+    @staticmethod
+    def _error(message):
+        return {"ok": False, "error": message}
+
+    def handle(self, request):
+        """Run one request; returns the reply dict."""
+        self.requests += 1
+        cmd = request.get("cmd")
+        handler = getattr(self, f"cmd_{cmd}", None) if isinstance(cmd, str) else None
+        if handler is None:
+            return self._error(f"unknown command: {cmd!r}")
+        try:
+            result = handler(request)
+        except Exception as e:
+            print(f"Control request {cmd} failed: {e}")
+            return self._error(str(e))
+        if isinstance(result, str):
+            return self._error(result)
+        return dict(ok=True, **(result or {}))
+
+    # Handlers get the request and return a result dict, or an error string
+
+    def _busy(self):
+        """Error string while a fullscreen app has the screen and the pads, else None."""
+        app = self.gui.launcher.foreground()
+        return f"{app.command} is running" if app else None
+
+    def cmd_show(self, request):
+        busy = self._busy()
+        if busy:
+            return busy  # Resuming now would put the GUI and its controller reader over the app
+        if self.gui.hibernating:
+            self.gui.resume()
+        else:
+            self.gui.showFullScreen()
+            self.gui.raise_()
+            self.gui.activateWindow()
+
+    def cmd_hide(self, request):
+        self.gui.hibernate()
+
+    def cmd_page(self, request):
+        name = request.get("name")
+        pages = {page.lower(): page for page in self.gui.page_map}
+        if str(name).lower() not in pages:
+            return f"no page {name!r}; pages: {', '.join(self.gui.page_map)}"
+        name = pages[str(name).lower()]
+        busy = self.cmd_show(request)
+        if busy:
+            return busy
+        self.gui.switch_page(name)
+        for btn in self.gui.menu_buttons:
+            if btn.text() == name:
+                btn.setFocus()
+        return {"page": name}
+
+    def cmd_launch(self, request):
+        """`app` is a name from programs.txt, or else a command line."""
+        app = request.get("app")
+        if not isinstance(app, str) or not app.strip():
+            return "launch needs an app name or command"
+        menu = self.gui.build_page("Launch Application")
+        entry = next((e for e in menu.model.entries if e["name"].lower() == app.strip().lower()), None)
+        command = entry["command"] if entry else app
+        launched = menu.launch_program(command)
+        if launched is None:
+            return f"could not launch {command!r}"
+        return {"command": command, "pid": launched.pid}
+
+    def cmd_reload(self, request):
+        self.gui.build_page("Launch Application").reload()  # programs.txt and icons
+
+    def cmd_stats(self, request):
+        status = {}
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key in ("VmRSS", "VmHWM", "Threads"):
+                        status[key] = int(value.split()[0])
+        except OSError:
+            pass
+        gui = self.gui
+        current = gui.pages.currentWidget()
+        bridge = gui.controller_thread.bridge
+        cache = icon_cache.cache()
+        menu = gui.page_map["Launch Application"]
+        tracer = latency.tracer()
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.monotonic() - self.started, 1),
+            "rss_kb": status.get("VmRSS"),
+            "peak_rss_kb": status.get("VmHWM"),
+            "threads": status.get("Threads"),
+            "hibernating": gui.hibernating,
+            "page": next((name for name, page in gui.page_map.items() if page is current), None),
+            "pages_built": [name for name in gui.page_map if name not in gui.page_factories],
+            "apps": [{"command": app.command, "pid": app.pid, "fullscreen": app.fullscreen,
+                      "running_s": round(time.monotonic() - app.started, 1)}
+                     for app in gui.launcher.apps.values()],
+            "input": {"posted": bridge.posted, "coalesced": bridge.coalesced},
+            "icons": {"cache_hits": cache.hits, "cache_misses": cache.misses,
+                      "in_memory": len(menu.model.pixmaps) if hasattr(menu, "model") else 0},
+            "pollers": poller.scheduler().stats(),
+            "state": state.store().stats(),
+            "control_requests": self.requests,
+            "latency_ms": tracer.percentiles() if tracer else None,
+        }
+
+    def cmd_quit(self, request):
+        QTimer.singleShot(0, QApplication.instance().quit)  # After the reply; status 0, so no restart
@@ -1,100 +1,137 @@
-import pygame
-from threading import Thread
+from threading import Lock, Thread
 import time
-from PyQt6.QtCore import QTimer, Qt
-from PyQt6.QtGui import QKeyEvent  # For simulating keys
+from PyQt6.QtCore import QCoreApplication, QObject, Qt, pyqtSignal
+import input_backend
+import startup_profile
+
+DIRECTION_KEYS = {Qt.Key.Key_Up, Qt.Key.Key_Down, Qt.Key.Key_Left, Qt.Key.Key_Right}
+
+
+class InputRecord:
+    """One key press on its way to the GUI thread."""
+    __slots__ = ("key", "capture", "dispatch")
+
+    def __init__(self, key, capture, dispatch):
+        self.key = key
+        self.capture = capture    # Backend timestamp (monotonic), or None
+        self.dispatch = dispatch  # When the controller thread posted it
+
+
+class InputBridge(QObject):
+    """
+    Carries key presses from the controller thread to the GUI thread through a
+    queued signal. Create it on the GUI thread; post() may be called from any
+    thread. A direction posted while the previous one is still waiting in the
+    event queue replaces it instead of queueing another event, so stick noise
+    cannot pile up when the UI is busy. Buttons are never coalesced, and a
+    direction never jumps ahead of a button posted before it.
+    """
+    _posted = pyqtSignal(object)
+
+    def __init__(self, handle_key, parent=None):
+        super().__init__(parent)
+        self.handle_key = handle_key
+        self.posted = 0
+        self.coalesced = 0
+        self._lock = Lock()
+        self._open = None  # Undelivered direction that later directions may replace
+        self._posted.connect(self._deliver, Qt.ConnectionType.QueuedConnection)
+
+    def post(self, key, capture=None, coalesce=False):
+        now = time.monotonic()
+        with self._lock:
+            self.posted += 1
+            if coalesce and self._open is not None:
+                record = self._open
+                record.key, record.capture, record.dispatch = key, capture, now
+                self.coalesced += 1
+                return
+            record = InputRecord(key, capture, now)
+            self._open = record if coalesce else None
+        self._posted.emit(record)
+
+    def _deliver(self, record):
+        with self._lock:
+            if self._open is record:
+                self._open = None
+            key, capture, dispatch = record.key, record.capture, record.dispatch
+        self.handle_key(key, capture, dispatch)
+
 
 class ControllerThread(Thread):
     def __init__(self, gui):
         super().__init__(daemon=True)
         self.gui = gui
+        self.bridge = InputBridge(gui.handle_key)  # Created here, so it lives on the GUI thread
         self.last_hat_time = 0
         self.last_button_time = {}  # Per-button debounce
         self.debounce_delay = 0.15  # Faster for Zero 2 W
+        self.repeat = input_backend.RepeatScheduler.from_env()  # Held D-pad/stick directions
+        self.backend = None
+        self._stopping = False
 
     def run(self):
-        pygame.init()
-        pygame.joystick.init()
+        with startup_profile.phase("controller backend"):
+            self.backend = input_backend.create_backend()
+        if not getattr(self.backend, "devices", True):
+            print("No joysticks found—check Bluetooth! Waiting for one to connect.")
 
-        if pygame.joystick.get_count() == 0:
-            print("No joysticks found—check Bluetooth!")
-            return
+        while not self._stopping:
+            # Sleep until the pad sends something or a held direction is due to repeat
+            events = self.backend.read_events(self.repeat.next_timeout(time.monotonic()))
+            if events is None:
+                break
+            for event in events:
+                self.handle_event(event)
+            self._repeat_held()
+
+        self.backend.close()
+
+    def start(self):
+        super().start()
+        app = QCoreApplication.instance()
+        if app:
+            # Stop reading before the interpreter shuts pygame/SDL down under us
+            app.aboutToQuit.connect(self.shutdown)
 
-        joystick = None
-        try:
-            joystick = pygame.joystick.Joystick(0)
-            joystick.init()
-            print(f"Controller detected: {joystick.get_name()}")
-        except Exception as e:
-            print(f"Joystick init failed: {e} — Falling back to no controller support.")
+    def stop(self):
+        self._stopping = True
+        if self.backend:
+            self.backend.wakeup()
+
+    def shutdown(self, timeout=1.0):
+        """stop() and wait for the backend to be closed."""
+        app = QCoreApplication.instance()
+        if app:
+            try:
+                app.aboutToQuit.disconnect(self.shutdown)
+            except TypeError:
+                pass  # Already disconnected
+        self.stop()
+        self.join(timeout)
+
+    def handle_event(self, event):
+        now = time.monotonic()
+        if not event.pressed:
+            self.repeat.release(event.key)
             return
 
-        # Safety check: Does it have hats? (Xbox D-pad is hat 0)
-        num_hats = joystick.get_numhats()
-        if num_hats == 0:
-            print("Warning: No hats detected—falling back to axis polling for D-pad.")
-            self.use_axis_fallback = True
+        if event.key not in DIRECTION_KEYS:
+            # Button events (A/B) — per-button debounce
+            last = self.last_button_time.get(event.key)
+            if last is None or now - last > self.debounce_delay:
+                self.last_button_time[event.key] = now
+                self.dispatch(event.key, event.timestamp)
         else:
-            print(f"Hats available: {num_hats}")
-            self.use_axis_fallback = False
-
-        clock = pygame.time.Clock()
-        running = True
-
-        while running:
-            for event in pygame.event.get():  # Event-driven: Safer than raw polling
-                if event.type == pygame.QUIT:
-                    running = False
-                    break
-
-                # Hat events (D-pad) — if available
-                elif event.type == pygame.JOYHATMOTION and not self.use_axis_fallback:
-                    if num_hats > event.hat:  # Valid hat index
-                        hat_pos = event.value  # (-1/0/1, -1/0/1)
-                        now = time.time()
-                        if now - self.last_hat_time > self.debounce_delay:
-                            self.last_hat_time = now
-                            if hat_pos == (0, 1):  # Up
-                                QTimer.singleShot(0, lambda: self.gui.handle_key(Qt.Key.Key_Up))
-                            elif hat_pos == (0, -1):  # Down
-                                QTimer.singleShot(0, lambda: self.gui.handle_key(Qt.Key.Key_Down))
-                            elif hat_pos == (-1, 0):  # Left
-                                QTimer.singleShot(0, lambda: self.gui.handle_key(Qt.Key.Key_Left))
-                            elif hat_pos == (1, 0):  # Right
-                                QTimer.singleShot(0, lambda: self.gui.handle_key(Qt.Key.Key_Right))
-
-                # Button events (A/B) — always active
-                elif event.type == pygame.JOYBUTTONDOWN:
-                    button = event.button
-                    now = time.time()
-                    if button not in self.last_button_time or now - self.last_button_time[button] > self.debounce_delay:
-                        self.last_button_time[button] = now
-                        if button == 0:  # A = Enter
-                            QTimer.singleShot(0, lambda: self.gui.handle_key(Qt.Key.Key_Return))
-                        elif button == 1:  # B = Esc/Back
-                            QTimer.singleShot(0, lambda: self.gui.handle_key(Qt.Key.Key_Escape))
-
-            # Enhanced fallback: Poll axes for D-pad emulation (Xbox BT standard)
-            if self.use_axis_fallback and joystick:
-                deadzone = 0.3  # Tune for stick drift (higher = less sensitive)
-                axis_x = joystick.get_axis(0)  # Left stick X (left/right)
-                axis_y = joystick.get_axis(1)  # Left stick Y (up/down)
-
-                now = time.time()
-                if now - self.last_hat_time > self.debounce_delay:
-                    # Horizontal (Left/Right)
-                    if abs(axis_x) > deadzone:
-                        direction = Qt.Key.Key_Left if axis_x < -deadzone else Qt.Key.Key_Right
-                        self.last_hat_time = now
-                        QTimer.singleShot(0, lambda d=direction: self.gui.handle_key(d))
-
-                    # Vertical (Up/Down) — only if no horizontal to avoid conflicts
-                    elif abs(axis_y) > deadzone:
-                        direction = Qt.Key.Key_Up if axis_y < -deadzone else Qt.Key.Key_Down
-                        self.last_hat_time = now
-                        QTimer.singleShot(0, lambda d=direction: self.gui.handle_key(d))
-
-            pygame.event.pump()  # Keep SDL alive (no display needed)
-            clock.tick(60)  # Smooth 60 FPS polling, low CPU on Zero 2 W
-
-        pygame.quit()
\ No newline at end of file
+            # D-pad/stick directions share one debounce; holding one repeats it
+            if now - self.last_hat_time > self.debounce_delay:
+                self.last_hat_time = now
+                self.dispatch(event.key, event.timestamp, coalesce=True)
+            self.repeat.press(event.key, now)
+
+    def _repeat_held(self):
+        for key in self.repeat.due(time.monotonic()):
+            self.dispatch(key, coalesce=True)
+
+    def dispatch(self, key, timestamp=None, coalesce=False):
+        self.bridge.post(key, timestamp, coalesce)
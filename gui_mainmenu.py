@@ -2,7 +2,7 @@ from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton,
     QVBoxLayout, QHBoxLayout, QStackedLayout, QSizePolicy
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from controller import ControllerThread
 from menu_bluetooth import BluetoothMenu
 from menu_system import SystemMenu
@@ -10,12 +10,31 @@ from menu_volume import VolumeMenu
 from menu_application import ApplicationMenu
 from animated_button import AnimatedButton
 from PyQt6.QtCore import QEvent
-from PyQt6.QtGui import QKeyEvent
-import socket
+from PyQt6.QtGui import QKeyEvent, QPixmapCache
+import ctypes
+import gc
+import launcher
+import poller
+import startup_profile
+import state
+import latency
+
+
+def trim_heap():
+    """Collect garbage and hand freed heap pages back to the kernel (glibc only)."""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
 
 
 class SteamlinkGUI(QWidget):
-    def __init__(self):
+    def __init__(self, prebuild=True):
+        """
+        Pages are built on first use; with prebuild=True the remaining pages are
+        built one per idle tick after the first frame has been painted.
+        """
         super().__init__()
         self.setWindowTitle("Steamlink Companion UI")
 
@@ -44,30 +63,37 @@ class SteamlinkGUI(QWidget):
         sidebar.setSpacing(10)
 
         self.pages = QStackedLayout()
+        self.state = state.store()  # Created here, so its notifications arrive on the GUI thread
 
         # Device Info
         device_label = QLabel("Steamlink Box")
         device_label.setStyleSheet("font-size: 18px; font-weight: bold;")
         ip_label = QLabel("IPv4")
-        ip_value = QLabel(self.get_ip_address())
+        self.ip_value = QLabel(self.get_ip_address())
 
         sidebar.addWidget(device_label)
         sidebar.addWidget(ip_label)
-        sidebar.addWidget(ip_value)
+        sidebar.addWidget(self.ip_value)
         sidebar.addSpacing(10)
 
         # Menu buttons + page mapping
         self.menu_buttons = []
-        self.page_map = {}
+        self.page_map = {}        # name -> page widget (a placeholder until built)
+        self.page_factories = {}  # name -> factory for pages not built yet
+        self.prebuild = prebuild
+        self._painted = False
+        self.hibernating = False
+        self._return_page = None   # Current page and focused widget while a fullscreen app runs
+        self._return_focus = None
 
         buttons_info = [
-            ("Launch Application", ApplicationMenu()),
-            ("Bluetooth", BluetoothMenu()),
-            ("Volume", VolumeMenu()),
-            ("System", SystemMenu()),
+            ("Launch Application", ApplicationMenu),
+            ("Bluetooth", BluetoothMenu),
+            ("Volume", VolumeMenu),
+            ("System", SystemMenu),
         ]
 
-        for i, (text, widget) in enumerate(buttons_info):
+        for i, (text, factory) in enumerate(buttons_info):
             btn = AnimatedButton(text, lambda t=text: self.switch_page(t), self)
             btn.setMinimumHeight(100)
             btn.setSizePolicy(QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Fixed)
@@ -75,8 +101,11 @@ class SteamlinkGUI(QWidget):
             sidebar.addWidget(btn)
             self.menu_buttons.append(btn)
 
-            self.pages.addWidget(widget)
-            self.page_map[text] = widget
+            # Empty stand-in keeps the stack order until the real page is built
+            placeholder = QWidget()
+            self.pages.addWidget(placeholder)
+            self.page_map[text] = placeholder
+            self.page_factories[text] = factory
 
         sidebar.addStretch()
 
@@ -88,32 +117,153 @@ class SteamlinkGUI(QWidget):
         if self.menu_buttons:
             self.menu_buttons[0].setFocus()
 
-        # Controller handling
-        def handle_key(self, key):
-            """Simulate a key press for controller input."""
-            event = QKeyEvent(QEvent.Type.KeyPress, key, Qt.KeyboardModifier.NoModifier)
-            self.keyPressEvent(event)
+        # Page pollers run only while their page is showing
+        self.poller = poller.scheduler()
+        self.poller.set_current_page(self.pages.currentWidget())
+        self.pages.currentChanged.connect(lambda _: self.poller.set_current_page(self.pages.currentWidget()))
+        self.poller.register("ip", lambda: self.state.refresh("network.addresses")["ipv4"],
+                             self._show_ip)  # DHCP may finish after startup
 
         # Controller input thread
         self.controller_thread = ControllerThread(self)
-        self.controller_thread.start()
+        self.controller_thread.start()  # Stops itself when the app quits
+
+        # Fullscreen apps (Steam Link) take over the screen; the GUI waits hidden
+        self.launcher = launcher.supervisor()
+        self.launcher.foreground_started.connect(self._app_started)
+        self.launcher.foreground_finished.connect(self._app_finished)
 
     def get_ip_address(self):
+        return self.state.value("network.addresses")["ipv4"]
+
+    def _show_ip(self, ip):
+        if ip == self.ip_value.text():
+            return False
+        self.ip_value.setText(ip)
+        return True
+
+    def _app_started(self, command):
+        self.hibernate()
+
+    def _app_finished(self, command, code):
+        self.resume()
+
+    def hibernate(self):
+        """
+        Go quiet while a fullscreen app has the screen: stop the controller
+        reader, stop painting, let each built page stop its monitors and drop
+        its caches, and return the freed memory to the system.
+        """
+        if self.hibernating:
+            return
+        self.hibernating = True
+        self.poller.set_awake(False)
+        self._return_page = self.pages.currentWidget()
+        self._return_focus = QApplication.focusWidget()
+        self.controller_thread.shutdown()  # Pads closed (and SDL shut down) before the app starts
+        self.hide()
+        self.setUpdatesEnabled(False)
+        for page in self.page_map.values():
+            if hasattr(page, "hibernate"):
+                page.hibernate()
+        QPixmapCache.clear()
+        trim_heap()
+
+    def resume(self):
+        """Undo hibernate(): the same page and focused widget as before."""
+        if not self.hibernating:
+            return
+        self.hibernating = False
+        self.controller_thread = ControllerThread(self)
+        self.controller_thread.start()
+        for page in self.page_map.values():
+            if hasattr(page, "resume"):
+                page.resume()
+        if self.pages.indexOf(self._return_page) >= 0:
+            self.pages.setCurrentWidget(self._return_page)
+        self.setUpdatesEnabled(True)
+        self.showFullScreen()
+        self.activateWindow()
+        self.poller.set_awake(True)
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-            s.close()
-            return ip
-        except:
-            return "Unavailable"
+            if self._return_focus is not None:
+                self._return_focus.setFocus()
+        except RuntimeError:
+            pass  # That widget was deleted (e.g. by a programs.txt reload)
+        if self.prebuild and self._painted and self.page_factories:
+            QTimer.singleShot(0, self._prebuild_next)  # Hibernating interrupted it
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            startup_profile.mark("first frame")
+            if self.prebuild:
+                # Runs once this paint pass is done, so the first frame is not delayed
+                QTimer.singleShot(0, self._prebuild_next)
+            else:
+                QTimer.singleShot(0, startup_profile.finish)
+
+    def _prebuild_next(self):
+        """Build one pending page, then yield to the event loop before the next."""
+        if self.hibernating:
+            return  # resume() picks it up again
+        for name in list(self.page_factories):
+            self.build_page(name)
+            break
+        if self.page_factories:
+            QTimer.singleShot(0, self._prebuild_next)
+        else:
+            startup_profile.finish()
+
+    def build_page(self, page_name):
+        """Return the page widget, constructing it on first use."""
+        factory = self.page_factories.pop(page_name, None)
+        if factory is None:
+            return self.page_map[page_name]
+
+        placeholder = self.page_map[page_name]
+        was_current = self.pages.currentWidget() is placeholder
+        with startup_profile.phase(f"build page: {page_name}"):
+            widget = factory()
+        self.pages.insertWidget(self.pages.indexOf(placeholder), widget)
+        self.pages.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.page_map[page_name] = widget
+        if was_current:
+            self.pages.setCurrentWidget(widget)
+        return widget
 
     def switch_page(self, page_name):
         """Switch stacked layout to the page mapped to this name."""
-        widget = self.page_map[page_name]
+        widget = self.build_page(page_name)
         self.pages.setCurrentWidget(widget)
         return widget
 
+    # Controller handling
+    def handle_key(self, key, capture=None, dispatch=None):
+        """
+        Simulate a key press for controller input. Called on the GUI thread by
+        the controller's InputBridge; capture/dispatch are its monotonic stamps.
+        """
+        if self.hibernating or not self.isVisible():
+            return  # A fullscreen app has the controller
+        record = latency.delivered(capture, dispatch) if dispatch is not None else None
+        event = QKeyEvent(QEvent.Type.KeyPress, key, Qt.KeyboardModifier.NoModifier)
+        self.keyPressEvent(event)
+        if not event.isAccepted():
+            # Not menu navigation: the focused widget gets it, as with a keyboard
+            focused = QApplication.focusWidget()
+            if focused is not None and focused is not self:
+                QApplication.sendEvent(focused, QKeyEvent(QEvent.Type.KeyPress, key, Qt.KeyboardModifier.NoModifier))
+        latency.handled(record)
+
+    def event(self, event):
+        result = super().event(event)
+        if event.type() == QEvent.Type.UpdateRequest:
+            latency.painted()  # The window's dirty region has just been painted
+        return result
+
     # --- Navigation overrides ---
     def keyPressEvent(self, event):
         key = event.key()
@@ -127,10 +277,14 @@ class SteamlinkGUI(QWidget):
 
                 # Move focus into first focusable child inside page
                 first_child = page_widget.focusWidget()
-                if not first_child:
+                if first_child:
+                    first_child.setFocus()  # Back to where focus was when the page was left
+                else:
                     btns = page_widget.findChildren(QPushButton)
                     if btns:
                         btns[0].setFocus()
+                    else:
+                        page_widget.setFocus()  # Pages without buttons (the app grid) have a focus proxy
                 return
 
         elif key in (Qt.Key.Key_Left, Qt.Key.Key_Escape):
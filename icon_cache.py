@@ -0,0 +1,163 @@
+"""
+On-disk cache of application icons, pre-scaled to the tile size and stored in
+the raster engine's native pixel format (ARGB32 premultiplied).
+
+    image = icon_cache.cache().image(icon_path, QSize(200, 300))
+    btn.setIcon(QIcon(QPixmap.fromImage(image)))
+
+Entries are keyed by source path, mtime, file size, target size and device
+pixel ratio, so an edited icon is re-scaled automatically. A hit is a single
+read of a small raw file; no PNG decode or scaling happens. The least recently
+used entries are removed once the cache grows past max_bytes.
+image() only uses QImage, so it is safe to call from worker threads.
+"""
+from PyQt6.QtCore import QSize, Qt
+from PyQt6.QtGui import QImage, QImageReader
+import hashlib
+import os
+import struct
+import threading
+
+CACHE_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+MAX_BYTES = 32 * 1024 * 1024
+
+_MAGIC = b"SLIC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHHIIf")  # magic, version, format, reserved, width, height, dpr
+
+
+def default_directory():
+    if os.environ.get("STEAMLINK_ICON_CACHE"):
+        return os.environ["STEAMLINK_ICON_CACHE"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "steamlink-gui", "icons")
+
+
+class IconCache:
+    def __init__(self, directory=None, max_bytes=MAX_BYTES):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # Serialises eviction
+
+    def _entry_path(self, path, size, dpr):
+        st = os.stat(path)
+        key = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{size.width()}x{size.height()}@{dpr}|{_VERSION}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".raw")
+
+    def image(self, path, size, dpr=1.0):
+        """
+        Return the icon at `path` scaled to fit `size` (keeping its aspect ratio),
+        as an ARGB32 premultiplied QImage. Returns None if it cannot be decoded.
+        """
+        try:
+            entry = self._entry_path(path, size, dpr)
+        except OSError:
+            return None
+
+        image = self._read(entry)
+        if image is not None:
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = self.decode(path, size, dpr)
+        if image is not None:
+            self._write(entry, image, dpr)
+        return image
+
+    @staticmethod
+    def decode(path, size, dpr=1.0):
+        """
+        Decode the source file straight to the target size (the slow path).
+        Formats that support it (JPEG) decode at reduced resolution.
+        """
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        source_size = reader.size()
+        target = QSize(round(size.width() * dpr), round(size.height() * dpr))
+        if source_size.isValid():
+            reader.setScaledSize(source_size.scaled(target, Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            return None
+        image = image.convertToFormat(CACHE_FORMAT)
+        image.setDevicePixelRatio(dpr)
+        return image
+
+    def _read(self, entry):
+        try:
+            with open(entry, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        magic, version, fmt, _, width, height, dpr = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION or fmt != CACHE_FORMAT.value:
+            return None
+        if len(data) != _HEADER.size + width * height * 4:
+            return None  # Truncated write
+
+        # The QImage wraps the buffer; copy() detaches it so `data` can be freed
+        image = QImage(data[_HEADER.size:], width, height, width * 4, CACHE_FORMAT).copy()
+        image.setDevicePixelRatio(dpr)
+        try:
+            os.utime(entry)  # Recently used; evicted last
+        except OSError:
+            pass
+        return image
+
+    def _write(self, entry, image, dpr):
+        header = _HEADER.pack(_MAGIC, _VERSION, CACHE_FORMAT.value, 0, image.width(), image.height(), dpr)
+        pixels = image.constBits().asstring(image.sizeInBytes())
+        tmp = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(header + pixels)
+            os.replace(tmp, entry)  # Readers never see a partial entry
+        except OSError as e:
+            print(f"Icon cache write failed: {e}")
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = []
+            total = 0
+            try:
+                with os.scandir(self.directory) as it:
+                    for e in it:
+                        if e.name.endswith(".raw"):
+                            st = e.stat()
+                            entries.append((st.st_mtime, st.st_size, e.path))
+                            total += st.st_size
+            except OSError:
+                return
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= size
+                except OSError:
+                    pass
+
+
+_cache = None
+
+
+def cache():
+    """Shared icon cache."""
+    global _cache
+    if _cache is None:
+        _cache = IconCache()
+    return _cache
@@ -0,0 +1,582 @@
+"""
+Controller input backends. Each turns raw pad input into navigation events:
+
+    InputEvent(key=Qt.Key.Key_Up, pressed=True, source="hat", timestamp=...)
+
+- EvdevBackend reads /dev/input/event* directly and blocks in epoll, so it
+  only wakes when a pad actually sends something.
+- PygameBackend is the old 60 Hz SDL polling loop, kept as a fallback.
+- ReplayBackend plays a recording through the same decoder as EvdevBackend:
+
+    python3 input_backend.py record /dev/input/event3 > pad.rec
+    python3 input_backend.py replay pad.rec
+
+Timestamps are time.monotonic() seconds (evdev is switched to CLOCK_MONOTONIC).
+read_events(timeout) returns a list of events, or None once the backend has
+nothing more to deliver.
+"""
+from collections import namedtuple
+from PyQt6.QtCore import Qt
+import errno
+import fcntl
+import glob
+import os
+import select
+import socket
+import struct
+import sys
+import time
+import startup_profile
+
+InputEvent = namedtuple("InputEvent", "key pressed source timestamp")
+
+# linux/input-event-codes.h
+EV_SYN, EV_KEY, EV_ABS = 0x00, 0x01, 0x03
+ABS_X, ABS_Y, ABS_HAT0X, ABS_HAT0Y = 0x00, 0x01, 0x10, 0x11
+BTN_JOYSTICK, BTN_SOUTH, BTN_EAST = 0x120, 0x130, 0x131
+
+BUTTON_KEYS = {
+    BTN_SOUTH: Qt.Key.Key_Return,   # A = Enter
+    BTN_EAST: Qt.Key.Key_Escape,    # B = Esc/Back
+    0x220: Qt.Key.Key_Up,           # BTN_DPAD_UP (pads that report the D-pad as buttons)
+    0x221: Qt.Key.Key_Down,
+    0x222: Qt.Key.Key_Left,
+    0x223: Qt.Key.Key_Right,
+}
+# (negative key, positive key) per axis
+AXIS_KEYS = {
+    ABS_HAT0X: (Qt.Key.Key_Left, Qt.Key.Key_Right),
+    ABS_HAT0Y: (Qt.Key.Key_Up, Qt.Key.Key_Down),
+    ABS_X: (Qt.Key.Key_Left, Qt.Key.Key_Right),
+    ABS_Y: (Qt.Key.Key_Up, Qt.Key.Key_Down),
+}
+
+EVENT = struct.Struct("llHHi")  # struct input_event: timeval, type, code, value
+ABSINFO = struct.Struct("6i")   # struct input_absinfo: value, min, max, fuzz, flat, resolution
+
+
+def _ioc(direction, nr, size):
+    return (direction << 30) | (size << 16) | (ord("E") << 8) | nr
+
+
+def EVIOCGABS(code):
+    return _ioc(2, 0x40 + code, ABSINFO.size)
+
+
+EVIOCSCLOCKID = _ioc(1, 0xa0, 4)
+
+
+class EvdevDecoder:
+    """
+    Turns one device's raw (type, code, value) stream into press/release
+    events. Hats and sticks report a press when they leave the centre and a
+    release when they return to it; stick values are scaled by the device's
+    absinfo range so the deadzone is the same on every pad.
+    """
+    DEADZONE = 0.3  # Tune for stick drift (higher = less sensitive)
+
+    def __init__(self, absinfo=None):
+        self.absinfo = absinfo or {}   # code -> (min, max)
+        self.direction = {}            # axis code -> -1/0/1
+        self.buttons = set()           # button codes held down
+
+    def feed(self, etype, code, value, timestamp):
+        if etype == EV_KEY and code in BUTTON_KEYS and value in (0, 1):
+            if value:
+                self.buttons.add(code)
+            else:
+                self.buttons.discard(code)
+            return [InputEvent(BUTTON_KEYS[code], value == 1, "button", timestamp)]
+        if etype != EV_ABS or code not in AXIS_KEYS:
+            return []
+
+        if code in (ABS_HAT0X, ABS_HAT0Y):
+            source = "hat"
+            direction = (value > 0) - (value < 0)
+        else:
+            source = "axis"
+            lo, hi = self.absinfo.get(code, (-32768, 32767))
+            if hi <= lo:
+                return []
+            position = (2 * value - lo - hi) / (hi - lo)  # -1 .. 1
+            direction = -1 if position < -self.DEADZONE else 1 if position > self.DEADZONE else 0
+
+        previous = self.direction.get(code, 0)
+        if direction == previous:
+            return []
+        self.direction[code] = direction
+        keys = AXIS_KEYS[code]
+        events = []
+        if previous:
+            events.append(InputEvent(keys[previous > 0], False, source, timestamp))
+        if direction:
+            events.append(InputEvent(keys[direction > 0], True, source, timestamp))
+        return events
+
+    def release_all(self, timestamp):
+        """Release everything still held, e.g. when the device disappears."""
+        events = [InputEvent(BUTTON_KEYS[code], False, "button", timestamp) for code in self.buttons]
+        self.buttons.clear()
+        for code, direction in self.direction.items():
+            if direction:
+                source = "hat" if code in (ABS_HAT0X, ABS_HAT0Y) else "axis"
+                events.append(InputEvent(AXIS_KEYS[code][direction > 0], False, source, timestamp))
+        self.direction.clear()
+        return events
+
+
+def _read_bitmap(path):
+    """Parse a sysfs capability bitmap ("hex words, most significant first") into an int."""
+    with open(path) as f:
+        words = f.read().split()
+    bits = 0
+    width = 8 * struct.calcsize("l")
+    for word in words:
+        bits = (bits << width) | int(word, 16)
+    return bits
+
+
+def is_gamepad(event_path):
+    """True if the input device reports gamepad/joystick buttons."""
+    name = os.path.basename(event_path)
+    try:
+        keys = _read_bitmap(f"/sys/class/input/{name}/device/capabilities/key")
+    except (OSError, ValueError):
+        return False
+    return bool(keys >> BTN_SOUTH & 1 or keys >> BTN_JOYSTICK & 1)
+
+
+def device_name(event_path):
+    try:
+        with open(f"/sys/class/input/{os.path.basename(event_path)}/device/name") as f:
+            return f.read().strip()
+    except OSError:
+        return os.path.basename(event_path)
+
+
+def read_absinfo(fd):
+    """{code: (min, max)} for the stick axes, via EVIOCGABS."""
+    absinfo = {}
+    for code in (ABS_X, ABS_Y):
+        buf = bytearray(ABSINFO.size)
+        try:
+            fcntl.ioctl(fd, EVIOCGABS(code), buf)
+        except OSError:
+            continue
+        _, lo, hi, _, _, _ = ABSINFO.unpack(buf)
+        absinfo[code] = (lo, hi)
+    return absinfo
+
+
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_GROUPS = 0x1 | 0x2  # Kernel events, and udev's re-broadcast once the node is set up
+
+
+def parse_uevent(data):
+    """
+    Properties of a uevent datagram, either the kernel's "action@devpath\0K=V\0..."
+    or udev's "libudev\0" + header + "K=V\0..." format.
+    """
+    if data.startswith(b"libudev\0"):
+        # prefix[8], magic, header_size, properties_off, properties_len, ...
+        _, _, properties_off, properties_len = struct.unpack_from("=IIII", data, 8)
+        data = data[properties_off:properties_off + properties_len]
+    elif b"@" in data.split(b"\0", 1)[0]:
+        data = data.split(b"\0", 1)[1] if b"\0" in data else b""
+    else:
+        return {}
+    props = {}
+    for field in data.split(b"\0"):
+        key, sep, value = field.partition(b"=")
+        if sep:
+            props[key.decode(errors="replace")] = value.decode(errors="replace")
+    return props
+
+
+def open_uevent_socket():
+    """Netlink socket receiving device add/remove uevents, or None if unavailable."""
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC,
+                             NETLINK_KOBJECT_UEVENT)
+        sock.bind((0, UEVENT_GROUPS))
+        return sock
+    except (OSError, AttributeError) as e:
+        print(f"Controller hotplug unavailable: {e}")
+        return None
+
+
+class EvdevBackend:
+    """
+    Blocks in epoll on the gamepads' event nodes and a netlink uevent socket;
+    no polling. Pads that appear later are opened when their uevent arrives
+    and dropped when they go away; input from all open pads is merged.
+    """
+
+    def __init__(self, paths=None):
+        self.devices = {}  # fd -> (path, decoder)
+        self.epoll = select.epoll()
+        self._wake_r, self._wake_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+        self.epoll.register(self._wake_r, select.EPOLLIN)
+        self.uevents = open_uevent_socket() if paths is None else None
+        if self.uevents:
+            self.epoll.register(self.uevents.fileno(), select.EPOLLIN)
+        for path in paths if paths is not None else sorted(glob.glob("/dev/input/event*")):
+            if paths is not None or is_gamepad(path):
+                self.open_device(path)
+
+    def open_device(self, path, quiet=False):
+        if any(p == path for p, _ in self.devices.values()):
+            return True  # Kernel and udev both announce a new node
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+        except OSError as e:
+            if not quiet:
+                print(f"Cannot open {path}: {e}")
+            return False
+        try:
+            fcntl.ioctl(fd, EVIOCSCLOCKID, struct.pack("i", time.CLOCK_MONOTONIC))
+        except OSError:
+            pass  # Old kernel: timestamps fall back to read time
+        self.devices[fd] = (path, EvdevDecoder(read_absinfo(fd)))
+        self.epoll.register(fd, select.EPOLLIN)
+        print(f"Controller detected: {device_name(path)}")
+        return True
+
+    def close_device(self, fd):
+        """Forget a device; returns releases for anything it still held."""
+        path, decoder = self.devices.pop(fd, (None, None))
+        try:
+            self.epoll.unregister(fd)
+        except (OSError, ValueError):
+            pass
+        os.close(fd)
+        return decoder.release_all(time.monotonic()) if decoder else []
+
+    def _handle_uevents(self):
+        events = []
+        while True:
+            try:
+                data = self.uevents.recv(8192)
+            except BlockingIOError:
+                return events
+            except OSError:
+                return events  # ENOBUFS after a burst; the next events still arrive
+            props = parse_uevent(data)
+            name = props.get("DEVNAME", "")
+            if props.get("SUBSYSTEM") != "input" or not os.path.basename(name).startswith("event"):
+                continue
+            path = name if name.startswith("/") else "/dev/" + name
+            action = props.get("ACTION")
+            if action == "add" and is_gamepad(path):
+                # The kernel event can come before udev has set the node's permissions;
+                # udev's own event follows and the open is retried then
+                self.open_device(path, quiet=True)
+            elif action == "remove":
+                for fd, (p, _) in list(self.devices.items()):
+                    if p == path:
+                        print(f"Controller removed: {device_name(path)}")
+                        events += self.close_device(fd)
+
+    def read_events(self, timeout=None):
+        try:
+            ready = self.epoll.poll(-1 if timeout is None else max(0.0, timeout))
+        except InterruptedError:
+            return []
+        events = []
+        for fd, _ in ready:
+            if fd == self._wake_r:
+                try:
+                    os.read(self._wake_r, 64)
+                except BlockingIOError:
+                    pass
+                continue
+            if self.uevents and fd == self.uevents.fileno():
+                events.extend(self._handle_uevents())
+            elif fd in self.devices:
+                events.extend(self._read_device(fd))
+        return events
+
+    def _read_device(self, fd):
+        path, decoder = self.devices[fd]
+        try:
+            data = os.read(fd, EVENT.size * 64)
+        except BlockingIOError:
+            return []
+        except OSError as e:
+            if e.errno == errno.ENODEV:
+                print(f"Controller removed: {device_name(path)}")
+            return self.close_device(fd)
+        events = []
+        now = time.monotonic()
+        for offset in range(0, len(data) - EVENT.size + 1, EVENT.size):
+            sec, usec, etype, code, value = EVENT.unpack_from(data, offset)
+            stamp = sec + usec / 1e6 if sec else now
+            events.extend(decoder.feed(etype, code, value, stamp))
+        return events
+
+    def wakeup(self):
+        """Make a blocked read_events() return (thread-safe)."""
+        try:
+            os.write(self._wake_w, b"x")
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        for fd in list(self.devices):
+            self.close_device(fd)
+        if self.uevents:
+            self.uevents.close()
+        self.epoll.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+
+class ReplayBackend:
+    """
+    Replays a recording made with `input_backend.py record`. Lines are
+    `abs <code> <min> <max>` (stick ranges) and `<time> <type> <code> <value>`.
+    With realtime=True the recorded gaps between events are kept.
+    """
+
+    def __init__(self, path, realtime=True):
+        self.realtime = realtime
+        absinfo = {}
+        self.records = []
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if not parts or parts[0].startswith("#"):
+                    continue
+                if parts[0] == "abs":
+                    absinfo[int(parts[1])] = (int(parts[2]), int(parts[3]))
+                elif parts[0] != "device":
+                    self.records.append((float(parts[0]), int(parts[1]), int(parts[2]), int(parts[3])))
+        self.decoder = EvdevDecoder(absinfo)
+        self._index = 0
+        self._offset = None  # monotonic now - recorded time
+
+    def read_events(self, timeout=None):
+        if self._index >= len(self.records):
+            return None
+        recorded, etype, code, value = self.records[self._index]
+        if self._offset is None:
+            self._offset = time.monotonic() - recorded
+        if self.realtime:
+            due = recorded + self._offset
+            wait = due - time.monotonic()
+            if timeout is not None and wait > timeout:
+                time.sleep(max(0.0, timeout))
+                return []
+            if wait > 0:
+                time.sleep(wait)
+        self._index += 1
+        return self.decoder.feed(etype, code, value, recorded + self._offset)
+
+    def wakeup(self):
+        pass
+
+    def close(self):
+        self._index = len(self.records)
+
+
+class PygameBackend:
+    """
+    The original SDL polling loop (60 Hz); used when /dev/input is not usable.
+    Pads are opened and dropped on SDL's JOYDEVICEADDED/REMOVED events.
+    """
+
+    def __init__(self):
+        import pygame
+        self.pygame = pygame
+        with startup_profile.phase("pygame.init"):
+            pygame.init()
+            pygame.joystick.init()
+        self.joysticks = {}  # SDL instance id -> (joystick, decoder)
+        self.clock = pygame.time.Clock()
+        self.running = True
+        # SDL also queues JOYDEVICEADDED for pads present at startup
+        for index in range(pygame.joystick.get_count()):
+            self._open(index)
+
+    def _open(self, index):
+        try:
+            joystick = self.pygame.joystick.Joystick(index)
+            joystick.init()
+        except Exception as e:
+            print(f"Joystick init failed: {e}")
+            return
+        if joystick.get_instance_id() in self.joysticks:
+            return
+        print(f"Controller detected: {joystick.get_name()}")
+
+        # Safety check: Does it have hats? (Xbox D-pad is hat 0)
+        if joystick.get_numhats() == 0:
+            print("Warning: No hats detected—falling back to axis polling for D-pad.")
+        self.joysticks[joystick.get_instance_id()] = (
+            joystick, EvdevDecoder({ABS_X: (-1000, 1000), ABS_Y: (-1000, 1000)}))
+
+    @property
+    def devices(self):
+        return self.joysticks
+
+    def read_events(self, timeout=None):
+        pygame = self.pygame
+        if not self.running:
+            return None
+        now = time.monotonic()
+        events = []
+        try:
+            sdl_events = pygame.event.get()  # Event-driven: Safer than raw polling
+        except pygame.error:
+            return None  # SDL was shut down (interpreter exit); end the reader quietly
+        for event in sdl_events:
+            if event.type == pygame.QUIT:
+                self.running = False
+                break
+            elif event.type == pygame.JOYDEVICEADDED:
+                self._open(event.device_index)
+                continue
+            elif event.type == pygame.JOYDEVICEREMOVED:
+                joystick, decoder = self.joysticks.pop(event.instance_id, (None, None))
+                if joystick:
+                    print(f"Controller removed: {joystick.get_name()}")
+                    events += decoder.release_all(now)
+                continue
+
+            pad = self.joysticks.get(getattr(event, "instance_id", None))
+            if not pad:
+                continue
+            joystick, decoder = pad
+            if event.type == pygame.JOYHATMOTION and joystick.get_numhats() > event.hat:
+                x, y = event.value  # (-1/0/1, -1/0/1), y is up-positive
+                events += decoder.feed(EV_ABS, ABS_HAT0X, x, now)
+                events += decoder.feed(EV_ABS, ABS_HAT0Y, -y, now)
+            elif event.type in (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP) and event.button in (0, 1):
+                code = BTN_SOUTH if event.button == 0 else BTN_EAST
+                events += decoder.feed(EV_KEY, code, int(event.type == pygame.JOYBUTTONDOWN), now)
+
+        # Axis fallback for pads without hats (Xbox BT standard)
+        for joystick, decoder in self.joysticks.values():
+            if not joystick.get_numhats():
+                events += decoder.feed(EV_ABS, ABS_X, int(joystick.get_axis(0) * 1000), now)
+                events += decoder.feed(EV_ABS, ABS_Y, int(joystick.get_axis(1) * 1000), now)
+
+        pygame.event.pump()  # Keep SDL alive (no display needed)
+        self.clock.tick(60)  # Smooth 60 FPS polling, low CPU on Zero 2 W
+        return events
+
+    def wakeup(self):
+        pass
+
+    def close(self):
+        self.running = False
+        self.pygame.quit()
+
+
+class RepeatScheduler:
+    """
+    Auto-repeat for held directions. A press fires at once (by the caller);
+    repeats start after `initial_delay`, then come every `interval`, which
+    shrinks by `acceleration` per repeat down to `min_interval`. Nothing
+    polls: next_timeout() says how long the input thread may sleep.
+    All times are time.monotonic() seconds.
+    """
+    INITIAL_DELAY = 0.35
+    INTERVAL = 0.15
+    MIN_INTERVAL = 0.04
+    ACCELERATION = 0.85
+
+    def __init__(self, initial_delay=INITIAL_DELAY, interval=INTERVAL,
+                 min_interval=MIN_INTERVAL, acceleration=ACCELERATION):
+        self.initial_delay = initial_delay
+        self.interval = interval
+        self.min_interval = min(min_interval, interval)
+        self.acceleration = acceleration
+        self.held = {}  # key -> [due time, current interval]
+
+    @classmethod
+    def from_env(cls):
+        """STEAMLINK_INPUT_REPEAT=delay,interval,min_interval,acceleration (any prefix)."""
+        value = os.environ.get("STEAMLINK_INPUT_REPEAT")
+        if not value:
+            return cls()
+        try:
+            return cls(*[float(v) for v in value.split(",")[:4]])
+        except (TypeError, ValueError):
+            print(f"Ignoring invalid STEAMLINK_INPUT_REPEAT={value!r}")
+            return cls()
+
+    def press(self, key, now):
+        self.held[key] = [now + self.initial_delay, self.interval]
+
+    def release(self, key):
+        self.held.pop(key, None)
+
+    def next_timeout(self, now):
+        """Seconds until the next repeat is due, or None if nothing is held."""
+        if not self.held:
+            return None
+        return max(0.0, min(due for due, _ in self.held.values()) - now)
+
+    def due(self, now):
+        """Keys whose repeat is due at `now`; each is rescheduled, a little faster."""
+        keys = []
+        for key, state in self.held.items():
+            if now >= state[0]:
+                keys.append(key)
+                # Schedule from the due time so a late wake-up does not slow the rate
+                state[0] = max(state[0] + state[1], now)
+                state[1] = max(self.min_interval, state[1] * self.acceleration)
+        return keys
+
+
+def create_backend():
+    """
+    Pick the input backend: STEAMLINK_INPUT_REPLAY=<file> replays a recording;
+    STEAMLINK_INPUT_BACKEND=auto|evdev|pygame (auto: evdev when /dev/input and
+    netlink hotplug are usable, else pygame). Both keep running with no pad
+    connected and pick one up when it is plugged in or paired.
+    """
+    replay = os.environ.get("STEAMLINK_INPUT_REPLAY")
+    if replay:
+        return ReplayBackend(replay)
+
+    choice = os.environ.get("STEAMLINK_INPUT_BACKEND", "auto")
+    if choice in ("auto", "evdev") and sys.platform.startswith("linux") and os.path.isdir("/dev/input"):
+        backend = EvdevBackend()
+        if backend.uevents or backend.devices or choice == "evdev":
+            return backend
+        backend.close()  # No hotplug and nothing to read: let SDL try
+    return PygameBackend()
+
+
+def record(path, out=sys.stdout):
+    """Write a device's raw events in the ReplayBackend format until Ctrl+C."""
+    fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    fcntl.ioctl(fd, EVIOCSCLOCKID, struct.pack("i", time.CLOCK_MONOTONIC))
+    print(f"device {device_name(path)}", file=out)
+    for code, (lo, hi) in read_absinfo(fd).items():
+        print(f"abs {code} {lo} {hi}", file=out)
+    try:
+        while True:
+            data = os.read(fd, EVENT.size * 64)
+            for offset in range(0, len(data) - EVENT.size + 1, EVENT.size):
+                sec, usec, etype, code, value = EVENT.unpack_from(data, offset)
+                if etype != EV_SYN:
+                    print(f"{sec}.{usec:06d} {etype} {code} {value}", file=out, flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(fd)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "record":
+        record(sys.argv[2])
+    elif len(sys.argv) == 3 and sys.argv[1] == "replay":
+        backend = ReplayBackend(sys.argv[2], realtime=False)
+        while (events := backend.read_events()) is not None:
+            for e in events:
+                print(f"{e.timestamp:.6f} {'press' if e.pressed else 'release':7} {e.source:6} {Qt.Key(e.key).name}")
+    else:
+        print("usage: input_backend.py record /dev/input/eventN > pad.rec | replay pad.rec")
@@ -20,7 +20,7 @@ fi
 
 # Deps (add FB/video)
 sudo apt update
-sudo apt install -y python3 python3-pip python3-pyqt6 python3-pygame pulseaudio-utils bluez raspi-config git libgles2-mesa libegl1-mesa
+sudo apt install -y python3 python3-pip python3-pyqt6 python3-pygame python3-dbus-next pulseaudio-utils bluez raspi-config git libgles2-mesa libegl1-mesa
 
 # Clone/update repo
 if [ -d "$INSTALL_DIR" ]; then
@@ -0,0 +1,188 @@
+"""
+Background job executor so menus never block the Qt event loop on system tools.
+
+    job = jobs.executor().run_command(["bluetoothctl", "pair", mac], timeout=10,
+                                      on_done=..., on_error=..., busy=pair_btn)
+
+Work runs on a QThreadPool; on_done/on_error are called on the GUI thread.
+A job can time out or be cancelled: its command process is killed and a late
+result is dropped. `busy` widgets show a busy state until the job ends.
+"""
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+import subprocess
+import threading
+import spawner
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def set_busy(widget, busy):
+    """Show a per-button busy state (AnimatedButton.set_busy, else disable)."""
+    if widget is None:
+        return
+    try:
+        if hasattr(widget, "set_busy"):
+            widget.set_busy(busy)
+        else:
+            widget.setEnabled(not busy)
+    except RuntimeError:
+        pass  # Widget was deleted while the job ran
+
+
+def set_label(widget, text):
+    """Change a button's text without clobbering its busy state."""
+    if hasattr(widget, "set_label"):
+        widget.set_label(text)
+    else:
+        widget.setText(text)
+
+
+class Job(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    _result = pyqtSignal(bool, object)  # Worker thread -> GUI thread
+
+    def __init__(self, fn, args, timeout=None, busy=None, parent=None):
+        super().__init__(parent)
+        self.fn = fn
+        self.args = args
+        self.busy = busy
+        self.done = False
+        self.process = None   # Set by command jobs so cancel()/timeout can kill it
+        self._pool = None
+        self._runnable = None
+        self._lock = threading.Lock()
+        self._result.connect(self._deliver)
+
+        self._timer = None
+        if timeout:
+            self._timer = QTimer(self)
+            self._timer.setSingleShot(True)
+            self._timer.timeout.connect(lambda: self._abort(JobTimeout(f"timed out after {timeout}s")))
+            self._timer.start(int(timeout * 1000))
+
+    def _run(self):
+        if self.done:
+            return
+        try:
+            result = self.fn(self, *self.args)
+        except Exception as e:
+            self._result.emit(False, e)
+        else:
+            self._result.emit(True, result)
+
+    def _deliver(self, ok, value):
+        if self.done:
+            return  # Cancelled or timed out; drop the late result
+        self._finish()
+        if ok:
+            self.finished.emit(value)
+        else:
+            self.failed.emit(value)
+
+    def _finish(self):
+        self.done = True
+        if self._timer:
+            self._timer.stop()
+        set_busy(self.busy, False)
+
+    def _abort(self, error):
+        if self.done:
+            return
+        if self._runnable:
+            self._pool.tryTake(self._runnable)  # Not started yet: never run it
+        with self._lock:
+            proc = self.process
+        if proc:
+            try:
+                proc.kill()
+            except Exception:
+                pass
+        self._finish()
+        self.failed.emit(error)
+
+    def attach_process(self, proc):
+        """Called from the worker; kills the process right away if already cancelled."""
+        with self._lock:
+            self.process = proc
+        if self.done:
+            proc.kill()
+
+    def cancel(self):
+        self._abort(JobCancelled("cancelled"))
+
+
+class _Runnable(QRunnable):
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+        self.setAutoDelete(False)  # The job keeps it until tryTake()/completion
+
+    def run(self):
+        self.job._run()
+
+
+class JobExecutor(QObject):
+    def __init__(self, max_threads=None, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_threads:
+            self.pool.setMaxThreadCount(max_threads)
+        self._jobs = set()  # Keep Python wrappers alive until delivery
+
+    def submit(self, fn, *args, on_done=None, on_error=None, timeout=None, busy=None):
+        """Run fn(*args) on the pool. Callbacks run on the GUI thread."""
+        job = Job(lambda _job, *a: fn(*a), args, timeout, busy, self)
+        return self._start(job, on_done, on_error)
+
+    def run_command(self, args, timeout=5, on_done=None, on_error=None, busy=None, **kwargs):
+        """
+        spawner.run() on the pool; on_done gets the CompletedProcess.
+        The process is killed on timeout or cancel().
+        """
+        kwargs.setdefault("capture_output", True)
+        kwargs.setdefault("text", True)
+        job = Job(_run_command, (args, kwargs), timeout, busy, self)
+        return self._start(job, on_done, on_error)
+
+    def _start(self, job, on_done, on_error):
+        self._jobs.add(job)
+        job.finished.connect(lambda *_: self._jobs.discard(job))
+        job.failed.connect(lambda *_: self._jobs.discard(job))
+        if on_done:
+            job.finished.connect(on_done)
+        job.failed.connect(on_error or (lambda e: print(f"Background job failed: {e}")))
+        set_busy(job.busy, True)
+        job._pool = self.pool
+        job._runnable = _Runnable(job)
+        self.pool.start(job._runnable)
+        return job
+
+
+def _run_command(job, args, kwargs):
+    if kwargs.pop("capture_output", False):
+        kwargs["stdout"] = kwargs["stderr"] = spawner.PIPE
+    kwargs.setdefault("stdin", spawner.DEVNULL)
+    proc = spawner.Popen(args, **kwargs)
+    job.attach_process(proc)
+    out, err = proc.communicate()
+    if job.done:
+        raise JobCancelled("cancelled")
+    return subprocess.CompletedProcess(args, proc.returncode, out, err)
+
+
+_executor = None
+
+
+def executor():
+    """Shared executor used by all menus."""
+    global _executor
+    if _executor is None:
+        _executor = JobExecutor()
+    return _executor
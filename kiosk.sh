@@ -1,9 +1,6 @@
 #!/bin/bash
 cd /opt/steamlink-gui
 
-# Kill remnants
-pkill -f python3 2>/dev/null
-
 # LinuxFB: Direct framebuffer, no X
 export QT_QPA_PLATFORM=linuxfb
 export QT_QPA_FB_CONSOLE=/dev/tty1
@@ -13,7 +10,11 @@ export QT_QPA_LINUXFB_BUFFER_SIZE=1920x1080
 echo 0 | sudo tee /sys/class/graphics/fb0/blank >/dev/null
 vcgencmd display_power 1
 
-# Launch GUI
-python3 main.py
+# Launch time (seconds since boot) for the startup profiler's timeline
+export STEAMLINK_KIOSK_START=$(cut -d' ' -f1 /proc/uptime)
+
+# Launch GUI (STEAMLINK_STARTUP_PROFILE=1 records a startup timeline). If it is
+# already running it is just brought to the front; a crash restarts it with backoff
+python3 main.py --supervise
 
 echo "Kiosk exited—console ready."
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Optional controller-to-screen latency tracer.
+
+Enable with STEAMLINK_LATENCY=1 (or =<path> to also write JSON at exit).
+Each controller event is stamped when it is captured (evdev timestamp),
+posted by the controller thread, delivered to and handled by
+SteamlinkGUI.handle_key, and when the next frame has been painted.
+The last RING_SIZE samples of every segment are kept in fixed ring buffers;
+percentiles are printed on SIGUSR1 and at exit:
+
+    kill -USR1 $(pgrep -f main.py)
+
+When disabled, every hook is a single None check.
+"""
+from array import array
+import atexit
+import json
+import os
+import signal
+import threading
+import time
+
+RING_SIZE = 1024
+SEGMENTS = (
+    ("capture_to_dispatch", "capture", "dispatch"),    # Backend wake-up/polling delay
+    ("dispatch_to_deliver", "dispatch", "deliver"),    # Thread hop into the Qt event loop
+    ("deliver_to_handled", "deliver", "handled"),      # keyPressEvent, focus change, restyle
+    ("handled_to_painted", "handled", "painted"),      # Until the frame is painted
+    ("total", "capture", "painted"),
+)
+STALE = 1.0  # Handled events not followed by a paint within this many seconds are dropped
+
+
+class LatencyTracer:
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self.count = 0
+        self.rings = {name: array("d", bytes(8 * size)) for name, _, _ in SEGMENTS}
+        self._unpainted = []  # Handled events waiting for the next paint
+
+    def delivered(self, capture, dispatch):
+        """GUI thread, start of key handling. Returns the stamp record."""
+        return {"capture": capture or dispatch, "dispatch": dispatch, "deliver": time.monotonic()}
+
+    def handled(self, record):
+        if record is not None:
+            record["handled"] = time.monotonic()
+            self._unpainted.append(record)
+
+    def painted(self):
+        if not self._unpainted:
+            return
+        now = time.monotonic()
+        for record in self._unpainted:
+            if now - record["handled"] > STALE:
+                continue  # The key changed nothing on screen; this paint is unrelated
+            record["painted"] = now
+            slot = self.count % self.size
+            for name, start, end in SEGMENTS:
+                self.rings[name][slot] = record[end] - record[start]
+            self.count += 1
+        self._unpainted = []
+
+    def percentiles(self):
+        n = min(self.count, self.size)
+        result = {"events": self.count, "window": n}
+        for name, _, _ in SEGMENTS:
+            values = sorted(self.rings[name][:n])
+            if not values:
+                continue
+            result[name] = {f"p{p}": round(values[min(n - 1, int(n * p / 100))] * 1000, 3)
+                            for p in (50, 90, 99)}
+            result[name]["max"] = round(values[-1] * 1000, 3)
+        return result
+
+    def report(self):
+        stats = self.percentiles()
+        lines = [f"Input latency, last {stats['window']} of {stats['events']} events (ms)",
+                 f"{'segment':<22}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"]
+        for name, _, _ in SEGMENTS:
+            if name in stats:
+                s = stats[name]
+                lines.append(f"{name:<22}{s['p50']:>9.2f}{s['p90']:>9.2f}{s['p99']:>9.2f}{s['max']:>9.2f}")
+        return "\n".join(lines)
+
+
+_tracer = None
+_path = None
+
+
+def tracer():
+    """The active tracer, or None when tracing is off."""
+    return _tracer
+
+
+def configure():
+    """Enable tracing from STEAMLINK_LATENCY (call from the main thread)."""
+    global _tracer, _path
+    value = os.environ.get("STEAMLINK_LATENCY")
+    if not value or value == "0":
+        return
+    _tracer = LatencyTracer()
+    _path = None if value == "1" else value
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, lambda *_: print(_tracer.report()))
+    atexit.register(dump)
+
+
+def dump():
+    """Print the percentile table (and write JSON if a path was given)."""
+    if _tracer is None:
+        return
+    print(_tracer.report())
+    if _path:
+        try:
+            with open(_path, "w") as f:
+                json.dump(_tracer.percentiles(), f, indent=2)
+        except OSError as e:
+            print(f"Could not write latency stats: {e}")
+
+
+# Hooks; no-ops unless configure() enabled tracing
+
+def delivered(capture, dispatch):
+    return _tracer.delivered(capture, dispatch) if _tracer else None
+
+
+def handled(record):
+    if _tracer:
+        _tracer.handled(record)
+
+
+def painted():
+    if _tracer:
+        _tracer.painted()
@@ -0,0 +1,130 @@
+"""
+Supervises launched applications while the GUI stays resident.
+
+    launcher.supervisor().launch("steamlink", fullscreen=True)
+
+Each app runs in its own session (and so its own process group). The
+supervisor watches for its exit on the event loop with a QSocketNotifier on
+a pidfd, so nothing polls and every child is reaped.
+
+A fullscreen app takes over the screen and the controller: foreground_started
+tells the GUI to hide and ignore input, and foreground_finished brings the
+already-running GUI straight back when the app exits.
+"""
+from PyQt6.QtCore import QObject, QSocketNotifier, QTimer, pyqtSignal
+import os
+import shlex
+import signal
+import time
+import spawner
+
+
+class LaunchedApp:
+    def __init__(self, command, process, fullscreen):
+        self.command = command
+        self.process = process
+        self.fullscreen = fullscreen
+        self.started = time.monotonic()
+        self.notifier = None
+        self.pidfd = None
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+
+class LaunchSupervisor(QObject):
+    started = pyqtSignal(str, int)               # command, pid
+    finished = pyqtSignal(str, int, float)       # command, exit code, seconds it ran
+    foreground_started = pyqtSignal(str)         # A fullscreen app took over the screen
+    foreground_finished = pyqtSignal(str, int)   # ...and exited with this code
+
+    POLL_MS = 500  # Only when pidfd_open is not available
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.apps = {}  # pid -> LaunchedApp
+
+    def foreground(self):
+        """The running fullscreen app, if any."""
+        return next((app for app in self.apps.values() if app.fullscreen), None)
+
+    def launch(self, command, fullscreen=False):
+        """
+        Start `command` (a shell command line) in a new session. Returns the
+        LaunchedApp, or None if a fullscreen app is already running or the
+        command could not be started.
+        """
+        if fullscreen and self.foreground():
+            print(f"Not launching {command}: {self.foreground().command} is still running")
+            return None
+        args = ["/bin/sh", "-c", command] if any(c in command for c in "&|;<>$`") else shlex.split(command)
+        try:
+            process = spawner.Popen(args, stdin=spawner.DEVNULL, start_new_session=True)
+        except OSError as e:
+            print(f"Error launching {command}: {e}")
+            return None
+
+        app = LaunchedApp(command, process, fullscreen)
+        self.apps[app.pid] = app
+        self._watch(app)
+        print(f"Launched: {command} (pid {app.pid})")
+        self.started.emit(command, app.pid)
+        if fullscreen:
+            self.foreground_started.emit(command)
+        return app
+
+    def _watch(self, app):
+        fd = None
+        if hasattr(os, "pidfd_open"):
+            try:
+                app.pidfd = fd = os.pidfd_open(app.pid)  # Readable once the app has exited
+            except OSError:
+                pass
+        if fd is None:
+            timer = QTimer(self)
+            timer.timeout.connect(lambda: app.process.poll() is not None and self._exited(app))
+            timer.start(self.POLL_MS)
+            app.notifier = timer
+            return
+        app.notifier = QSocketNotifier(fd, QSocketNotifier.Type.Read, self)
+        app.notifier.activated.connect(lambda *_: self._exited(app))
+
+    def _exited(self, app):
+        if self.apps.pop(app.pid, None) is None:
+            return
+        if isinstance(app.notifier, QSocketNotifier):
+            app.notifier.setEnabled(False)
+        else:
+            app.notifier.stop()
+        app.notifier.deleteLater()
+        code = app.process.wait()  # Already exited: reaps without blocking
+        if app.pidfd is not None:
+            os.close(app.pidfd)
+        runtime = time.monotonic() - app.started
+        print(f"{app.command} exited with {code} after {runtime:.1f}s")
+        self.finished.emit(app.command, code, runtime)
+        if app.fullscreen:
+            self.foreground_finished.emit(app.command, code)
+
+    def stop(self, app, sig=signal.SIGTERM):
+        """Signal the app's whole process group (the app and anything it started)."""
+        try:
+            os.killpg(app.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def stop_all(self, sig=signal.SIGTERM):
+        for app in list(self.apps.values()):
+            self.stop(app, sig)
+
+
+_supervisor = None
+
+
+def supervisor():
+    """Shared launch supervisor; create it on the GUI thread."""
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = LaunchSupervisor()
+    return _supervisor
@@ -1,74 +1,109 @@
-from PyQt6.QtWidgets import QApplication
 import sys
-from gui_mainmenu import SteamlinkGUI
+import control
+
+# A running instance takes this invocation's request (show, --page, ...) before
+# anything heavy is loaded; --supervise restarts the GUI if it crashes
+args = control.parse_args(sys.argv[1:])
+code = control.forward(args)
+if code is not None:
+    sys.exit(code)
+if args.supervise:
+    sys.exit(control.supervise(sys.argv[1:]))
+
+import startup_profile
+
+# Opt-in startup timeline: STEAMLINK_STARTUP_PROFILE=<path> or --profile-startup[=<path>]
+startup_profile.configure(sys.argv)
+
+import latency
+
+# Opt-in controller-to-paint latency tracing: STEAMLINK_LATENCY=1 (SIGUSR1 prints percentiles)
+latency.configure()
+
+with startup_profile.phase("import gui"):
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    from gui_mainmenu import SteamlinkGUI
+    import animated_button
+    import control_server
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    with startup_profile.phase("QApplication"):
+        app = QApplication(sys.argv)
 
     # Global dark theme stylesheet
-    app.setStyleSheet("""
-        QWidget {
-            background-color: #1e1e1e;   /* Dark grey background */
-            color: white;               /* Default text color */
-            font-size: 18px;
-        }
-        QLabel {
-            color: white;
-        }
-        QPushButton {
-            background-color: #2c2f33;
-            border-radius: 8px;
-            padding: 8px 16px;
-            color: white;
-        }
-        QPushButton:hover {
-            background-color: #3a3d41;
-        }
-        QPushButton:pressed {
-            background-color: #505357;
-        }
-        QProgressBar {
-            border: 2px solid #444;
-            border-radius: 10px;
-            background-color: #2c2f33;
-            text-align: center;
-            height: 25px;
-            font-size: 16px;
-            color: white;
-        }
-        QProgressBar::chunk {
-            background-color: #7289da;  /* Blue fill */
-            border-radius: 8px;
-        }
-        QTableWidget {
-            background-color: #2c2f33;
-            gridline-color: #444;
-            color: white;
-        }
-        QHeaderView::section {
-            background-color: #3a3d41;
-            color: white;
-            padding: 4px;
-            border: none;
-        }
-        QComboBox {
-            background-color: #2c2f33;
-            color: white;
-            border: 1px solid #444;
-            border-radius: 6px;
-            padding: 4px 8px;
-        }
-        QComboBox QAbstractItemView {
-            background-color: #2c2f33;
-            color: white;
-            selection-background-color: #7289da;
-        }
-        /* Ensure grid layouts and tiles inherit dark background */
-        QGridLayout {
-            background-color: #1e1e1e;
-        }
-    """)
+    with startup_profile.phase("stylesheet"):
+        app.setStyleSheet("""
+            QWidget {
+                background-color: #1e1e1e;   /* Dark grey background */
+                color: white;               /* Default text color */
+                font-size: 18px;
+            }
+            QLabel {
+                color: white;
+            }
+            QPushButton {
+                background-color: #2c2f33;
+                border-radius: 8px;
+                padding: 8px 16px;
+                color: white;
+            }
+            QPushButton:hover {
+                background-color: #3a3d41;
+            }
+            QPushButton:pressed {
+                background-color: #505357;
+            }
+            QProgressBar {
+                border: 2px solid #444;
+                border-radius: 10px;
+                background-color: #2c2f33;
+                text-align: center;
+                height: 25px;
+                font-size: 16px;
+                color: white;
+            }
+            QProgressBar::chunk {
+                background-color: #7289da;  /* Blue fill */
+                border-radius: 8px;
+            }
+            QTableWidget {
+                background-color: #2c2f33;
+                gridline-color: #444;
+                color: white;
+            }
+            QHeaderView::section {
+                background-color: #3a3d41;
+                color: white;
+                padding: 4px;
+                border: none;
+            }
+            QComboBox {
+                background-color: #2c2f33;
+                color: white;
+                border: 1px solid #444;
+                border-radius: 6px;
+                padding: 4px 8px;
+            }
+            QComboBox QAbstractItemView {
+                background-color: #2c2f33;
+                color: white;
+                selection-background-color: #7289da;
+            }
+            /* Ensure grid layouts and tiles inherit dark background */
+            QGridLayout {
+                background-color: #1e1e1e;
+            }
+        """ + animated_button.STYLESHEET)  # Buttons' shared focus styles, parsed once here
 
-    gui = SteamlinkGUI()
+    with startup_profile.phase("SteamlinkGUI.__init__"):
+        gui = SteamlinkGUI()
     gui.showFullScreen()
+
+    # Later invocations talk to this instance instead of starting another
+    server = control_server.ControlServer(gui)
+    server.listen()
+    request = control.request_from_args(args)
+    if request["cmd"] != "show":
+        QTimer.singleShot(0, lambda: server.handle(request))
     sys.exit(app.exec())
\ No newline at end of file
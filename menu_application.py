@@ -1,126 +1,455 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QSizePolicy, QGridLayout, QLabel
-from PyQt6.QtGui import QIcon
-from PyQt6.QtCore import QSize, Qt
-import subprocess
-import functools
+from PyQt6.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QLabel, QListView, QStyle, QStyledItemDelegate, QAbstractItemView
+)
+from PyQt6.QtGui import QColor, QImage, QPainter, QPen, QPixmap
+from PyQt6.QtCore import (
+    QAbstractListModel, QEasingCurve, QFileSystemWatcher, QModelIndex, QPropertyAnimation, QRect, QSize,
+    Qt, QThread, QTimer, pyqtSignal
+)
+from collections import OrderedDict
+import launcher
+import jobs
+import icon_cache
+import threading
 import os
 
-try:
-    from animated_button import AnimatedButton
-except Exception:
-    AnimatedButton = None
+TILE_SIZE = QSize(200, 300)
+TILE_SPACING = 10
+KEY_ROLE = Qt.ItemDataRole.UserRole
+COMMAND_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+def parse_programs(programs_file, icons_dir):
+    """
+    Parse programs.txt into a list of entries, or None if the file is missing.
+    Each entry has a unique key (name, command, n); `icon` is the icon path if
+    the file exists and `icon_stamp` its (mtime, size), so icon edits show up
+    as changes.
+    """
+    if not os.path.exists(programs_file):
+        return None
+    entries = []
+    seen = {}
+    with open(programs_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or "|" not in line:
+                continue
+
+            parts = [p.strip() for p in line.split("|")]
+            name = parts[0]
+            command = parts[1]
+            icon_file = parts[2] if len(parts) > 2 else None
+
+            icon_path = os.path.join(icons_dir, icon_file) if icon_file else None
+            try:
+                st = os.stat(icon_path) if icon_path else None
+            except OSError:
+                st = None
+            n = seen.get((name, command), 0)
+            seen[(name, command)] = n + 1
+            entries.append({"key": (name, command, n), "name": name, "command": command,
+                            "icon": icon_path if st else None,
+                            "icon_stamp": (st.st_mtime_ns, st.st_size) if st else None})
+    return entries
+
+
+class IconLoader(QThread):
+    """
+    Loads tile icons (through the icon cache) on a worker thread, in queue
+    order; prioritize() moves tiles to the front, e.g. the ones on screen.
+    Items are (tile key, icon path, icon stamp) and are emitted back as-is.
+    """
+    icon_loaded = pyqtSignal(object, QImage)
+    drained = pyqtSignal()  # The queue ran empty
+
+    def __init__(self, size, dpr=1.0, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.dpr = dpr
+        self._queue = []
+        self._cond = threading.Condition()
+        self._stopping = False
+
+    def add(self, items):
+        with self._cond:
+            self._queue.extend(items)
+            self._cond.notify()
+        if not self.isRunning() and not self._stopping:
+            self.start()
+
+    def discard(self, keys):
+        with self._cond:
+            self._queue = [item for item in self._queue if item[0] not in keys]
+
+    def prioritize(self, keys):
+        wanted = set(keys)
+        with self._cond:
+            self._queue.sort(key=lambda item: item[0] not in wanted)  # Stable: keeps row order
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self.wait(2000)
+
+    def run(self):
+        cache = icon_cache.cache()
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                item = self._queue.pop(0)
+            image = cache.image(item[1], self.size, self.dpr)
+            if image is not None:
+                self.icon_loaded.emit(item, image)
+            with self._cond:
+                if not self._queue:
+                    self.drained.emit()
+
+
+class ApplicationModel(QAbstractListModel):
+    """
+    One row per programs.txt entry. Icons are requested from the IconLoader
+    the first time a tile is painted and kept as pixmaps in a small LRU, so
+    memory depends on what is on screen, not on the length of the list.
+    """
+    MAX_ICONS = 96  # Decoded tile pixmaps kept in memory: a few screens' worth
+
+    def __init__(self, loader, parent=None):
+        super().__init__(parent)
+        self.entries = []
+        self.rows = {}              # entry key -> row
+        self.pixmaps = OrderedDict()  # entry key -> ((icon path, icon stamp), QPixmap), oldest first
+        self.pending = set()        # keys requested from the loader
+        self._requests = []         # Requested during this paint pass, not yet sent to the loader
+        self.loader = loader
+        self.loader.icon_loaded.connect(self._icon_loaded)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return entry["name"]
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.icon(entry)
+        if role == KEY_ROLE:
+            return entry["key"]
+        if role == COMMAND_ROLE:
+            return entry["command"]
+        return None
+
+    def icon(self, entry):
+        """The tile pixmap if it is loaded; otherwise queue it and return None."""
+        if not entry["icon"]:
+            return None
+        key = entry["key"]
+        cached = self.pixmaps.get(key)
+        if cached and cached[0] == (entry["icon"], entry["icon_stamp"]):
+            self.pixmaps.move_to_end(key)
+            return cached[1]
+        if key not in self.pending:
+            self.pending.add(key)
+            if not self._requests:
+                QTimer.singleShot(0, self._flush_requests)  # One batch per paint pass
+            self._requests.append((key, entry["icon"], entry["icon_stamp"]))
+        return None
+
+    def _flush_requests(self):
+        requests = [item for item in self._requests if item[0] in self.pending]
+        self._requests = []
+        if requests:
+            self.loader.add(requests)
+
+    def set_entries(self, entries):
+        """
+        Turn the rows into `entries` with row removes, inserts, moves and
+        dataChanged for the entries that differ, so an edit to one line of
+        programs.txt touches one row and views keep their scroll position.
+        """
+        wanted = {entry["key"] for entry in entries}
+        row = len(self.entries)
+        while row > 0:
+            # Runs of removed rows, last first so earlier row numbers stay valid
+            row -= 1
+            if self.entries[row]["key"] in wanted:
+                continue
+            last = row
+            while row > 0 and self.entries[row - 1]["key"] not in wanted:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row, last)
+            del self.entries[row:last + 1]
+            self.endRemoveRows()
+
+        present = {entry["key"] for entry in self.entries}
+        row = 0
+        while row < len(entries):
+            entry = entries[row]
+            if entry["key"] not in present:
+                end = row + 1
+                while end < len(entries) and entries[end]["key"] not in present:
+                    end += 1
+                self.beginInsertRows(QModelIndex(), row, end - 1)
+                self.entries[row:row] = entries[row:end]
+                self.endInsertRows()
+                row = end
+                continue
+            if self.entries[row]["key"] != entry["key"]:
+                source = next(i for i in range(row + 1, len(self.entries)) if self.entries[i]["key"] == entry["key"])
+                self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), row)
+                self.entries.insert(row, self.entries.pop(source))
+                self.endMoveRows()
+            if self.entries[row] != entry:
+                self.entries[row] = entry
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+            row += 1
+
+        self.rows = {entry["key"]: row for row, entry in enumerate(self.entries)}
+        for key, (source, _) in list(self.pixmaps.items()):
+            row = self.rows.get(key)
+            if row is None or source != (self.entries[row]["icon"], self.entries[row]["icon_stamp"]):
+                del self.pixmaps[key]  # Removed, or its icon changed
+        self.retain(self.rows)
+
+    def release(self):
+        """Drop every decoded icon and queued load; tiles reload when painted again."""
+        self.retain(())
+        self._requests = []
+        self.pixmaps.clear()
+
+    def retain(self, keys):
+        """Drop queued loads for tiles not in `keys` (e.g. scrolled out of view)."""
+        dropped = {key for key in self.pending if key not in keys}
+        if dropped:
+            self.pending -= dropped
+            self.loader.discard(dropped)
+
+    def _icon_loaded(self, item, image):
+        key, path, stamp = item
+        self.pending.discard(key)
+        row = self.rows.get(key)
+        if row is None or (self.entries[row]["icon"], self.entries[row]["icon_stamp"]) != (path, stamp):
+            return  # Tile removed or its icon changed again meanwhile
+        self.pixmaps[key] = ((path, stamp), QPixmap.fromImage(image))
+        self.pixmaps.move_to_end(key)
+        while len(self.pixmaps) > self.MAX_ICONS:
+            self.pixmaps.popitem(last=False)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+
+class TileDelegate(QStyledItemDelegate):
+    """Paints a tile: its icon (or its name until the icon loads), hover and focus."""
+    FOCUS = QColor("#1e90ff")
+    HOVER = QColor(255, 255, 255, 20)
+    TEXT_TILE = QColor("#2c2f33")
+
+    def sizeHint(self, option, index):
+        return TILE_SIZE
+
+    def paint(self, painter, option, index):
+        rect = QRect(option.rect.topLeft(), TILE_SIZE)
+        rect.moveCenter(option.rect.center())
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is not None:
+            target = QRect(rect.topLeft(), pixmap.deviceIndependentSize().toSize())
+            target.moveCenter(rect.center())
+            painter.drawPixmap(target, pixmap)
+        else:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(self.TEXT_TILE)
+            painter.drawRoundedRect(rect, 12, 12)
+            painter.setPen(QColor("white"))
+            painter.drawText(rect.adjusted(8, 8, -8, -8),
+                             Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap,
+                             index.data(Qt.ItemDataRole.DisplayRole))
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(self.HOVER)
+            painter.drawRoundedRect(rect, 12, 12)
+        if option.state & QStyle.StateFlag.State_HasFocus:
+            painter.setPen(QPen(self.FOCUS, 2))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.drawRoundedRect(rect.adjusted(1, 1, -1, -1), 12, 12)
+        painter.restore()
+
+
+class ApplicationGrid(QListView):
+    """
+    Wrapping icon-mode list: only the tiles inside the viewport are painted.
+    Moving the current tile scrolls to it with a short animation.
+    """
+    launch_requested = pyqtSignal(QModelIndex)
+    SCROLL_MS = 150
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._scroll = QPropertyAnimation(self.verticalScrollBar(), b"value", self)
+        self._scroll.setDuration(self.SCROLL_MS)
+        self._scroll.setEasingCurve(QEasingCurve.Type.OutCubic)
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(True)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setMovement(QListView.Movement.Static)
+        self.setUniformItemSizes(True)
+        self.setGridSize(TILE_SIZE + QSize(TILE_SPACING, TILE_SPACING))
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setMouseTracking(True)  # Hover highlight
+        self.setItemDelegate(TileDelegate(self))
+        self.setStyleSheet("QListView { background: transparent; border: none; }")
+        self.clicked.connect(self.launch_requested)
+
+    def scrollTo(self, index, hint=QAbstractItemView.ScrollHint.EnsureVisible):
+        bar = self.verticalScrollBar()
+        start = bar.value()
+        if self._scroll.state() == QPropertyAnimation.State.Running:
+            # Aim from where the running animation is heading
+            self._scroll.stop()
+            bar.setValue(self._scroll.endValue())
+        super().scrollTo(index, hint)
+        target = bar.value()
+        if target == start:
+            return
+        bar.setValue(start)
+        self._scroll.setStartValue(start)
+        self._scroll.setEndValue(target)
+        self._scroll.start()
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter) and self.currentIndex().isValid():
+            self.launch_requested.emit(self.currentIndex())
+            return
+        super().keyPressEvent(event)
+
+    def columns(self):
+        return max(1, self.viewport().width() // self.gridSize().width())
+
+    def visible_keys(self):
+        """Keys of the tiles at least partly inside the viewport."""
+        model = self.model()
+        top = self.verticalScrollBar().value()
+        height = self.gridSize().height()
+        first = top // height * self.columns()
+        last = min(model.rowCount(), (top + self.viewport().height()) // height * self.columns() + self.columns())
+        return {model.index(row).data(KEY_ROLE) for row in range(first, last)}
 
 
 class ApplicationMenu(QWidget):
-    def __init__(self):
+    RELOAD_DELAY_MS = 300  # Editor saves come in bursts; reload once they settle
+
+    def __init__(self, programs_file=None, icons_dir=None):
         super().__init__()
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(20, 20, 20, 20)  # Added 20px top margin
         main_layout.setSpacing(0)
-
-        # Grid for app icons
-        grid = QGridLayout()
-        grid.setSpacing(10)  # tighter spacing
-        grid.setContentsMargins(0, 0, 0, 0)
-        main_layout.addLayout(grid, stretch=0)
-        main_layout.setAlignment(grid, Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+        self.main_layout = main_layout
 
         # Paths
         base_dir = os.path.dirname(__file__)
-        programs_file = os.path.join(base_dir, "programs.txt")
-        icons_dir = os.path.join(base_dir, "icons")
-
-        row, col = 0, 0
-        max_columns = 5  # 5 apps per row
-
-        if os.path.exists(programs_file):
-            with open(programs_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or "|" not in line:
-                        continue
-
-                    parts = [p.strip() for p in line.split("|")]
-                    name = parts[0]
-                    command = parts[1]
-                    icon_file = parts[2] if len(parts) > 2 else None
-
-                    if icon_file:
-                        icon_path = os.path.join(icons_dir, icon_file)
-                        if os.path.exists(icon_path):
-                            # Use AnimatedButton with faster animation for tiles
-                            if AnimatedButton:
-                                btn = AnimatedButton(
-                                    "",
-                                    lambda cmd=command: self.launch_program(cmd),
-                                    animation_speed=100  # faster clicks for apps
-                                )
-                                btn.setIcon(QIcon(icon_path))
-                                btn.setIconSize(QSize(200, 300))
-                                btn.setFixedSize(200, 300)  # enforce 2:3 ratio
-                                btn.set_tile_mode()  # Enable tile mode for icon buttons
-                            else:
-                                btn = QPushButton("")
-                                btn.setIcon(QIcon(icon_path))
-                                btn.setIconSize(QSize(200, 300))
-                                btn.setFixedSize(200, 300)
-                                btn.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-                                # Apply tile-like style for fallback
-                                btn.setStyleSheet("""
-                                    QPushButton {
-                                        background: transparent;
-                                        border: none;
-                                    }
-                                    QPushButton:hover {
-                                        background-color: rgba(255,255,255,0.08);
-                                        border-radius: 12px;
-                                    }
-                                """)
-                                btn.clicked.connect(lambda _, cmd=command: self.launch_program(cmd))
-                        else:
-                            btn = self._make_text_button(name, command)
-                    else:
-                        btn = self._make_text_button(name, command)
-
-                    grid.addWidget(btn, row, col)
-
-                    # Next column/row
-                    col += 1
-                    if col >= max_columns:
-                        col = 0
-                        row += 1
-        else:
-            error_label = QLabel("⚠ programs.txt not found")
-            error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            main_layout.addWidget(error_label)
-
-    def _make_text_button(self, name, command):
-        """Fallback text button if no icon is available."""
-        from PyQt6.QtWidgets import QPushButton
-        if AnimatedButton:
-            try:
-                return AnimatedButton(name, lambda: self.launch_program(command))
-            except TypeError:
-                btn = AnimatedButton(name)
-                btn.clicked.connect(lambda: self.launch_program(command))
-                return btn
-        else:
-            btn = QPushButton(name)
-            btn.clicked.connect(lambda: self.launch_program(command))
-            return btn
+        self.programs_file = programs_file or os.path.join(base_dir, "programs.txt")
+        self.icons_dir = icons_dir or os.path.join(base_dir, "icons")
+
+        self.error_label = None
+
+        # Tiles show the app name until their icon has loaded
+        self.icon_loader = IconLoader(TILE_SIZE, self.devicePixelRatioF(), self)
+        app = QApplication.instance()
+        if app:
+            app.aboutToQuit.connect(self.icon_loader.stop)
+        self.model = ApplicationModel(self.icon_loader, self)
+
+        # Grid of app tiles; only the visible ones are painted
+        self.grid = ApplicationGrid()
+        self.grid.setModel(self.model)
+        self.grid.launch_requested.connect(lambda index: self.launch_program(index.data(COMMAND_ROLE)))
+        self._retain_timer = QTimer(self)
+        self._retain_timer.setSingleShot(True)
+        self._retain_timer.setInterval(100)
+        self._retain_timer.timeout.connect(self._scrolled)
+        self.grid.verticalScrollBar().valueChanged.connect(self._retain_timer.start)
+        main_layout.addWidget(self.grid, stretch=1)
+        self.setFocusProxy(self.grid)
+
+        self._apply_entries(parse_programs(self.programs_file, self.icons_dir))
+
+        # Hot reload: watch programs.txt, its directory (editors replace the file
+        # on save) and the icons directory
+        self._reload_generation = 0
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(self.RELOAD_DELAY_MS)
+        self._reload_timer.timeout.connect(self.reload)
+        self.watcher = QFileSystemWatcher(self)
+        self._watch_paths()
+        self.watcher.fileChanged.connect(self._reload_timer.start)
+        self.watcher.directoryChanged.connect(self._reload_timer.start)
+
+    def _watch_paths(self):
+        watched = set(self.watcher.files() + self.watcher.directories())
+        # Icon files too: overwriting one in place does not change its directory
+        icons = [entry["icon"] for entry in self.model.entries if entry["icon"]]
+        for path in [self.programs_file, os.path.dirname(os.path.abspath(self.programs_file)), self.icons_dir] + icons:
+            if path not in watched and os.path.exists(path):
+                self.watcher.addPath(path)
+
+    def reload(self):
+        """Re-parse programs.txt off the GUI thread and apply the differences."""
+        self._watch_paths()  # A replaced file drops out of the watcher
+        self._reload_generation += 1
+        generation = self._reload_generation
+        jobs.executor().submit(parse_programs, self.programs_file, self.icons_dir,
+                               on_done=lambda entries: self._reload_done(generation, entries))
+
+    def _reload_done(self, generation, entries):
+        if generation == self._reload_generation:  # Ignore a slower, older parse
+            self._apply_entries(entries)
+
+    def _apply_entries(self, entries):
+        """Show `entries`, keeping loaded icons that did not change and the current tile."""
+        if entries is None:
+            if not self.error_label:
+                self.error_label = QLabel("⚠ programs.txt not found")
+                self.error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.main_layout.addWidget(self.error_label)
+            entries = []
+        elif self.error_label:
+            self.main_layout.removeWidget(self.error_label)
+            self.error_label.deleteLater()
+            self.error_label = None
+
+        current = self.grid.currentIndex()
+        current_key = current.data(KEY_ROLE) if current.isValid() else None
+        self.model.set_entries(entries)
+        if current_key is not None and entries:
+            # The same tile if it still exists, else the one now in its place
+            row = self.model.rows.get(current_key, min(current.row(), len(entries) - 1))
+            self.grid.setCurrentIndex(self.model.index(row))
+
+    def hibernate(self):
+        """Release the decoded icons while a fullscreen app has the screen."""
+        self._retain_timer.stop()
+        self.model.release()  # Visible tiles request theirs again (cache hits) on the next paint
+
+    def _scrolled(self):
+        self.model.retain(self.grid.visible_keys())  # Scrolled-past tiles need not load
 
     def launch_program(self, command):
-        """Launch a program. For Steamlink, kill GUI/FB and switch to console."""
-        try:
-            if "steamlink" in command.lower():
-                # Steamlink needs pure console—no GUI/FB
-                import os
-                os.system("pkill -f python3")  # Zap GUI to free resources
-                # Switch to TTY1 (console) and run Steamlink
-                os.system(f"chvt 1 && {command} && echo 'Steamlink ended—run steamlink-kiosk to restart GUI'")
-            else:
-                # Other apps: Run normally
-                subprocess.Popen(command.split())
-            print(f"Launched: {command}")
-        except Exception as e:
-            print(f"Error launching {command}: {e}")
\ No newline at end of file
+        """
+        Launch a program and return its LaunchedApp (None if it did not start).
+        Steamlink takes over the screen; the GUI comes back when it exits.
+        """
+        return launcher.supervisor().launch(command, fullscreen="steamlink" in command.lower())
@@ -1,9 +1,10 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QPushButton, QHeaderView
+    QApplication, QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QPushButton, QHeaderView
 )
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
-import subprocess
-import time
+from PyQt6.QtCore import Qt
+from bluetooth_backend import create_backend
+from jobs import set_busy, set_label
+import poller
 
 try:
     from animated_button import AnimatedButton
@@ -11,36 +12,6 @@ except Exception:
     AnimatedButton = None
 
 
-class DiscoverableScanner(QThread):
-    devices_found = pyqtSignal(list)
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-
-    def run(self):
-        devices = []
-        try:
-            subprocess.run(["bluetoothctl", "agent", "on"], capture_output=True, timeout=5)
-            subprocess.run(["bluetoothctl", "default-agent"], capture_output=True, timeout=5)
-            subprocess.Popen(["bluetoothctl", "scan", "on"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            time.sleep(10)
-            subprocess.run(["bluetoothctl", "scan", "off"], capture_output=True, timeout=5)
-            result = subprocess.run(["bluetoothctl", "devices"], capture_output=True, text=True, timeout=5)
-            for line in result.stdout.splitlines():
-                if line.startswith("Device "):
-                    parts = line.split(maxsplit=2)
-                    if len(parts) == 3:
-                        mac, name = parts[1], parts[2]
-                        devices.append({"mac": mac, "name": name})
-            # Filter out already paired devices
-            paired_devices = self.parent().get_paired_devices()
-            paired_macs = {d["mac"] for d in paired_devices}
-            devices = [d for d in devices if d["mac"] not in paired_macs]
-        except Exception:
-            pass
-        self.devices_found.emit(devices)
-
-
 class BluetoothMenu(QWidget):
     def __init__(self):
         super().__init__()
@@ -63,6 +34,7 @@ class BluetoothMenu(QWidget):
         self.layout.addWidget(self.scan_btn)
 
         self.discovered_table = None
+        self.discovered_rows = {}  # mac -> row in discovered_table
 
         # Spacing
         self.layout.addSpacing(20)
@@ -77,12 +49,39 @@ class BluetoothMenu(QWidget):
         self.layout.addWidget(self.refresh_btn)
 
         self.paired_table = None
+        self.paired_rows = {}  # mac -> {"name", "status", "connected", "action", "forget"}
+        self.busy_macs = {}    # mac -> "action"/"forget" button whose job is running
+
+        # Device state comes from the backend (D-Bus pushes, or bluetoothctl re-reads)
+        self.backend = create_backend(self)
+        self.backend.devices_changed.connect(self._show_paired)
+        self.backend.device_discovered.connect(self._add_discovered)
+        self.backend.discovery_finished.connect(self._discovery_finished)
+        app = QApplication.instance()
+        if app:
+            app.aboutToQuit.connect(self.backend.close)  # Stop and reap any running scan
+
+        # bluetoothctl cannot push changes: re-read them while this page is showing
+        self.poll = None
+        if self.backend.polled:
+            self.poll = poller.scheduler().register("bluetooth", self.backend.read_devices,
+                                                    self.backend.set_devices, page=self)
 
         # Initial load
-        self.refresh_paired()
+        self._show_paired(self.backend.paired_devices())
 
         self.layout.addStretch()
 
+    def hibernate(self):
+        """Stop any scan and drop its table while a fullscreen app has the screen."""
+        if self.backend.is_discovering():
+            self.backend.stop_discovery()
+        self.clear_discovered_table()
+
+    def resume(self):
+        if not self.poll:  # A poller re-reads stale devices by itself
+            self.refresh_paired()  # Pads may have connected or dropped meanwhile
+
     def create_animated_button(self, label, callback):
         """Creates an AnimatedButton if available, otherwise QPushButton."""
         if AnimatedButton:
@@ -94,103 +93,149 @@ class BluetoothMenu(QWidget):
             return btn
 
     def start_discoverable_scan(self):
+        # Pressing the button again while scanning stops the scan early
+        if self.backend.is_discovering():
+            self.backend.stop_discovery()
+            return
         self.status_label.setText("Scanning...")
+        self.scan_btn.setText("Stop Scanning")
         self.clear_discovered_table()
-        self.scan_thread = DiscoverableScanner(self)
-        self.scan_thread.devices_found.connect(self._load_discovered)
-        self.scan_thread.start()
-
-    def _load_discovered(self, devices):
-        self.status_label.setText("")
-        self.clear_discovered_table()
-        if not devices:
-            self.status_label.setText("No discoverable devices found.")
+        self.backend.start_discovery()
+
+    def _add_discovered(self, dev):
+        """Show a device as soon as it is seen; repeat sightings update its row."""
+        mac = dev["mac"]
+        if mac in self.discovered_rows:
+            item = self.discovered_table.item(self.discovered_rows[mac], 0)
+            if item.text() != dev["name"]:
+                item.setText(dev["name"])
             return
 
-        self.discovered_table = QTableWidget(len(devices), 3)
-        self.discovered_table.setHorizontalHeaderLabels(["Name", "MAC Address", "Action"])
-        self.discovered_table.verticalHeader().setVisible(False)
-        self.discovered_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.discovered_table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
-        self.discovered_table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-        self.discovered_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-
-        for row, dev in enumerate(devices):
-            self.discovered_table.setItem(row, 0, QTableWidgetItem(dev["name"]))
-            self.discovered_table.setItem(row, 1, QTableWidgetItem(dev["mac"]))
-            pair_btn = self.create_animated_button("Pair", lambda m=dev["mac"]: self.pair_device(m))
-            self.discovered_table.setCellWidget(row, 2, pair_btn)
-
-        pos = self.layout.indexOf(self.scan_btn) + 1
-        self.layout.insertWidget(pos, self.discovered_table)
+        if not self.discovered_table:
+            self.discovered_table = QTableWidget(0, 3)
+            self.discovered_table.setHorizontalHeaderLabels(["Name", "MAC Address", "Action"])
+            self.discovered_table.verticalHeader().setVisible(False)
+            self.discovered_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+            self.discovered_table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
+            self.discovered_table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+            self.discovered_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+            pos = self.layout.indexOf(self.scan_btn) + 1
+            self.layout.insertWidget(pos, self.discovered_table)
+
+        row = self.discovered_table.rowCount()
+        self.discovered_table.insertRow(row)
+        self.discovered_table.setItem(row, 0, QTableWidgetItem(dev["name"]))
+        self.discovered_table.setItem(row, 1, QTableWidgetItem(mac))
+        pair_btn = self.create_animated_button("Pair", lambda m=mac: self.pair_device(m))
+        self.discovered_table.setCellWidget(row, 2, pair_btn)
+        self.discovered_rows[mac] = row
+
+    def _discovery_finished(self):
+        self.scan_btn.setText("Scan for New Devices")
+        if self.discovered_rows:
+            self.status_label.setText("")
+        else:
+            self.status_label.setText("No discoverable devices found.")
 
     def clear_discovered_table(self):
         if self.discovered_table:
             self.layout.removeWidget(self.discovered_table)
             self.discovered_table.deleteLater()
             self.discovered_table = None
+        self.discovered_rows = {}
 
     def get_paired_devices(self):
-        try:
-            result = subprocess.run(["bluetoothctl", "paired-devices"], capture_output=True, text=True, timeout=5)
-            devices = []
-            for line in result.stdout.splitlines():
-                if line.startswith("Device "):
-                    parts = line.split(maxsplit=2)
-                    if len(parts) == 3:
-                        mac, name = parts[1], parts[2]
-                        devices.append({"mac": mac, "name": name})
-            return devices
-        except Exception:
-            return []
+        return self.backend.paired_devices()
 
     def get_connected_macs(self):
-        try:
-            result = subprocess.run(["bluetoothctl", "devices Connected"], capture_output=True, text=True, timeout=5)
-            macs = []
-            for line in result.stdout.splitlines():
-                if line.startswith("Device "):
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        macs.append(parts[1])
-            return macs
-        except Exception:
-            return []
+        return [d["mac"] for d in self.backend.paired_devices() if d["connected"]]
 
     def refresh_paired(self):
-        self.clear_paired_table_and_label()
-        paired_pos = self.layout.indexOf(self.refresh_btn) + 1
-        paired = self.get_paired_devices()
+        """Ask the backend to re-read devices; the table updates on devices_changed."""
+        if self.poll:
+            self.poll.poll_now()  # Joins a poll that is already running
+        else:
+            self.backend.refresh()
+
+    def _show_paired(self, paired):
+        """
+        Apply a paired-devices snapshot as a diff keyed by MAC: only rows whose
+        name/status changed are touched, existing buttons are reused, so the
+        table does not relayout and controller focus stays where it was.
+        """
         if not paired:
+            if hasattr(self, 'no_paired_label'):
+                return
+            self.clear_paired_table_and_label()
             self.no_paired_label = QLabel("No paired devices.")
             self.no_paired_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.layout.insertWidget(paired_pos, self.no_paired_label)
+            self.layout.insertWidget(self.layout.indexOf(self.refresh_btn) + 1, self.no_paired_label)
             return
 
-        connected_macs = set(self.get_connected_macs())
-        self.paired_table = QTableWidget(len(paired), 5)
-        self.paired_table.setHorizontalHeaderLabels(["Name", "MAC Address", "Status", "Action", "Forget"])
-        self.paired_table.verticalHeader().setVisible(False)
-        self.paired_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.paired_table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
-        self.paired_table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-        self.paired_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-
-        for row, dev in enumerate(paired):
-            dev["connected"] = dev["mac"] in connected_macs
-            self.paired_table.setItem(row, 0, QTableWidgetItem(dev["name"]))
-            self.paired_table.setItem(row, 1, QTableWidgetItem(dev["mac"]))
-            status = "Connected" if dev["connected"] else "Disconnected"
-            self.paired_table.setItem(row, 2, QTableWidgetItem(status))
-            action_text = "Disconnect" if dev["connected"] else "Connect"
-            action_btn = self.create_animated_button(action_text, lambda m=dev["mac"]: self.toggle_connection(m))
-            self.paired_table.setCellWidget(row, 3, action_btn)
-            forget_btn = self.create_animated_button("Forget", lambda m=dev["mac"]: self.forget_device(m))
-            self.paired_table.setCellWidget(row, 4, forget_btn)
-
-        self.layout.insertWidget(paired_pos, self.paired_table)
+        if not self.paired_table:
+            self.clear_paired_table_and_label()
+            self.paired_table = QTableWidget(0, 5)
+            self.paired_table.setHorizontalHeaderLabels(["Name", "MAC Address", "Status", "Action", "Forget"])
+            self.paired_table.verticalHeader().setVisible(False)
+            self.paired_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+            self.paired_table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
+            self.paired_table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+            self.paired_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+            self.layout.insertWidget(self.layout.indexOf(self.refresh_btn) + 1, self.paired_table)
+
+        wanted = {dev["mac"]: dev for dev in paired}
+
+        # Devices that went away
+        for mac in [m for m in self.paired_rows if m not in wanted]:
+            self._remove_paired_row(mac)
+
+        for dev in paired:
+            mac = dev["mac"]
+            row = self.paired_rows.get(mac)
+            if row is None:
+                self._add_paired_row(dev)
+                continue
+            if row["name"].text() != dev["name"]:
+                row["name"].setText(dev["name"])
+            if row["connected"] != dev["connected"]:
+                row["connected"] = dev["connected"]
+                row["status"].setText("Connected" if dev["connected"] else "Disconnected")
+                set_label(row["action"], "Disconnect" if dev["connected"] else "Connect")
+
+    def _add_paired_row(self, dev):
+        mac = dev["mac"]
+        r = self.paired_table.rowCount()
+        self.paired_table.insertRow(r)
+        name_item = QTableWidgetItem(dev["name"])
+        status_item = QTableWidgetItem("Connected" if dev["connected"] else "Disconnected")
+        self.paired_table.setItem(r, 0, name_item)
+        self.paired_table.setItem(r, 1, QTableWidgetItem(mac))
+        self.paired_table.setItem(r, 2, status_item)
+        action_text = "Disconnect" if dev["connected"] else "Connect"
+        action_btn = self.create_animated_button(action_text, lambda m=mac: self.toggle_connection(m))
+        self.paired_table.setCellWidget(r, 3, action_btn)
+        forget_btn = self.create_animated_button("Forget", lambda m=mac: self.forget_device(m))
+        self.paired_table.setCellWidget(r, 4, forget_btn)
+        self.paired_rows[mac] = {"name": name_item, "status": status_item, "connected": dev["connected"],
+                                 "action": action_btn, "forget": forget_btn}
+        if mac in self.busy_macs:
+            set_busy(self.paired_rows[mac][self.busy_macs[mac]], True)
+
+    def _remove_paired_row(self, mac):
+        row = self.paired_rows.pop(mac)
+        r = self.paired_table.row(row["name"])
+        had_focus = row["action"].hasFocus() or row["forget"].hasFocus()
+        self.paired_table.removeRow(r)
+        if had_focus:
+            # Keep the controller inside the table: same row index, else the one above
+            remaining = self.paired_table.rowCount()
+            if remaining:
+                self.paired_table.cellWidget(min(r, remaining - 1), 3).setFocus()
+            else:
+                self.refresh_btn.setFocus()
 
     def clear_paired_table_and_label(self):
+        self.paired_rows = {}
         if self.paired_table:
             self.layout.removeWidget(self.paired_table)
             self.paired_table.deleteLater()
@@ -201,27 +246,50 @@ class BluetoothMenu(QWidget):
             del self.no_paired_label
 
     def pair_device(self, mac):
-        try:
-            subprocess.run(["bluetoothctl", "pair", mac], capture_output=True, timeout=10)
+        # Pairing is more reliable with discovery off; this also ends the scan early
+        self.backend.stop_discovery()
+        pair_btn = self.discovered_table.cellWidget(self.discovered_rows[mac], 2) if mac in self.discovered_rows else None
+        if pair_btn is not None and getattr(pair_btn, "busy", False):
+            return
+        set_busy(pair_btn, True)
+        self.status_label.setText("Pairing...")
+        self.backend.pair_device(mac, callback=lambda error: self._pair_done(pair_btn, error))
+
+    def _pair_done(self, pair_btn, error):
+        if error:
+            set_busy(pair_btn, False)
+            self.status_label.setText("Pairing failed.")
+        else:
+            self.status_label.setText("")
             self.clear_discovered_table()
-            self.refresh_paired()
-        except Exception:
-            pass
+
+    def _run_row_action(self, mac, button, action, verb):
+        """Run a paired-row action with that row's button shown busy; `verb` names it in a failure."""
+        if mac in self.busy_macs:
+            return
+        self.busy_macs[mac] = button
+        row = self.paired_rows.get(mac)
+        if row:
+            set_busy(row[button], True)
+        action(mac, callback=lambda error: self._row_action_done(mac, verb, error))
+
+    def _row_action_done(self, mac, verb, error):
+        button = self.busy_macs.pop(mac, None)
+        row = self.paired_rows.get(mac)
+        if row and button:
+            set_busy(row[button], False)
+        if error:
+            name = row["name"].text() if row else mac
+            self.status_label.setText(f"{verb} {name} failed.")
+        elif self.status_label.text().endswith(" failed."):
+            self.status_label.setText("")  # An earlier failure no longer applies
 
     def toggle_connection(self, mac):
-        try:
-            connected_macs = set(self.get_connected_macs())
-            if mac in connected_macs:
-                subprocess.run(["bluetoothctl", "disconnect", mac], capture_output=True, timeout=5)
-            else:
-                subprocess.run(["bluetoothctl", "connect", mac], capture_output=True, timeout=5)
-            self.refresh_paired()
-        except Exception:
-            pass
+        # Connected state is already known from the backend; no need to re-query
+        if self.backend.is_connected(mac):
+            self._run_row_action(mac, "action", self.backend.disconnect_device, "Disconnecting")
+        else:
+            self._run_row_action(mac, "action", self.backend.connect_device, "Connecting")
 
     def forget_device(self, mac):
-        try:
-            subprocess.run(["bluetoothctl", "remove", mac], capture_output=True, timeout=5)
-            self.refresh_paired()
-        except Exception:
-            pass
\ No newline at end of file
+        self._run_row_action(mac, "forget", self.backend.remove_device, "Forgetting")
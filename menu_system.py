@@ -3,8 +3,10 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QComboBox, QPushButton, QHBoxLayout
 )
 from PyQt6.QtCore import Qt
-import subprocess
+import jobs
+import spawner
 import shutil
+import state
 
 # Try importing your AnimatedButton. If it doesn't match the expected
 # constructor or isn't available, we'll gracefully fall back.
@@ -13,6 +15,13 @@ try:
 except Exception:
     AnimatedButton = None
 
+# Dropdown label -> (mode key, tvservice mode)
+RESOLUTIONS = {
+    "1080p": ("1080p", "DMT 82 HDMI"),         # 1080p60
+    # DMT 51 is commonly used for 2560x1440; behaviour may vary with Pi firmware and display
+    "1440p (beta)": ("1440p", "DMT 51 HDMI"),
+}
+
 
 class SystemMenu(QWidget):
     def __init__(self):
@@ -30,8 +39,8 @@ class SystemMenu(QWidget):
         # --- Top buttons row (Restart / Shutdown / Exit) ---
         # Use AnimatedButton if possible, otherwise fallback to QPushButton.
         top_row = QHBoxLayout()
-        restart_btn = self._make_button("Restart Machine", lambda: subprocess.Popen(["sudo", "reboot"]))
-        shutdown_btn = self._make_button("Shutdown Machine", lambda: subprocess.Popen(["sudo", "shutdown", "now"]))
+        restart_btn = self._make_button("Restart Machine", lambda: spawner.Popen(["sudo", "reboot"]))
+        shutdown_btn = self._make_button("Shutdown Machine", lambda: spawner.Popen(["sudo", "shutdown", "now"]))
         exit_btn = self._make_button("Exit App", self.close_app)
 
         top_row.addWidget(restart_btn)
@@ -39,6 +48,26 @@ class SystemMenu(QWidget):
         top_row.addWidget(exit_btn)
         layout.addLayout(top_row)
 
+        # Current display mode from the shared state store (tvservice, else the framebuffer)
+        self.display_label = QLabel("Display: …")
+        self.display_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.display_label)
+        self.state = state.store()
+        self.state.subscribe("display.mode", self.show_display_mode, owner=self)
+        self.state.get("display.mode", self.show_display_mode)
+
+        # --- Resolution row ---
+        res_row = QHBoxLayout()
+        self.res_dropdown = QComboBox()
+        for label, (mode, _) in RESOLUTIONS.items():
+            self.res_dropdown.addItem(label, mode)
+        self.apply_btn = self._make_button("Apply", self.apply_resolution)
+        self.apply_btn.setEnabled(bool(shutil.which("tvservice")))
+        res_row.addWidget(QLabel("Resolution:"))
+        res_row.addWidget(self.res_dropdown)
+        res_row.addWidget(self.apply_btn)
+        layout.addLayout(res_row)
+
         layout.addStretch()  # push everything to top
 
     def _make_button(self, label, callback):
@@ -71,31 +100,44 @@ class SystemMenu(QWidget):
         btn.clicked.connect(callback)
         return btn
 
+    def show_display_mode(self, mode):
+        self.display_label.setText(f"Display: {mode or 'unknown'}")
+
     def apply_resolution(self):
         """
         Apply the selected resolution using Raspberry Pi's tvservice + fbset.
         Runs only when tvservice is available (Apply button is disabled otherwise).
+        The commands run as one background job with the Apply button busy.
         """
         if not shutil.which("tvservice"):
             print("tvservice not found; skipping resolution change.")
             return
+        if getattr(self.apply_btn, "busy", False):
+            return
 
         mode = self.res_dropdown.currentData()
-        try:
-            if mode == "1080p":
-                # 1080p60 (DMT mode 82)
-                subprocess.run(["tvservice", "-e", "DMT 82 HDMI"], check=True)
-                subprocess.run(["fbset", "-depth", "8"], check=True)
-                subprocess.run(["fbset", "-depth", "16"], check=True)
-            elif mode == "1440p":
-                # 1440p (beta) - DMT 51 is commonly used for 2560x1440 modes,
-                # behaviour may vary depending on Pi firmware and display.
-                subprocess.run(["tvservice", "-e", "DMT 51 HDMI"], check=True)
-                subprocess.run(["fbset", "-depth", "8"], check=True)
-                subprocess.run(["fbset", "-depth", "16"], check=True)
+        tv_mode = next((tv for key, tv in RESOLUTIONS.values() if key == mode), None)
+        if tv_mode is None:
+            return
+        jobs.executor().submit(self._set_resolution, tv_mode, timeout=20, busy=self.apply_btn,
+                               on_done=lambda _result: self._resolution_done(mode, None),
+                               on_error=lambda e: self._resolution_done(mode, e))
+
+    @staticmethod
+    def _set_resolution(tv_mode):
+        """Worker thread: switch the HDMI mode, then cycle the depth so the framebuffer follows."""
+        spawner.run(["tvservice", "-e", tv_mode], check=True, timeout=10)
+        spawner.run(["fbset", "-depth", "8"], check=True, timeout=5)
+        spawner.run(["fbset", "-depth", "16"], check=True, timeout=5)
+
+    def _resolution_done(self, mode, error):
+        if error:
+            print("Error applying resolution:", error)
+        else:
             print(f"Applied resolution mode: {mode}")
-        except subprocess.CalledProcessError as e:
-            print("Error applying resolution:", e)
+        # Even a failed switch may have changed the mode
+        self.state.invalidate("display.mode")
+        self.state.get("display.mode", self.show_display_mode)
 
     def close_app(self):
         # Close the main window (same as Exit button behavior previously)
@@ -1,6 +1,11 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QProgressBar, QHBoxLayout
-from PyQt6.QtCore import Qt, QTimer
-import subprocess
+from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QProgressBar, QHBoxLayout
+from PyQt6.QtCore import Qt, QThread
+import spawner
+import jobs
+import state
+import select
+import time
+import os
 import re
 import shutil
 
@@ -10,6 +15,105 @@ except Exception:
     AnimatedButton = None
 
 
+# Lines from `pactl subscribe` that can change the default sink's volume/mute.
+# "server" covers the default sink being switched to another device.
+SINK_EVENT_RE = re.compile(r"^Event '(new|change|remove)' on (sink|server)(?: #\d+)?$")
+
+
+class SinkMonitor(QThread):
+    """
+    Keeps one `pactl subscribe` stream open and re-reads the default sink into
+    the state store only when PulseAudio/PipeWire reports a sink or server
+    change; the store tells audio.sink subscribers if (volume, muted) differs.
+    Both the stream and the re-reads run the `pactl` found on PATH, which is
+    also how benchmark.py swaps in a fake one.
+    """
+
+    COALESCE_DELAY = 0.05  # Fold event bursts (e.g. holding Volume +) into one query
+    RESTART_DELAY = 1.0    # First retry delay if pactl exits (audio server restart)
+    MAX_RESTART_DELAY = 30.0
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._proc = None
+        self._stopping = False
+
+    def stop(self):
+        self._stopping = True
+        proc = self._proc
+        if proc and proc.poll() is None:
+            try:
+                proc.terminate()
+            except Exception:
+                pass
+        self.wait(2000)
+
+    def restart(self):
+        """Subscribe again after stop(); the sink is re-read on the way."""
+        if self.isRunning():
+            return
+        self._stopping = False
+        self.start()
+
+    def _refresh(self):
+        state.store().refresh("audio.sink")
+
+    def run(self):
+        delay = self.RESTART_DELAY
+        while not self._stopping:
+            try:
+                self._proc = spawner.Popen(["pactl", "subscribe"], stdout=spawner.PIPE,
+                                           stderr=spawner.DEVNULL, stdin=spawner.DEVNULL)
+            except Exception as e:
+                print(f"pactl subscribe failed: {e}")
+                return
+
+            started = time.monotonic()
+            # Read state after subscribing so no change can slip in between
+            self._refresh()
+            self._read_events(self._proc.stdout.fileno())
+
+            self._proc.stdout.close()
+            try:
+                self._proc.kill()
+            except Exception:
+                pass
+            self._proc.wait()
+            self._proc = None
+
+            if self._stopping:
+                break
+            # Subscription dropped; reset backoff if it had been healthy for a while
+            if time.monotonic() - started > self.MAX_RESTART_DELAY:
+                delay = self.RESTART_DELAY
+            end = time.monotonic() + delay
+            while not self._stopping and time.monotonic() < end:
+                time.sleep(0.1)
+            delay = min(delay * 2, self.MAX_RESTART_DELAY)
+
+    def _read_events(self, fd):
+        """Block on the event stream until EOF or stop(); refresh on sink events."""
+        buf = b""
+        pending = False
+        while not self._stopping:
+            timeout = self.COALESCE_DELAY if pending else None
+            ready, _, _ = select.select([fd], [], [], timeout)
+            if not ready:
+                # Stream went quiet after a burst: query once
+                pending = False
+                self._refresh()
+                continue
+
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                return
+            buf += chunk
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                if SINK_EVENT_RE.match(line.decode("utf-8", "replace").strip()):
+                    pending = True
+
+
 class VolumeMenu(QWidget):
     def __init__(self):
         super().__init__()
@@ -58,15 +162,32 @@ class VolumeMenu(QWidget):
 
         layout.addWidget(self.volume_bar)
 
-        # Timer to update volume continuously
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_volume)
-        self.timer.start(1000)
+        # pactl calls run off the GUI thread, one at a time so presses never race
+        self.jobs = jobs.JobExecutor(max_threads=1, parent=self)
+        self.state = state.store()
+        self.state.subscribe("audio.sink", lambda sink: self.apply_sink_state(*sink), owner=self)
 
-        self.update_volume()
+        # Event-driven updates: one long-lived `pactl subscribe` instead of polling
+        self.sink_monitor = None
+        if shutil.which("pactl"):
+            self.sink_monitor = SinkMonitor(parent=self)
+            app = QApplication.instance()
+            if app:
+                app.aboutToQuit.connect(self.sink_monitor.stop)
+            self.sink_monitor.start()
+        self.update_volume()  # The store only notifies on changes; show what it knows now
 
         layout.addStretch()
 
+    def hibernate(self):
+        """Close the pactl subscription while a fullscreen app has the screen."""
+        if self.sink_monitor:
+            self.sink_monitor.stop()
+
+    def resume(self):
+        if self.sink_monitor:
+            self.sink_monitor.restart()  # Shows any change made while hibernating
+
     def _make_button(self, label, callback):
         """Creates an AnimatedButton if available, otherwise QPushButton."""
         from PyQt6.QtWidgets import QPushButton
@@ -87,48 +208,43 @@ class VolumeMenu(QWidget):
         if not shutil.which("pactl"):
             print("pactl not found, volume control not available.")
             return
+        self.jobs.submit(self._change_volume, delta, timeout=10, on_done=self._after_change)
 
-        is_muted = self.get_mute_state()
+    def _change_volume(self, delta):
+        """Worker thread: unmute if needed and step the volume."""
+        current, is_muted = self.state.value("audio.sink")
         if is_muted:
             # Unmute first if currently muted
-            subprocess.run(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "toggle"])
+            spawner.run(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "toggle"], timeout=5)
 
-        current = self.get_volume()
         if current is not None:
             new_volume = max(0, min(100, current + delta))
-            subprocess.run(["pactl", "set-sink-volume", "@DEFAULT_SINK@", f"{new_volume}%"])
+            spawner.run(["pactl", "set-sink-volume", "@DEFAULT_SINK@", f"{new_volume}%"], timeout=5)
+            # Known without asking pactl: the next press steps from here
+            self.state.set("audio.sink", (new_volume, False))
+        else:
+            self.state.invalidate("audio.sink")
 
-        # Update immediately for responsiveness
-        self.update_volume()
+    def _after_change(self, _result=None):
+        # The sink monitor picks up the change event; only poll without it
+        if not self.sink_monitor:
+            self.update_volume()
 
     def toggle_mute(self):
         if not shutil.which("pactl"):
             print("pactl not found, mute not available.")
             return
-        subprocess.run(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "toggle"])
-        # Update immediately for responsiveness
-        self.update_volume()
-
-    def get_volume(self):
-        try:
-            result = subprocess.run(["pactl", "get-sink-volume", "@DEFAULT_SINK@"],
-                                    capture_output=True, text=True)
-            match = re.search(r'(\d+)%', result.stdout)
-            return int(match.group(1)) if match else None
-        except Exception:
-            return None
-
-    def get_mute_state(self):
-        try:
-            result = subprocess.run(["pactl", "get-sink-mute", "@DEFAULT_SINK@"],
-                                    capture_output=True, text=True)
-            return "Mute: yes" in result.stdout
-        except Exception:
-            return False
+        self.jobs.run_command(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "toggle"],
+                              on_done=self._after_mute)
+
+    def _after_mute(self, _result=None):
+        self.state.invalidate("audio.sink")
+        self._after_change()
 
     def update_volume(self):
-        current = self.get_volume()
-        is_muted = self.get_mute_state()
+        self.state.get("audio.sink", lambda sink: self.apply_sink_state(*sink))
+
+    def apply_sink_state(self, current, is_muted):
         if is_muted:
             self.volume_bar.setValue(0)
             self.volume_bar.setFormat("Muted")
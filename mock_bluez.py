@@ -0,0 +1,222 @@
+"""
+Mock BlueZ service, to run BluezDBusBackend without an adapter or bluetoothd.
+
+    dbus-run-session -- python3 mock_bluez.py --paired 2 --nearby 3
+    python3 benchmark.py bluez       # Private bus, this mock and the backend checks
+
+Owns org.bluez (or --service) on the session bus and serves ObjectManager at
+/, AgentManager1 at /org/bluez, Adapter1 at /org/bluez/hci0 and one Device1
+per pad. Pair/Connect/Disconnect change the pad's properties (Pair/Connect
+after --delay) and emit PropertiesChanged. StartDiscovery adds the --nearby pads and a "Broken Pad"
+one by one (InterfacesAdded); the broken one refuses to pair. Connect to
+the --stall pad never answers. RemoveDevice drops a pad (InterfacesRemoved). Prints "ready" once the name is owned and
+"default-agent <path>" when a client becomes the default agent.
+"""
+import argparse
+import asyncio
+import logging
+
+from dbus_next import BusType
+from dbus_next.aio import MessageBus
+from dbus_next.errors import DBusError
+from dbus_next.service import PropertyAccess, ServiceInterface, dbus_property, method
+
+ADAPTER_PATH = "/org/bluez/hci0"
+BROKEN_MAC = "00:11:22:33:66:00"
+
+
+def paired_mac(i):
+    return f"00:11:22:33:44:{i:02X}"
+
+
+def nearby_mac(i):
+    return f"00:11:22:33:55:{i:02X}"
+
+
+def device_path(mac):
+    return f"{ADAPTER_PATH}/dev_{mac.replace(':', '_')}"
+
+
+class MockDevice(ServiceInterface):
+    def __init__(self, mac, name, paired=False, connected=False, delay=0.05):
+        super().__init__("org.bluez.Device1")
+        self.mac = mac
+        self.alias = name  # `name` is the interface name
+        self.paired = paired
+        self.connected = connected
+        self.trusted = paired
+        self.delay = delay  # Seconds until a Pair/Connect shows in the properties
+        self.stall = False  # Connect never answers, like a pad that stopped responding
+
+    def _set(self, **props):
+        for key, value in props.items():
+            setattr(self, key.lower(), value)
+        self.emit_properties_changed(props)
+
+    def _set_later(self, **props):
+        asyncio.get_running_loop().call_later(self.delay, lambda: self._set(**props))
+
+    @method()
+    def Pair(self):
+        if self.mac == BROKEN_MAC:
+            raise DBusError("org.bluez.Error.AuthenticationFailed", "Authentication Failed")
+        if self.paired:
+            raise DBusError("org.bluez.Error.AlreadyExists", "Already Exists")
+        self._set_later(Paired=True)
+
+    @method()
+    async def Connect(self):
+        if self.stall:
+            await asyncio.Event().wait()
+        if not self.paired:
+            raise DBusError("org.bluez.Error.Failed", "Not paired")
+        self._set_later(Connected=True)
+
+    @method()
+    def Disconnect(self):
+        self._set(Connected=False)
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Address(self) -> "s":
+        return self.mac
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Name(self) -> "s":
+        return self.alias
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Alias(self) -> "s":
+        return self.alias
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Paired(self) -> "b":
+        return self.paired
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Connected(self) -> "b":
+        return self.connected
+
+    @dbus_property()
+    def Trusted(self) -> "b":
+        return self.trusted
+
+    @Trusted.setter
+    def Trusted(self, value: "b"):
+        self.trusted = value
+
+
+class MockAdapter(ServiceInterface):
+    def __init__(self, bus, nearby, interval=0.1):
+        super().__init__("org.bluez.Adapter1")
+        self.bus = bus
+        self.devices = {}  # path -> MockDevice
+        self.nearby = nearby  # Pads the next discovery finds, in order
+        self.interval = interval
+        self.discovering = False
+        self._scan = None
+
+    def add(self, device):
+        path = device_path(device.mac)
+        self.devices[path] = device
+        self.bus.export(path, device)  # Emits InterfacesAdded
+
+    async def _discover(self):
+        for device in list(self.nearby):
+            await asyncio.sleep(self.interval)
+            if device_path(device.mac) not in self.devices:
+                self.add(device)
+
+    @method()
+    def StartDiscovery(self):
+        if self.discovering:
+            raise DBusError("org.bluez.Error.InProgress", "Operation already in progress")
+        self.discovering = True
+        self.emit_properties_changed({"Discovering": True})
+        self._scan = asyncio.get_running_loop().create_task(self._discover())
+
+    @method()
+    def StopDiscovery(self):
+        if not self.discovering:
+            raise DBusError("org.bluez.Error.Failed", "No discovery started")
+        self.discovering = False
+        self._scan.cancel()
+        self.emit_properties_changed({"Discovering": False})
+
+    @method()
+    def RemoveDevice(self, device: "o"):
+        if self.devices.pop(device, None) is None:
+            raise DBusError("org.bluez.Error.DoesNotExist", "Does Not Exist")
+        self.bus.unexport(device)  # Emits InterfacesRemoved
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Address(self) -> "s":
+        return "00:AA:BB:CC:DD:EE"
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Powered(self) -> "b":
+        return True
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Discovering(self) -> "b":
+        return self.discovering
+
+
+class MockAgentManager(ServiceInterface):
+    def __init__(self):
+        super().__init__("org.bluez.AgentManager1")
+        self.agents = {}  # path -> capability
+        self.default = None
+
+    @method()
+    def RegisterAgent(self, agent: "o", capability: "s"):
+        if agent in self.agents:
+            raise DBusError("org.bluez.Error.AlreadyExists", "Already Exists")
+        self.agents[agent] = capability
+
+    @method()
+    def RequestDefaultAgent(self, agent: "o"):
+        if agent not in self.agents:
+            raise DBusError("org.bluez.Error.DoesNotExist", "Does Not Exist")
+        self.default = agent
+        print(f"default-agent {agent}", flush=True)
+
+    @method()
+    def UnregisterAgent(self, agent: "o"):
+        self.agents.pop(agent, None)
+
+
+async def serve(service="org.bluez", paired=2, nearby=3, delay=0.05, stall=None, bus_address=None):
+    bus = await (MessageBus(bus_address=bus_address) if bus_address
+                 else MessageBus(bus_type=BusType.SESSION)).connect()
+    nearby_pads = [MockDevice(nearby_mac(i), f"Nearby Pad {i}", delay=delay) for i in range(nearby)]
+    nearby_pads.append(MockDevice(BROKEN_MAC, "Broken Pad", delay=delay))
+    adapter = MockAdapter(bus, nearby_pads)
+    bus.export("/org/bluez", MockAgentManager())
+    bus.export(ADAPTER_PATH, adapter)
+    for i in range(paired):
+        # The first paired pad starts out connected
+        adapter.add(MockDevice(paired_mac(i), f"Paired Pad {i}", paired=True, connected=i == 0, delay=delay))
+    for device in adapter.devices.values():
+        device.stall = device.mac == stall
+    await bus.request_name(service)
+    print("ready", flush=True)
+    await bus.wait_for_disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--service", default="org.bluez")
+    parser.add_argument("--paired", type=int, default=2)
+    parser.add_argument("--nearby", type=int, default=3)
+    parser.add_argument("--delay", type=float, default=0.05, help="seconds until a Pair/Connect takes effect")
+    parser.add_argument("--stall", metavar="MAC", help="paired pad whose Connect never answers")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.CRITICAL)  # dbus-next logs each BlueZ error a method raises
+    try:
+        asyncio.run(serve(args.service, args.paired, args.nearby, args.delay, args.stall))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
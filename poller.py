@@ -0,0 +1,187 @@
+"""
+One scheduler for every periodic refresh in the GUI.
+
+    self.poll = poller.scheduler().register("bluetooth", backend.read_devices,
+                                            backend.set_devices, page=self)
+
+A poller's function runs on the job executor and its result is handed to
+on_result on the GUI thread, which applies it and returns whether anything
+changed. Pollers run only while the screen is awake and their page (None:
+any page) is the current one. A page that comes back with data older than `max_age`
+is polled at once. A poll that finds nothing new, or fails, doubles the
+delay up to `max_interval`; a change drops it back to `interval`. A
+poll_now() while that poller is already running joins the running poll
+instead of starting another. One single-shot timer serves all pollers.
+
+Cadences live in POLICY and can be overridden per poller with
+STEAMLINK_POLL=name=interval:max_interval:max_age,... (seconds, any prefix).
+"""
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QTimer
+import os
+import time
+import jobs
+
+# name -> (interval, max_interval, max_age) in seconds
+POLICY = {
+    "ip": (10.0, 300.0, 60.0),        # Sidebar address; DHCP can finish after the GUI starts
+    "bluetooth": (5.0, 60.0, 5.0),    # Paired/connected pads, where BlueZ does not push changes
+}
+DEFAULT_POLICY = (10.0, 120.0, 10.0)
+BACKOFF = 2.0
+
+
+def load_policy(env=None):
+    """POLICY with STEAMLINK_POLL overrides applied."""
+    policy = dict(POLICY)
+    value = (env if env is not None else os.environ).get("STEAMLINK_POLL", "")
+    for item in filter(None, value.split(",")):
+        name, _, numbers = item.partition("=")
+        try:
+            values = [float(v) for v in numbers.split(":")[:3]]
+        except ValueError:
+            print(f"Ignoring invalid STEAMLINK_POLL entry {item!r}")
+            continue
+        base = policy.get(name.strip(), DEFAULT_POLICY)
+        policy[name.strip()] = tuple(values) + base[len(values):]
+    return policy
+
+
+class Poller:
+    def __init__(self, scheduler, name, fn, on_result, page, interval, max_interval, max_age, timeout):
+        self.scheduler = scheduler
+        self.name = name
+        self.fn = fn
+        self.on_result = on_result
+        self.page = page
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.max_age = max_age
+        self.timeout = timeout
+        self.delay = interval
+        self.due = 0.0          # Monotonic time of the next poll; 0: as soon as it is active
+        self.updated = None     # When the last poll succeeded
+        self.running = False
+        self.waiters = []       # poll_now() callbacks for the running poll
+        self.polls = self.changes = self.errors = self.merged = 0
+
+    def poll_now(self, callback=None):
+        """Poll now, whether or not the page is showing; callback(error) when done."""
+        self.scheduler.request(self, callback)
+
+    def stats(self):
+        return {"polls": self.polls, "changes": self.changes, "errors": self.errors,
+                "merged": self.merged, "delay_s": self.delay,
+                "age_s": None if self.updated is None else round(time.monotonic() - self.updated, 1)}
+
+
+class PollScheduler(QObject):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.policy = load_policy()
+        self.pollers = {}  # name -> Poller
+        self.current_page = None
+        self.awake = True
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._run_due)
+
+    def register(self, name, fn, on_result, page=None, timeout=15):
+        """Add a poller (replacing one with the same name) and return it."""
+        interval, max_interval, max_age = self.policy.get(name, DEFAULT_POLICY)
+        poller = Poller(self, name, fn, on_result, page, interval, max_interval, max_age, timeout)
+        self.pollers[name] = poller
+        if page is not None:
+            # At exit the scheduler may be deleted before the page
+            page.destroyed.connect(lambda *_: sip.isdeleted(self) or self.unregister(poller))
+        self._reschedule()
+        return poller
+
+    def unregister(self, poller):
+        if self.pollers.get(poller.name) is poller:
+            del self.pollers[poller.name]
+            self._reschedule()
+
+    def is_active(self, poller):
+        return self.awake and (poller.page is None or poller.page is self.current_page)
+
+    def set_current_page(self, page):
+        self.current_page = page
+        self._refresh_stale()
+
+    def set_awake(self, awake):
+        """False while the GUI hibernates: nothing polls until it wakes."""
+        self.awake = awake
+        self._refresh_stale()
+
+    def _refresh_stale(self):
+        now = time.monotonic()
+        for poller in self.pollers.values():
+            if self.is_active(poller) and (poller.updated is None or now - poller.updated > poller.max_age):
+                poller.due = min(poller.due, now)  # Back on screen with old data
+        self._reschedule()
+
+    def _reschedule(self):
+        due = [p.due for p in self.pollers.values() if self.is_active(p) and not p.running]
+        if not due:
+            self._timer.stop()
+            return
+        self._timer.start(max(0, int((min(due) - time.monotonic()) * 1000)))
+
+    def _run_due(self):
+        now = time.monotonic()
+        for poller in list(self.pollers.values()):
+            if self.is_active(poller) and not poller.running and poller.due <= now:
+                self._start(poller)
+        self._reschedule()
+
+    def request(self, poller, callback=None):
+        if callback:
+            poller.waiters.append(callback)
+        if poller.running:
+            poller.merged += 1  # Joins the poll already under way
+            return
+        self._start(poller)
+        self._reschedule()
+
+    def _start(self, poller):
+        poller.running = True
+        poller.polls += 1
+        jobs.executor().submit(poller.fn, timeout=poller.timeout,
+                               on_done=lambda result: self._finished(poller, result, None),
+                               on_error=lambda e: self._finished(poller, None, e))
+
+    def _finished(self, poller, result, error):
+        poller.running = False
+        now = time.monotonic()
+        if error is not None:
+            poller.errors += 1
+            print(f"Poll {poller.name} failed: {error}")
+            poller.delay = min(poller.delay * BACKOFF, poller.max_interval)
+        else:
+            poller.updated = now
+            # An unregistered poller's page may be gone; its result is dropped
+            if self.pollers.get(poller.name) is poller and poller.on_result(result):
+                poller.changes += 1
+                poller.delay = poller.interval
+            else:
+                poller.delay = min(poller.delay * BACKOFF, poller.max_interval)
+        poller.due = now + poller.delay
+        waiters, poller.waiters = poller.waiters, []
+        for callback in waiters:
+            callback(error)
+        self._reschedule()
+
+    def stats(self):
+        return {name: poller.stats() for name, poller in self.pollers.items()}
+
+
+_scheduler = None
+
+
+def scheduler():
+    """Shared poll scheduler; create it on the GUI thread."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PollScheduler()
+    return _scheduler
@@ -0,0 +1,41 @@
+"""
+Shared entry point for system commands (pactl, bluetoothctl, tvservice, app launches).
+
+run(), Popen(), getoutput() and system() mirror their subprocess/os
+counterparts and call straight through to subprocess. CPython >= 3.10
+already starts children with vfork/posix_spawn, so a large GUI process does
+not make commands slower (benchmark.py spawn compares the two). Keeping the
+calls here gives one place to change how every command is started.
+"""
+import subprocess
+
+PIPE = subprocess.PIPE
+DEVNULL = subprocess.DEVNULL
+STDOUT = subprocess.STDOUT
+TimeoutExpired = subprocess.TimeoutExpired
+CalledProcessError = subprocess.CalledProcessError
+
+
+def Popen(args, stdin=None, stdout=None, stderr=None, text=False, shell=False,
+          start_new_session=False, env=None):
+    """subprocess.Popen() with the arguments the GUI uses."""
+    return subprocess.Popen(args, stdin=stdin, stdout=stdout, stderr=stderr, text=text, shell=shell,
+                            start_new_session=start_new_session, env=env)
+
+
+def run(args, stdin=None, input=None, stdout=None, stderr=None, capture_output=False,
+        text=False, timeout=None, check=False, shell=False, start_new_session=False, env=None):
+    """Drop-in for subprocess.run()."""
+    return subprocess.run(args, stdin=stdin, input=input, stdout=stdout, stderr=stderr,
+                          capture_output=capture_output, text=text, timeout=timeout, check=check,
+                          shell=shell, start_new_session=start_new_session, env=env)
+
+
+def getoutput(cmd):
+    """Drop-in for subprocess.getoutput()."""
+    return subprocess.getoutput(cmd)
+
+
+def system(cmd):
+    """Drop-in for os.system(); returns the exit code."""
+    return subprocess.run(cmd, shell=True).returncode
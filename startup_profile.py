@@ -0,0 +1,226 @@
+"""
+Opt-in startup timeline for finding where boot-to-usable time goes.
+
+Enable with STEAMLINK_STARTUP_PROFILE=<path> (or =1 for the default path) or
+`python3 main.py --profile-startup[=<path>]`. Every phase and every module
+import is recorded; finish() writes a Chrome trace (open in chrome://tracing
+or https://ui.perfetto.dev) and prints a summary table.
+
+    with startup_profile.phase("stylesheet"):
+        app.setStyleSheet(...)
+    startup_profile.mark("first frame")
+
+Timestamps are CLOCK_BOOTTIME, so they line up with the process start time
+from /proc and with STEAMLINK_KIOSK_START exported by kiosk.sh.
+When disabled, phase() and mark() do nothing.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+DEFAULT_PATH = "/tmp/steamlink-startup.json"
+FLAG = "--profile-startup"
+
+_events = []
+_threads = {}  # native thread id -> name
+_lock = threading.Lock()
+_path = None
+_reported = False
+
+
+def _now():
+    """Seconds since boot."""
+    try:
+        return time.clock_gettime(time.CLOCK_BOOTTIME)
+    except (AttributeError, OSError):
+        return time.monotonic()
+
+
+def enabled():
+    return _path is not None
+
+
+def _record(event):
+    event.setdefault("pid", os.getpid())
+    event.setdefault("tid", threading.get_native_id())
+    with _lock:
+        _threads.setdefault(event["tid"], threading.current_thread().name)
+        _events.append(event)
+
+
+def mark(name):
+    """Record an instant event (e.g. 'first frame')."""
+    if _path is None:
+        return
+    _record({"name": name, "cat": "mark", "ph": "i", "s": "p", "ts": _now() * 1e6})
+
+
+class _Phase:
+    def __init__(self, name, cat):
+        self.name = name
+        self.cat = cat
+
+    def __enter__(self):
+        self.start = _now()
+        return self
+
+    def __exit__(self, *exc):
+        end = _now()
+        _record({"name": self.name, "cat": self.cat, "ph": "X",
+                 "ts": self.start * 1e6, "dur": (end - self.start) * 1e6})
+        return False
+
+
+class _NoPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name, cat="phase"):
+    """Context manager timing one startup phase."""
+    if _path is None:
+        return _NO_PHASE
+    return _Phase(name, cat)
+
+
+class _TimedLoader:
+    """Wraps a module loader; the import is timed from create_module to the end of exec_module."""
+
+    def __init__(self, loader, name):
+        self._loader = loader
+        self._name = name
+        self._start = None
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        self._start = _now()
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        start = self._start or _now()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            end = _now()
+            _record({"name": self._name, "cat": "import", "ph": "X",
+                     "ts": start * 1e6, "dur": (end - start) * 1e6})
+
+
+class _ImportTimer:
+    """sys.meta_path hook: finds specs through the other finders and times their loaders."""
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, name)
+        return spec
+
+
+def _process_start():
+    """Process start in seconds since boot, from /proc/self/stat."""
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except Exception:
+        return None
+
+
+def configure(argv):
+    """Enable profiling from the env var or the command-line flag (removed from argv)."""
+    global _path
+    path = os.environ.get("STEAMLINK_STARTUP_PROFILE")
+    for arg in list(argv[1:]):
+        if arg == FLAG or arg.startswith(FLAG + "="):
+            argv.remove(arg)
+            path = arg.partition("=")[2] or "1"
+    if not path or path == "0":
+        return
+    _path = DEFAULT_PATH if path == "1" else path
+
+    pid = os.getpid()
+    _events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "steamlink-gui"}})
+    kiosk = os.environ.get("STEAMLINK_KIOSK_START")
+    if kiosk:
+        try:
+            _record({"name": "kiosk.sh", "cat": "mark", "ph": "i", "s": "p", "ts": float(kiosk) * 1e6})
+        except ValueError:
+            pass
+    started = _process_start()
+    if started is not None:
+        _record({"name": "process start", "cat": "mark", "ph": "i", "s": "p", "ts": started * 1e6})
+    mark("profiler enabled")
+
+    sys.meta_path.insert(0, _ImportTimer())
+    atexit.register(_write)
+
+
+def _write():
+    with _lock:
+        events = list(_events)
+        threads = dict(_threads)
+    for tid, name in threads.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                       "args": {"name": name}})
+    try:
+        with open(_path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    except Exception as e:
+        print(f"Could not write startup profile: {e}")
+    return events
+
+
+def summary(events, top_imports=10):
+    """Human-readable table: phases/marks in order, then the slowest imports."""
+    timed = [e for e in events if e.get("ph") in ("X", "i")]
+    if not timed:
+        return "No startup events recorded."
+    marks = {e["name"]: e["ts"] for e in timed if e["ph"] == "i"}
+    origin = marks.get("kiosk.sh", marks.get("process start", min(e["ts"] for e in timed)))
+
+    lines = [f"{'Startup phase':<40}{'start ms':>10}{'dur ms':>10}"]
+    for e in sorted((e for e in timed if e.get("cat") != "import"), key=lambda e: e["ts"]):
+        dur = f"{e['dur'] / 1000:.1f}" if e["ph"] == "X" else "-"
+        lines.append(f"{e['name'][:39]:<40}{(e['ts'] - origin) / 1000:>10.1f}{dur:>10}")
+
+    imports = sorted((e for e in timed if e.get("cat") == "import"), key=lambda e: -e["dur"])
+    if imports:
+        total = sum(e["dur"] for e in imports if not any(
+            o is not e and o["tid"] == e["tid"] and o["ts"] <= e["ts"] and
+            e["ts"] + e["dur"] <= o["ts"] + o["dur"] for o in imports))
+        lines.append("")
+        lines.append(f"{'Slowest imports (incl. submodules)':<40}{'start ms':>10}{'dur ms':>10}")
+        for e in imports[:top_imports]:
+            lines.append(f"{e['name'][:39]:<40}{(e['ts'] - origin) / 1000:>10.1f}{e['dur'] / 1000:>10.1f}")
+        lines.append(f"{len(imports)} modules imported, {total / 1000:.1f} ms in top-level imports")
+    return "\n".join(lines)
+
+
+def finish():
+    """Write the trace and print the summary once; later events are still saved at exit."""
+    global _reported
+    if _path is None:
+        return
+    events = _write()
+    if not _reported:
+        _reported = True
+        print(summary(events))
+        print(f"Startup trace written to {_path}")
@@ -0,0 +1,263 @@
+"""
+Shared store for system state that several parts of the GUI read.
+
+    volume, muted = state.store().value("audio.sink")          # Any thread; may block
+    state.store().get("display.mode", label.setText)           # GUI thread; never blocks
+    state.store().subscribe("audio.sink", self.show_sink, owner=self)
+
+Each key has a fetch function and a TTL. A value younger than its TTL is
+served from memory. While a fetch is running, other readers of that key wait
+for it instead of running their own, so concurrent reads run the external
+commands once. Code that learns a new value (after setting the volume, or
+from a D-Bus signal) publishes it with set(), and invalidate() marks a value
+stale after an action. Subscribers are called on the GUI thread, and only
+when a value actually changes.
+
+stats() counts fetches, cache hits and joined fetches per key, and how many
+external command runs those hits and joins saved.
+
+Keys: audio.sink (volume, muted), bluetooth.devices (mac -> device, defined
+by the bluetoothctl backend or published by the D-Bus one),
+network.addresses ({"ipv4", "mac"}) and display.mode ("1920x1080 @ 60.00Hz").
+"""
+from PyQt6.QtCore import QObject, pyqtSignal
+import re
+import shutil
+import socket
+import threading
+import time
+import jobs
+import spawner
+
+
+def query_sink_state():
+    """Return (volume, muted) for the default sink; volume is None if unknown."""
+    volume = None
+    muted = False
+    try:
+        result = spawner.run(["pactl", "get-sink-volume", "@DEFAULT_SINK@"],
+                             capture_output=True, text=True, timeout=5)
+        match = re.search(r'(\d+)%', result.stdout)
+        volume = int(match.group(1)) if match else None
+    except Exception:
+        pass
+    try:
+        result = spawner.run(["pactl", "get-sink-mute", "@DEFAULT_SINK@"],
+                             capture_output=True, text=True, timeout=5)
+        muted = "Mute: yes" in result.stdout
+    except Exception:
+        pass
+    return volume, muted
+
+
+def read_network(interface="eth0"):
+    """IPv4 address of the default route and the wired MAC; no commands run."""
+    ipv4 = "Unavailable"
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect(("8.8.8.8", 80))  # UDP: picks the route, sends nothing
+        ipv4 = s.getsockname()[0]
+        s.close()
+    except OSError:
+        pass
+    try:
+        with open(f"/sys/class/net/{interface}/address") as f:
+            mac = f.read().strip()
+    except OSError:
+        mac = "N/A"
+    return {"ipv4": ipv4, "mac": mac}
+
+
+def read_display():
+    """Current HDMI mode from tvservice, else the framebuffer size; None if unknown."""
+    if shutil.which("tvservice"):
+        try:
+            result = spawner.run(["tvservice", "-s"], capture_output=True, text=True, timeout=5)
+            match = re.search(r"(\d+x\d+ @ [\d.]+Hz)", result.stdout)
+            if match:
+                return match.group(1)
+        except Exception:
+            pass
+    try:
+        with open("/sys/class/graphics/fb0/virtual_size") as f:
+            return f.read().strip().replace(",", "x")
+    except OSError:
+        return None
+
+
+class _Entry:
+    def __init__(self, fetch=None, ttl=None, commands=0):
+        self.fetch = fetch
+        self.ttl = ttl            # Seconds; None: never stale (published values)
+        self.commands = commands  # External command runs per fetch
+        self.value = None
+        self.known = False
+        self.stamp = 0.0          # When the fetch that produced value started
+        self.invalidated_at = 0.0  # Fetches started before this are stale
+        self.flight = None        # Fetch under way, joined by concurrent readers
+        self.fetches = self.hits = self.joined = self.errors = 0
+
+
+class _Flight:
+    def __init__(self, started):
+        self.started = started
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class StateStore(QObject):
+    changed = pyqtSignal(str, object)  # key, new value; queued to the GUI thread
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._subscribers = {}  # key -> [callback]
+        self.changed.connect(self._notify)
+
+    def define(self, key, fetch, ttl, commands=1):
+        """Register how `key` is fetched (any thread) and for how long a value stays fresh."""
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            entry.fetch, entry.ttl, entry.commands = fetch, ttl, commands
+
+    def value(self, key, max_age=None):
+        """
+        The value of `key`, fetched unless one younger than max_age (default:
+        the key's TTL) is cached. Blocks, so call it off the GUI thread if the
+        fetch runs commands. A fetch error is raised to every waiting reader.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries[key]
+            limit = entry.ttl if max_age is None else max_age
+            if entry.known and (limit is None or now - entry.stamp <= limit):
+                entry.hits += 1
+                return entry.value
+            flight = entry.flight
+            if (flight is not None and flight.started >= entry.invalidated_at
+                    and (limit is None or now - flight.started <= limit)):
+                entry.joined += 1
+                leader = False
+            elif entry.fetch is None:
+                raise KeyError(f"{key} has no value and no fetch")
+            else:
+                flight = entry.flight = _Flight(now)
+                leader = True
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = entry.fetch()
+        except Exception as e:
+            with self._lock:
+                entry.errors += 1
+                if entry.flight is flight:
+                    entry.flight = None
+            flight.error = e
+            flight.done.set()
+            raise
+        with self._lock:
+            entry.fetches += 1
+            if entry.flight is flight:
+                entry.flight = None
+            changed = False
+            # An older fetch finishing late, or one started before invalidate(), does not win
+            if flight.started >= entry.stamp and flight.started >= entry.invalidated_at:
+                changed = not entry.known or value != entry.value
+                entry.value, entry.known, entry.stamp = value, True, flight.started
+        flight.value = value
+        flight.done.set()
+        if changed:
+            self.changed.emit(key, value)
+        return value
+
+    def refresh(self, key):
+        """Fetch `key` now (joining only a fetch started from this moment on)."""
+        return self.value(key, max_age=0)
+
+    def get(self, key, callback, max_age=None):
+        """GUI thread: callback(value) at once if fresh, else once a background fetch is done."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries[key]
+            limit = entry.ttl if max_age is None else max_age
+            fresh = entry.known and (limit is None or now - entry.stamp <= limit)
+            if fresh:
+                entry.hits += 1
+                value = entry.value
+        if fresh:
+            callback(value)
+            return
+        jobs.executor().submit(self.value, key, max_age, timeout=15, on_done=callback)
+
+    def peek(self, key):
+        """The cached value (stale or not), or None; never fetches."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry else None
+
+    def set(self, key, value):
+        """Publish a value learned elsewhere; subscribers hear of it if it changed."""
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            changed = not entry.known or value != entry.value
+            entry.value, entry.known, entry.stamp = value, True, time.monotonic()
+        if changed:
+            self.changed.emit(key, value)
+
+    def invalidate(self, key):
+        """
+        The next read fetches again (e.g. after an action changed the state).
+        A fetch already under way is not joined and its result is not stored.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                entry.stamp = 0.0
+                entry.invalidated_at = time.monotonic()
+
+    def subscribe(self, key, callback, owner=None):
+        """callback(value) on the GUI thread whenever `key` changes, until `owner` is destroyed."""
+        self._subscribers.setdefault(key, []).append(callback)
+        if owner is not None:
+            owner.destroyed.connect(lambda *_: self.unsubscribe(key, callback))
+
+    def unsubscribe(self, key, callback):
+        callbacks = self._subscribers.get(key, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def _notify(self, key, value):
+        for callback in list(self._subscribers.get(key, [])):
+            callback(value)
+
+    def stats(self):
+        with self._lock:
+            keys = {}
+            for key, e in self._entries.items():
+                keys[key] = {"fetches": e.fetches, "hits": e.hits, "joined": e.joined, "errors": e.errors,
+                             "commands_run": e.fetches * e.commands,
+                             "commands_saved": (e.hits + e.joined) * e.commands,
+                             "age_s": round(time.monotonic() - e.stamp, 1) if e.known else None}
+        return {"commands_run": sum(k["commands_run"] for k in keys.values()),
+                "commands_saved": sum(k["commands_saved"] for k in keys.values()),
+                "keys": keys}
+
+
+_store = None
+
+
+def store():
+    """Shared state store with the standard keys; create it on the GUI thread."""
+    global _store
+    if _store is None:
+        _store = StateStore()
+        _store.define("audio.sink", query_sink_state, ttl=2.0, commands=2)
+        _store.define("network.addresses", read_network, ttl=30.0, commands=0)
+        _store.define("display.mode", read_display, ttl=300.0, commands=1 if shutil.which("tvservice") else 0)
+    return _store
@@ -3,6 +3,7 @@
 # Perms for FB (one-time, but idempotent)
 sudo chmod 666 /dev/fb0 2>/dev/null
 sudo usermod -a -G video $USER 2>/dev/null
+sudo usermod -a -G input $USER 2>/dev/null  # Controller access via /dev/input (evdev)
 
 # Fire it
 cd /opt/steamlink-gui && ./kiosk.sh
\ No newline at end of file
@@ -1,16 +1,13 @@
-import subprocess
-import re
+import spawner
+import state
 
 def get_volume():
-    result = subprocess.run(["pactl", "get-sink-volume", "@DEFAULT_SINK@"], capture_output=True, text=True)
-    match = re.search(r'(\d+)%', result.stdout)
-    return int(match.group(1)) if match else None
+    return state.store().value("audio.sink")[0]
 
 def set_volume(percent):
-    subprocess.run(["pactl", "set-sink-volume", "@DEFAULT_SINK@", f"{percent}%"])
+    spawner.run(["pactl", "set-sink-volume", "@DEFAULT_SINK@", f"{percent}%"])
+    state.store().invalidate("audio.sink")
 
 def get_ip_mac():
-    ip_output = subprocess.getoutput("hostname -I").strip()
-    ipv4 = next((ip for ip in ip_output.split() if re.match(r"\d+\.\d+\.\d+\.\d+", ip)), "N/A")
-    mac = subprocess.getoutput("cat /sys/class/net/eth0/address").strip()
-    return ipv4, mac
+    addresses = state.store().value("network.addresses")
+    return addresses["ipv4"], addresses["mac"]